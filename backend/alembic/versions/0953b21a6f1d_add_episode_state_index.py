@@ -0,0 +1,29 @@
+"""add episodes (project_id, state, episode_number) index
+
+Revision ID: 0953b21a6f1d
+Revises: a8d34eca4f45
+Create Date: 2026-10-16 12:31:40.218377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0953b21a6f1d'
+down_revision: Union[str, None] = 'a8d34eca4f45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_episodes_project_state_num', 'episodes',
+        ['project_id', 'state', 'episode_number'], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_episodes_project_state_num', table_name='episodes', if_exists=True)
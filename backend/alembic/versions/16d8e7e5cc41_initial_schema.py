@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -17,11 +18,22 @@ down_revision: Union[str, None] = None
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# Enum types are created up front with checkfirst (a no-op outside PostgreSQL),
+# so create_table(if_not_exists=True) doesn't emit a failing CREATE TYPE
+ideasstate = postgresql.ENUM('GENERATED', 'APPROVED', 'REJECTED', name='ideasstate', create_type=False)
+structurestate = postgresql.ENUM('GENERATED', 'APPROVED', 'REJECTED', name='structurestate', create_type=False)
+generationstate = postgresql.ENUM('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', name='generationstate', create_type=False)
+mediastate = postgresql.ENUM('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', 'REJECTED', name='mediastate', create_type=False)
+
 
 def upgrade() -> None:
     # Create all tables for fresh deployments.
     # For existing databases, init_db() already created these tables,
-    # and Alembic will stamp the version without re-running.
+    # and Alembic will stamp the version without re-running. IF NOT EXISTS
+    # makes a re-run against a warm database a cheap no-op.
+    bind = op.get_bind()
+    for enum_type in (ideasstate, structurestate, generationstate, mediastate):
+        enum_type.create(bind, checkfirst=True)
 
     op.create_table('projects',
         sa.Column('id', sa.String(), nullable=False),
@@ -31,14 +43,16 @@ def upgrade() -> None:
         sa.Column('current_step', sa.Integer(), nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.Column('updated_at', sa.DateTime(), nullable=True),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('app_settings',
         sa.Column('key', sa.String(), nullable=False),
         sa.Column('value', sa.Text(), nullable=False),
         sa.Column('updated_at', sa.DateTime(), nullable=True),
-        sa.PrimaryKeyConstraint('key')
+        sa.PrimaryKeyConstraint('key'),
+        if_not_exists=True
     )
 
     op.create_table('ideas',
@@ -49,10 +63,11 @@ def upgrade() -> None:
         sa.Column('setting_description', sa.Text(), nullable=True),
         sa.Column('themes', sa.JSON(), nullable=True),
         sa.Column('target_audience', sa.String(), nullable=True),
-        sa.Column('state', sa.Enum('GENERATED', 'APPROVED', 'REJECTED', name='ideasstate'), nullable=True),
+        sa.Column('state', ideasstate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('characters',
@@ -63,10 +78,11 @@ def upgrade() -> None:
         sa.Column('archetype', sa.String(), nullable=True),
         sa.Column('physical_description', sa.Text(), nullable=True),
         sa.Column('personality', sa.Text(), nullable=True),
-        sa.Column('state', sa.Enum('GENERATED', 'APPROVED', 'REJECTED', name='structurestate'), nullable=True),
+        sa.Column('state', structurestate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('locations',
@@ -76,10 +92,11 @@ def upgrade() -> None:
         sa.Column('type', sa.String(), nullable=True),
         sa.Column('description', sa.Text(), nullable=True),
         sa.Column('visual_details', sa.Text(), nullable=True),
-        sa.Column('state', sa.Enum('GENERATED', 'APPROVED', 'REJECTED', name='structurestate'), nullable=True),
+        sa.Column('state', structurestate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('episode_summaries',
@@ -90,10 +107,11 @@ def upgrade() -> None:
         sa.Column('summary', sa.Text(), nullable=True),
         sa.Column('key_beats', sa.JSON(), nullable=True),
         sa.Column('cliffhanger', sa.Text(), nullable=True),
-        sa.Column('state', sa.Enum('GENERATED', 'APPROVED', 'REJECTED', name='structurestate'), nullable=True),
+        sa.Column('state', structurestate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('episodes',
@@ -104,10 +122,11 @@ def upgrade() -> None:
         sa.Column('cold_open', sa.Text(), nullable=True),
         sa.Column('music_cue', sa.String(), nullable=True),
         sa.Column('cliffhanger_moment', sa.Text(), nullable=True),
-        sa.Column('state', sa.Enum('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', name='generationstate'), nullable=True),
+        sa.Column('state', generationstate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('scenes',
@@ -124,7 +143,8 @@ def upgrade() -> None:
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['episode_id'], ['episodes.id'], ondelete='CASCADE'),
         sa.ForeignKeyConstraint(['location_id'], ['locations.id']),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('dialogue_lines',
@@ -138,7 +158,8 @@ def upgrade() -> None:
         sa.Column('emotion', sa.String(), nullable=True),
         sa.ForeignKeyConstraint(['character_id'], ['characters.id']),
         sa.ForeignKeyConstraint(['scene_id'], ['scenes.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('image_prompts',
@@ -148,10 +169,11 @@ def upgrade() -> None:
         sa.Column('prompt_text', sa.Text(), nullable=True),
         sa.Column('negative_prompt', sa.Text(), nullable=True),
         sa.Column('style_reference', sa.String(), nullable=True),
-        sa.Column('state', sa.Enum('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', name='generationstate'), nullable=True),
+        sa.Column('state', generationstate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['scene_id'], ['scenes.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('character_refs',
@@ -159,10 +181,11 @@ def upgrade() -> None:
         sa.Column('character_id', sa.String(), nullable=True),
         sa.Column('prompt_text', sa.Text(), nullable=True),
         sa.Column('image_path', sa.String(), nullable=True),
-        sa.Column('state', sa.Enum('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', 'REJECTED', name='mediastate'), nullable=True),
+        sa.Column('state', mediastate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['character_id'], ['characters.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('location_refs',
@@ -170,20 +193,22 @@ def upgrade() -> None:
         sa.Column('location_id', sa.String(), nullable=True),
         sa.Column('prompt_text', sa.Text(), nullable=True),
         sa.Column('image_path', sa.String(), nullable=True),
-        sa.Column('state', sa.Enum('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', 'REJECTED', name='mediastate'), nullable=True),
+        sa.Column('state', mediastate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('generated_images',
         sa.Column('id', sa.String(), nullable=False),
         sa.Column('image_prompt_id', sa.String(), nullable=True),
         sa.Column('image_path', sa.String(), nullable=True),
-        sa.Column('state', sa.Enum('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', 'REJECTED', name='mediastate'), nullable=True),
+        sa.Column('state', mediastate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['image_prompt_id'], ['image_prompts.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('thumbnails',
@@ -192,10 +217,11 @@ def upgrade() -> None:
         sa.Column('episode_number', sa.Integer(), nullable=True),
         sa.Column('prompt_text', sa.Text(), nullable=True),
         sa.Column('image_path', sa.String(), nullable=True),
-        sa.Column('state', sa.Enum('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', 'REJECTED', name='mediastate'), nullable=True),
+        sa.Column('state', mediastate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('video_prompts',
@@ -204,37 +230,39 @@ def upgrade() -> None:
         sa.Column('prompt_number', sa.Integer(), nullable=True),
         sa.Column('prompt_text', sa.Text(), nullable=True),
         sa.Column('reference_image_path', sa.String(), nullable=True),
-        sa.Column('state', sa.Enum('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', name='generationstate'), nullable=True),
+        sa.Column('state', generationstate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['scene_id'], ['scenes.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
     op.create_table('generated_videos',
         sa.Column('id', sa.String(), nullable=False),
         sa.Column('video_prompt_id', sa.String(), nullable=True),
         sa.Column('video_path', sa.String(), nullable=True),
-        sa.Column('state', sa.Enum('PENDING', 'GENERATING', 'GENERATED', 'APPROVED', 'REJECTED', name='mediastate'), nullable=True),
+        sa.Column('state', mediastate, nullable=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['video_prompt_id'], ['video_prompts.id'], ondelete='CASCADE'),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
     )
 
 
 def downgrade() -> None:
-    op.drop_table('generated_videos')
-    op.drop_table('video_prompts')
-    op.drop_table('thumbnails')
-    op.drop_table('generated_images')
-    op.drop_table('location_refs')
-    op.drop_table('character_refs')
-    op.drop_table('image_prompts')
-    op.drop_table('dialogue_lines')
-    op.drop_table('scenes')
-    op.drop_table('episodes')
-    op.drop_table('episode_summaries')
-    op.drop_table('locations')
-    op.drop_table('characters')
-    op.drop_table('ideas')
-    op.drop_table('app_settings')
-    op.drop_table('projects')
+    op.drop_table('generated_videos', if_exists=True)
+    op.drop_table('video_prompts', if_exists=True)
+    op.drop_table('thumbnails', if_exists=True)
+    op.drop_table('generated_images', if_exists=True)
+    op.drop_table('location_refs', if_exists=True)
+    op.drop_table('character_refs', if_exists=True)
+    op.drop_table('image_prompts', if_exists=True)
+    op.drop_table('dialogue_lines', if_exists=True)
+    op.drop_table('scenes', if_exists=True)
+    op.drop_table('episodes', if_exists=True)
+    op.drop_table('episode_summaries', if_exists=True)
+    op.drop_table('locations', if_exists=True)
+    op.drop_table('characters', if_exists=True)
+    op.drop_table('ideas', if_exists=True)
+    op.drop_table('app_settings', if_exists=True)
+    op.drop_table('projects', if_exists=True)
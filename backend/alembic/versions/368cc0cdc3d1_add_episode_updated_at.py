@@ -0,0 +1,31 @@
+"""add episode updated_at
+
+Revision ID: 368cc0cdc3d1
+Revises: eb4f68fa92a3
+Create Date: 2026-10-16 11:05:52.107334
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '368cc0cdc3d1'
+down_revision: Union[str, None] = 'eb4f68fa92a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # init_db() may already have added the column on this database
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('episodes')}
+    if 'updated_at' not in columns:
+        op.add_column('episodes', sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute("UPDATE episodes SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('episodes') as batch_op:
+        batch_op.drop_column('updated_at')
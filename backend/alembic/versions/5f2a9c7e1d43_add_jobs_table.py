@@ -0,0 +1,45 @@
+"""add jobs table
+
+Revision ID: 5f2a9c7e1d43
+Revises: b8c14cca6514
+Create Date: 2026-10-16 14:22:05.913846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2a9c7e1d43'
+down_revision: Union[str, None] = 'b8c14cca6514'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Created with checkfirst so a database init_db() already built doesn't hit
+# a duplicate CREATE TYPE on PostgreSQL (see the initial schema)
+jobstatus = postgresql.ENUM('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus', create_type=False)
+
+
+def upgrade() -> None:
+    jobstatus.create(op.get_bind(), checkfirst=True)
+    op.create_table('jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('project_id', sa.String(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('status', jobstatus, nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_jobs_project_id', 'jobs', ['project_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_project_id', table_name='jobs', if_exists=True)
+    op.drop_table('jobs', if_exists=True)
@@ -0,0 +1,33 @@
+"""add image_prompts (scene_id, shot_number) index
+
+Revision ID: 83b3456c431a
+Revises: 0953b21a6f1d
+Create Date: 2026-10-16 13:02:11.804529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '83b3456c431a'
+down_revision: Union[str, None] = '0953b21a6f1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tables built by the initial migration alone still have the older
+    # prompt_number column; init_db() creates shot_number from the models
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('image_prompts')}
+    if 'shot_number' in columns:
+        op.create_index(
+            'ix_image_prompts_scene_shot', 'image_prompts',
+            ['scene_id', 'shot_number'], if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_image_prompts_scene_shot', table_name='image_prompts', if_exists=True)
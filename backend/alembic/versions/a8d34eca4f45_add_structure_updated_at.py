@@ -0,0 +1,35 @@
+"""add characters/locations updated_at
+
+Revision ID: a8d34eca4f45
+Revises: 368cc0cdc3d1
+Create Date: 2026-10-16 11:48:19.660251
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d34eca4f45'
+down_revision: Union[str, None] = '368cc0cdc3d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['characters', 'locations']
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        # init_db() may already have added the column on this database
+        if 'updated_at' not in {c['name'] for c in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+            op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,35 @@
+"""add ideas/media updated_at
+
+Revision ID: b8c14cca6514
+Revises: 83b3456c431a
+Create Date: 2026-10-16 13:40:52.377140
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c14cca6514'
+down_revision: Union[str, None] = '83b3456c431a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['ideas', 'image_prompts', 'character_refs', 'location_refs', 'generated_images', 'thumbnails']
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        # init_db() may already have added the column on this database
+        if 'updated_at' not in {c['name'] for c in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+            op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,28 @@
+"""add query indexes
+
+Revision ID: be7889f5d2d1
+Revises: 16d8e7e5cc41
+Create Date: 2026-10-16 10:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'be7889f5d2d1'
+down_revision: Union[str, None] = '16d8e7e5cc41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Indexes are also declared on the models, so init_db() creates them on
+    # fresh databases; IF NOT EXISTS keeps this a no-op there.
+    op.create_index('ix_episodes_project_num', 'episodes', ['project_id', 'episode_number'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_episodes_project_num', table_name='episodes', if_exists=True)
@@ -0,0 +1,52 @@
+"""add unique indexes on character/location refs and thumbnails
+
+Revision ID: c41e7d2b9a85
+Revises: 5f2a9c7e1d43
+Create Date: 2026-10-16 15:08:37.264190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7d2b9a85'
+down_revision: Union[str, None] = '5f2a9c7e1d43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) — mirrors the __table_args__ on the models
+INDEXES = [
+    ('ix_character_refs_character_id', 'character_refs', ['character_id']),
+    ('ix_location_refs_location_id', 'location_refs', ['location_id']),
+    ('ix_thumbnails_episode_orientation', 'thumbnails', ['episode_id', 'orientation']),
+]
+
+# Duplicate to keep: approved first, then generated (states are stored by name)
+KEEP_RANK = "CASE state WHEN 'APPROVED' THEN 0 WHEN 'GENERATED' THEN 1 ELSE 2 END"
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # Tables built by the initial migration alone may predate these
+        # columns; init_db() creates them from the models
+        if not set(columns) <= {c['name'] for c in inspector.get_columns(table)}:
+            continue
+        # Racing generate requests may have left duplicates; keep one per key,
+        # preferring a reviewed or rendered row over a pending copy, then the
+        # oldest (ids are random, so they only break exact ties)
+        op.execute(
+            f"DELETE FROM {table} WHERE id IN ("
+            f"SELECT id FROM (SELECT id, ROW_NUMBER() OVER ("
+            f"PARTITION BY {', '.join(columns)} ORDER BY {KEEP_RANK}, created_at, id"
+            f") AS rn FROM {table}) ranked WHERE rn > 1)"
+        )
+        op.create_index(name, table, columns, unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,34 @@
+"""add prompt_hash to reference, scene and thumbnail images
+
+Revision ID: d7e3a1f4b590
+Revises: c41e7d2b9a85
+Create Date: 2026-10-16 16:21:09.530418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e3a1f4b590'
+down_revision: Union[str, None] = 'c41e7d2b9a85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['character_refs', 'location_refs', 'generated_images', 'thumbnails']
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        # init_db() may already have added the column on this database
+        if 'prompt_hash' not in {c['name'] for c in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column('prompt_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('prompt_hash')
@@ -0,0 +1,35 @@
+"""add partial indexes over GENERATING media rows
+
+Revision ID: e5b82c6d3f17
+Revises: d7e3a1f4b590
+Create Date: 2026-10-16 17:12:48.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b82c6d3f17'
+down_revision: Union[str, None] = 'd7e3a1f4b590'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['generated_images', 'generated_videos', 'character_refs', 'location_refs', 'thumbnails']
+
+
+def upgrade() -> None:
+    # Enums are stored by name, so the predicate matches 'GENERATING'
+    where = sa.text("state = 'GENERATING'")
+    for table in TABLES:
+        op.create_index(
+            f'ix_{table}_generating', table, ['created_at'],
+            sqlite_where=where, postgresql_where=where, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_generating', table_name=table, if_exists=True)
@@ -0,0 +1,38 @@
+"""add composite indexes
+
+Revision ID: eb4f68fa92a3
+Revises: be7889f5d2d1
+Create Date: 2026-10-16 10:41:07.552914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'eb4f68fa92a3'
+down_revision: Union[str, None] = 'be7889f5d2d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) — mirrors the __table_args__ on the models
+INDEXES = [
+    ('ix_scenes_episode_num', 'scenes', ['episode_id', 'scene_number']),
+    ('ix_dialogue_lines_scene_num', 'dialogue_lines', ['scene_id', 'line_number']),
+    ('ix_episode_summaries_project_num', 'episode_summaries', ['project_id', 'episode_number']),
+    ('ix_characters_project_state', 'characters', ['project_id', 'state']),
+    ('ix_locations_project_state', 'locations', ['project_id', 'state']),
+    ('ix_episode_summaries_project_state', 'episode_summaries', ['project_id', 'state']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
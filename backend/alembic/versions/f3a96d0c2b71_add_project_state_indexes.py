@@ -0,0 +1,41 @@
+"""add (owner, state) indexes for ideas, thumbnails, media and video prompts
+
+Revision ID: f3a96d0c2b71
+Revises: e5b82c6d3f17
+Create Date: 2026-10-16 17:58:03.114627
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a96d0c2b71'
+down_revision: Union[str, None] = 'e5b82c6d3f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) — mirrors the __table_args__ on the models
+INDEXES = [
+    ('ix_ideas_project_state', 'ideas', ['project_id', 'state']),
+    ('ix_thumbnails_project_state', 'thumbnails', ['project_id', 'state']),
+    ('ix_video_prompts_scene_segment', 'video_prompts', ['scene_id', 'segment_number']),
+    ('ix_generated_images_prompt_state', 'generated_images', ['image_prompt_id', 'state']),
+    ('ix_generated_videos_prompt_state', 'generated_videos', ['video_prompt_id', 'state']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # Tables built by the initial migration alone may predate these
+        # columns; init_db() creates them from the models
+        if set(columns) <= {c['name'] for c in inspector.get_columns(table)}:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -2,13 +2,199 @@
 Shared API utilities
 """
 
-from typing import Optional, List
+import hashlib
+import os
+from functools import lru_cache
+from typing import Optional, FrozenSet, Sequence
 
+import orjson
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload, raiseload
 
-def parse_state_filter(state_param: Optional[str]) -> Optional[List[str]]:
-    """Parse comma-separated state query param into a list of state strings.
+from app.database.session import get_db
+from app.models.mixins import InvalidTransitionError
+from app.models.models import Project, Episode, Scene, Character, Location, ImagePrompt, VideoPrompt
+from app.services.jobs import JobWork, enqueue
+
+
+@lru_cache(maxsize=256)
+def _parse_states(state_param: str) -> FrozenSet[str]:
+    return frozenset(s.strip().lower() for s in state_param.split(",") if s.strip())
+
+
+def parse_state_filter(state_param: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Parse comma-separated state query param into a set of state strings.
     Returns None if no filter was provided (meaning: return all).
+    Parsed values are cached, since clients repeat the same few filters.
     """
     if not state_param:
         return None
-    return [s.strip().lower() for s in state_param.split(",") if s.strip()]
+    return _parse_states(state_param)
+
+
+@lru_cache(maxsize=256)
+def state_members(enum_cls, states: FrozenSet[str]) -> tuple:
+    """Members of enum_cls named by a parse_state_filter() set. Row filters
+    test `row.state in members`, which matches enum singletons by identity
+    instead of a .value lookup and string compare per row."""
+    return tuple(s for s in enum_cls if s.value in states)
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the values that determine a response body."""
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already names this ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [t.strip() for t in header.split(",")]
+
+
+def transition_by_id(db: Session, model, entity_id: str, new_state, not_found: Optional[str] = None) -> None:
+    """Apply a state-machine transition with a single guarded UPDATE.
+
+    The WHERE clause only matches rows whose current state may move to
+    new_state, so valid transitions never load the row. On no match, looks
+    up the state once to raise 404 (with not_found as the detail, if given)
+    or InvalidTransitionError (409), like transition_to() would. The caller
+    commits.
+    """
+    result = db.execute(
+        update(model)
+        .where(model.id == entity_id, model.state.in_(model.sources_for(new_state)))
+        .values(state=new_state)
+    )
+    if result.rowcount:
+        return
+    current = db.query(model.state).filter(model.id == entity_id).scalar()
+    if current is None:
+        raise HTTPException(status_code=404, detail=not_found or f"{model.__name__} not found")
+    raise InvalidTransitionError(model.__name__, current, new_state)
+
+
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def insert_or_skip(db: Session, model, *index_elements: str):
+    """INSERT ... ON CONFLICT (index_elements) DO NOTHING for the session's
+    dialect, so racing requests can't create the same row twice. The conflict
+    target must be a unique index."""
+    dialect = db.get_bind().dialect.name
+    if dialect not in _UPSERT_INSERTS:
+        return insert(model)
+    return _UPSERT_INSERTS[dialect](model).on_conflict_do_nothing(index_elements=list(index_elements))
+
+
+def upsert(db: Session, model, index_elements: Sequence[str], values: dict) -> None:
+    """INSERT ... ON CONFLICT (index_elements) DO UPDATE in one statement, so a
+    save is a single round-trip instead of SELECT then INSERT/UPDATE. Other
+    dialects fall back to Session.merge()."""
+    dialect = db.get_bind().dialect.name
+    if dialect not in _UPSERT_INSERTS:
+        db.merge(model(**values))
+        return
+    stmt = _UPSERT_INSERTS[dialect](model).values(**values)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={name: stmt.excluded[name] for name in values if name not in index_elements}
+    ))
+
+
+def cached_json(request: Request, cache, key: tuple, build) -> Response:
+    """Serve build()'s JSON-ready result with an ETag, reusing the encoded bytes
+    while key is unchanged. key must include a version (counts / updated_at)
+    of every row the body is built from, so writes invalidate it implicitly
+    and every worker agrees on it.
+    """
+    etag = make_etag(*key)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    body = cache.get(key)
+    if body is None:
+        body = orjson.dumps(build())
+        cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+# ============================================================================
+# PROJECT LOADING (eager-load option bundles, one query per level)
+# ============================================================================
+
+# Dev/test guard: make any relationship not named in the loader options raise
+# instead of silently lazy-loading (an N+1 waiting to happen). Off by default.
+STRICT_LOADING = os.getenv("STRICT_LOADING", "").strip().lower() in ("1", "true", "yes")
+
+def scene_image_options():
+    """Episodes → scenes → image prompts with their generated image."""
+    return [
+        selectinload(Project.episodes).selectinload(Episode.scenes)
+        .selectinload(Scene.image_prompts).joinedload(ImagePrompt.generated_image),
+    ]
+
+
+def scene_video_options():
+    """Episodes → scenes → video prompts with their generated video."""
+    return [
+        selectinload(Project.episodes).selectinload(Episode.scenes)
+        .selectinload(Scene.video_prompts).joinedload(VideoPrompt.generated_video),
+    ]
+
+
+def reference_options():
+    """Characters and locations with their reference image."""
+    return [
+        selectinload(Project.characters).joinedload(Character.reference),
+        selectinload(Project.locations).joinedload(Location.reference),
+    ]
+
+
+def load_project(db: Session, project_id: str, *options) -> Project:
+    """Fetch a project with the given loader options, or raise 404.
+    With STRICT_LOADING on, relationships not covered by the options raise."""
+    if STRICT_LOADING:
+        options = (*options, raiseload("*"))
+    project = db.query(Project).options(*options).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+
+def require_project(*options):
+    """Dependency factory for routes under /projects/{project_id}: resolves the
+    path's project (404 if missing) before the handler runs.
+    Options are applied as in load_project(); with none, the plain row is
+    returned and its relationships load lazily."""
+    def dependency(project_id: str, db: Session = Depends(get_db)) -> Project:
+        if options:
+            return load_project(db, project_id, *options)
+        project = db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return project
+    return dependency
+
+
+# ============================================================================
+# BACKGROUND GENERATION (opt-in via ?background=true)
+# ============================================================================
+
+async def run_or_enqueue(db: Session, project_id: str, kind: str, background: bool, work: JobWork):
+    """Run a generate_* body inline, or queue it as a job and answer 202 with
+    a status URL straight away. The job re-reads everything from the DB."""
+    if not background:
+        return await work(db, project_id)
+    if not db.query(Project.id).filter(Project.id == project_id).first():
+        raise HTTPException(status_code=404, detail="Project not found")
+    job = enqueue(db, project_id, kind, work)
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status.value, "status_url": f"/jobs/{job.id}"}
+    )
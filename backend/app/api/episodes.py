@@ -2,55 +2,254 @@
 Episodes API routes (Step 5)
 """
 
+import asyncio
 import re
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import orjson
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session, selectinload, joinedload, load_only
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from app.database.session import get_db
 from app.models.models import (
     Project, Episode, Scene, DialogueLine, EpisodeSummary, Character, Location,
-    GenerationState, StructureState, IdeaState
+    ImagePrompt, GeneratedImage, VideoPrompt, GeneratedVideo,
+    GenerationState, StructureState, IdeaState, generate_uuid
 )
 from app.models.schemas import (
-    EpisodeResponse, EpisodeDetail, SceneResponse, DialogueLineResponse,
-    GenerateEpisodesRequest
+    EpisodeResponse, EpisodeDetail,
+    GenerateEpisodesRequest, GenerationState as GenerationStateOut
 )
 from app.services.generator import generator
 from app.services.script_formatter import format_episode_screenplay
-from app.api import parse_state_filter
+from app.services.cache import LRUCache
+from app.api import parse_state_filter, state_members, make_etag, etag_matches, require_project, transition_by_id
 from app.middleware.rate_limit import limiter, AI_GENERATION_LIMIT
 
 # Episodes per AI call (to stay within token limits)
 AI_BATCH_SIZE = 3
 
+# Script-generation calls allowed in flight at once (process-wide, to respect
+# provider rate limits when several chunks or requests run concurrently)
+MAX_CONCURRENT_SCRIPT_CALLS = 3
+_script_call_slots = asyncio.Semaphore(MAX_CONCURRENT_SCRIPT_CALLS)
+
+
+async def _generate_scripts_chunk(chunk: List[EpisodeSummary], **context) -> List[dict]:
+    """Run one batched script-generation call, waiting for a free slot."""
+    chunk_summaries = [
+        {
+            "episode_number": s.episode_number,
+            "title": s.title,
+            "summary": s.summary,
+            "key_beats": s.key_beats or [],
+            "cliffhanger": s.cliffhanger
+        }
+        for s in chunk
+    ]
+    async with _script_call_slots:
+        return await generator.generate_episode_scripts_batch(episode_summaries=chunk_summaries, **context)
+
+
+# camelCase keys the model may return, mapped to the snake_case names we read
+_SCRIPT_KEY_ALIASES = {
+    "episodeNumber": "episode_number",
+    "coldOpen": "cold_open",
+    "musicCue": "music_cue",
+    "cliffhangerMoment": "cliffhanger_moment",
+    "sceneNumber": "scene_number",
+    "timeOfDay": "time_of_day",
+    "actionBeats": "action_beats",
+    "cameraWork": "camera_notes",
+    "duration": "duration_seconds",
+}
+
+
+def _normalize_keys(data: dict) -> dict:
+    """Copy of an AI payload dict with snake_case keys (camelCase wins if both are present)"""
+    normalized = dict(data)
+    for key, value in data.items():
+        alias = _SCRIPT_KEY_ALIASES.get(key)
+        if alias:
+            normalized[alias] = value
+    return normalized
+
+
+_DURATION_RE = re.compile(r'(\d+)')
+
 
 def _parse_duration(value) -> int:
     """Parse duration from int or string like '18 seconds' to int"""
-    if isinstance(value, (int, float)):
-        return int(value)
+    if type(value) is int:
+        return value
     if isinstance(value, str):
-        match = re.search(r'(\d+)', value)
+        match = _DURATION_RE.search(value)
         return int(match.group(1)) if match else 15
+    if isinstance(value, (int, float)):
+        return int(value)
     return 15
 
+
+def _delete_episode_scenes(db: Session, episode_id: str) -> None:
+    """Bulk-delete an episode's scenes and everything hanging off them.
+
+    The scene subtree FKs declare ON DELETE CASCADE, but SQLite does not
+    enforce foreign keys here and databases created before that change lack
+    it, so children are removed explicitly, leaves first.
+    """
+    scene_ids = select(Scene.id).where(Scene.episode_id == episode_id)
+    image_prompt_ids = select(ImagePrompt.id).where(ImagePrompt.scene_id.in_(scene_ids))
+    video_prompt_ids = select(VideoPrompt.id).where(VideoPrompt.scene_id.in_(scene_ids))
+
+    db.query(GeneratedVideo).filter(
+        GeneratedVideo.video_prompt_id.in_(video_prompt_ids)
+    ).delete(synchronize_session=False)
+    db.query(VideoPrompt).filter(VideoPrompt.scene_id.in_(scene_ids)).delete(synchronize_session=False)
+    db.query(GeneratedImage).filter(
+        GeneratedImage.image_prompt_id.in_(image_prompt_ids)
+    ).delete(synchronize_session=False)
+    db.query(ImagePrompt).filter(ImagePrompt.scene_id.in_(scene_ids)).delete(synchronize_session=False)
+    db.query(DialogueLine).filter(DialogueLine.scene_id.in_(scene_ids)).delete(synchronize_session=False)
+    db.query(Scene).filter(Scene.episode_id == episode_id).delete(synchronize_session=False)
+
+
+class _StructurePayload(NamedTuple):
+    """Character/location data handed to the script generator, plus the
+    name -> id lookups used when attaching scenes and dialogue to them.
+    Shared between requests: treat as read-only."""
+    characters_data: List[dict]
+    locations_data: List[dict]
+    character_ids_by_name: Dict[str, str]
+    location_ids_by_name: Dict[str, str]
+    location_names: List[Tuple[str, str]]  # (lowercased name, id) for partial matching
+    resolved_locations: Dict[str, Optional[str]]  # memo for location_id_for()
+
+    def location_id_for(self, name: str) -> Optional[str]:
+        """Resolve a scene's location name: exact (case-insensitive) match,
+        then partial match. Each distinct name is resolved once."""
+        key = name.lower()
+        if key not in self.resolved_locations:
+            location_id = self.location_ids_by_name.get(key)
+            if not location_id and key:
+                location_id = next(
+                    (lid for loc_name, lid in self.location_names if key in loc_name or loc_name in key),
+                    None
+                )
+            self.resolved_locations[key] = location_id
+        return self.resolved_locations[key]
+
+
+_STRUCTURE_CACHE = LRUCache(maxsize=64)
+
+# Serialized EpisodeDetail bytes keyed by (episode_id, *version)
+_EPISODE_DETAIL_CACHE = LRUCache(maxsize=256)
+
+# Formatted screenplay text keyed by (episode_id, *version)
+_SCREENPLAY_CACHE = LRUCache(maxsize=128)
+
+
+def _get_structure_payload(db: Session, project_id: str) -> _StructurePayload:
+    """Return the project's structure payload, rebuilding it only when the
+    characters or locations changed (row count / latest updated_at)."""
+    char_version = db.query(func.count(Character.id), func.max(Character.updated_at)).filter(
+        Character.project_id == project_id
+    ).one()
+    loc_version = db.query(func.count(Location.id), func.max(Location.updated_at)).filter(
+        Location.project_id == project_id
+    ).one()
+    key = (project_id, tuple(char_version), tuple(loc_version))
+
+    payload = _STRUCTURE_CACHE.get(key)
+    if payload is not None:
+        return payload
+
+    characters = db.query(Character).options(load_only(
+        Character.id, Character.name, Character.role, Character.archetype,
+        Character.physical_description, Character.personality
+    )).filter(Character.project_id == project_id).all()
+    locations = db.query(Location).options(load_only(
+        Location.id, Location.name, Location.type, Location.description, Location.visual_details
+    )).filter(Location.project_id == project_id).all()
+
+    payload = _StructurePayload(
+        characters_data=[
+            {
+                "name": c.name,
+                "role": c.role,
+                "archetype": c.archetype,
+                "physical_description": c.physical_description,
+                "personality": c.personality
+            }
+            for c in characters
+        ],
+        locations_data=[
+            {
+                "name": l.name,
+                "type": l.type,
+                "description": l.description,
+                "visual_details": l.visual_details
+            }
+            for l in locations
+        ],
+        # Built in reverse so the first row wins on duplicate names
+        character_ids_by_name={c.name.lower(): c.id for c in reversed(characters)},
+        location_ids_by_name={l.name.lower(): l.id for l in reversed(locations)},
+        location_names=[(l.name.lower(), l.id) for l in locations],
+        resolved_locations={},
+    )
+    _STRUCTURE_CACHE.set(key, payload)
+    return payload
+
 router = APIRouter(prefix="/projects/{project_id}/episodes", tags=["episodes"])
 
 
-@router.get("", response_model=List[EpisodeResponse])
-def list_episodes(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
-    """List all generated episodes. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+@router.get("", response_model=List[EpisodeResponse], response_class=ORJSONResponse)
+def list_episodes(
+    request: Request,
+    response: Response,
+    project_id: str,
+    state: Optional[str] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """List all generated episodes. Optional ?state= filter (comma-separated).
+    Supports If-None-Match; the ETag changes whenever an episode row changes."""
+    if not db.query(Project.id).filter(Project.id == project_id).first():
         raise HTTPException(status_code=404, detail="Project not found")
 
-    episodes = project.episodes
+    count, last_updated = db.query(func.count(Episode.id), func.max(Episode.updated_at)).filter(
+        Episode.project_id == project_id
+    ).one()
+    etag = make_etag(project_id, count, last_updated, state)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    # Filter by state in SQL (unknown state names simply match nothing)
+    filters = [Episode.project_id == project_id]
     states = parse_state_filter(state)
     if states:
-        episodes = [e for e in episodes if e.state.value in states]
-    episodes = sorted(episodes, key=lambda x: x.episode_number)
-    return [_episode_to_response(ep) for ep in episodes]
+        filters.append(Episode.state.in_(state_members(GenerationState, states)))
+
+    # Only the columns EpisodeResponse serializes; scenes are counted, not loaded
+    episodes = db.query(Episode).options(
+        load_only(
+            Episode.id, Episode.project_id, Episode.episode_number, Episode.title,
+            Episode.cold_open, Episode.music_cue, Episode.cliffhanger_moment,
+            Episode.state, Episode.created_at
+        )
+    ).filter(*filters).order_by(Episode.episode_number).all()
+
+    scene_counts = dict(
+        db.query(Scene.episode_id, func.count(Scene.id))
+        .join(Episode, Scene.episode_id == Episode.id)
+        .filter(*filters)
+        .group_by(Scene.episode_id)
+        .all()
+    ) if episodes else {}
+    return [_episode_to_response(ep, scene_counts.get(ep.id, 0)) for ep in episodes]
 
 
 @router.post("/generate")
@@ -59,30 +258,42 @@ async def generate_episodes(
     request: Request,
     project_id: str,
     body: GenerateEpisodesRequest = None,
+    project: Project = Depends(require_project()),
     db: Session = Depends(get_db)
 ):
     """Generate next batch of episode scripts (Step 5)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check prerequisites
-    if not all(c.state == StructureState.APPROVED for c in project.characters):
-        raise HTTPException(status_code=400, detail="All characters must be approved first")
-    if not all(l.state == StructureState.APPROVED for l in project.locations):
-        raise HTTPException(status_code=400, detail="All locations must be approved first")
-    if not all(e.state == StructureState.APPROVED for e in project.episode_summaries):
-        raise HTTPException(status_code=400, detail="All episode summaries must be approved first")
+    # Check prerequisites (EXISTS queries stop at the first unapproved row)
+    prerequisites = [
+        (Character, "All characters must be approved first"),
+        (Location, "All locations must be approved first"),
+        (EpisodeSummary, "All episode summaries must be approved first"),
+    ]
+    for model, detail in prerequisites:
+        has_unapproved = db.query(
+            db.query(model.id).filter(
+                model.project_id == project_id,
+                model.state != StructureState.APPROVED
+            ).exists()
+        ).scalar()
+        if has_unapproved:
+            raise HTTPException(status_code=400, detail=detail)
     
     batch_size = body.batch_size if body else 5
     
-    # Find which episodes still need to be generated (include stuck GENERATING ones)
-    done_numbers = {ep.episode_number for ep in project.episodes
-                    if ep.state not in (GenerationState.PENDING, GenerationState.GENERATING)}
-    summaries_to_generate = [
-        s for s in sorted(project.episode_summaries, key=lambda x: x.episode_number)
-        if s.episode_number not in done_numbers
-    ][:batch_size]
+    # Episodes already written (everything not PENDING/GENERATING, so stuck
+    # GENERATING ones are picked up again); these also form the context
+    done_episodes = db.query(Episode.episode_number, Episode.title).filter(
+        Episode.project_id == project_id,
+        Episode.state.in_([GenerationState.GENERATED, GenerationState.APPROVED])
+    ).order_by(Episode.episode_number).all()
+    done_numbers = {number for number, _ in done_episodes}
+
+    # Next summaries to generate, filtered and limited in SQL
+    summaries_to_generate = db.query(EpisodeSummary).filter(
+        EpisodeSummary.project_id == project_id,
+        EpisodeSummary.episode_number.notin_(done_numbers)
+    ).order_by(EpisodeSummary.episode_number).limit(batch_size).all()
 
     if not summaries_to_generate:
         raise HTTPException(status_code=400, detail="All episodes have been generated")
@@ -91,104 +302,91 @@ async def generate_episodes(
     approved_idea = next((i for i in project.ideas if i.state == IdeaState.APPROVED), None)
     series_title = approved_idea.title if approved_idea else "Untitled"
 
-    # Get character and location data for generation
-    characters_data = [
-        {
-            "name": c.name,
-            "role": c.role,
-            "archetype": c.archetype,
-            "physical_description": c.physical_description,
-            "personality": c.personality
-        }
-        for c in project.characters
-    ]
-
-    locations_data = [
-        {
-            "name": l.name,
-            "type": l.type,
-            "description": l.description,
-            "visual_details": l.visual_details
-        }
-        for l in project.locations
-    ]
+    # Get character and location data for generation (memoized per structure version)
+    structure = _get_structure_payload(db, project_id)
+    characters_data = structure.characters_data
+    locations_data = structure.locations_data
 
     # Get previous episodes for context
+    summary_by_num = dict(reversed(db.query(EpisodeSummary.episode_number, EpisodeSummary.summary).filter(
+        EpisodeSummary.project_id == project_id,
+        EpisodeSummary.episode_number.in_(done_numbers)
+    ).order_by(EpisodeSummary.episode_number).all()))
     previous_episodes = [
         {
-            "episode_number": ep.episode_number,
-            "title": ep.title,
-            "summary": next(
-                (s.summary for s in project.episode_summaries if s.episode_number == ep.episode_number),
-                ""
-            )
+            "episode_number": number,
+            "title": title,
+            "summary": summary_by_num.get(number, "")
         }
-        for ep in sorted(project.episodes, key=lambda x: x.episode_number)
-        if ep.state in [GenerationState.GENERATED, GenerationState.APPROVED]
+        for number, title in done_episodes
     ]
 
-    generated_episodes = []
+    # Load every existing episode row for this batch in one query
+    existing_by_num = {
+        e.episode_number: e
+        for e in db.query(Episode).filter(
+            Episode.project_id == project_id,
+            Episode.episode_number.in_([s.episode_number for s in summaries_to_generate])
+        ).all()
+    }
 
-    # Process summaries in chunks for batch AI calls
-    for chunk_start in range(0, len(summaries_to_generate), AI_BATCH_SIZE):
-        chunk = summaries_to_generate[chunk_start:chunk_start + AI_BATCH_SIZE]
-
-        # Create/prepare Episode DB records for the chunk
-        episode_map = {}  # episode_number -> Episode ORM object
-        for summary in chunk:
-            existing = db.query(Episode).filter(
-                Episode.project_id == project_id,
-                Episode.episode_number == summary.episode_number
-            ).first()
-
-            if existing:
-                episode = existing
-                if episode.state == GenerationState.GENERATING:
-                    episode.reset_for_regen()
-            else:
-                episode = Episode(
-                    project_id=project_id,
-                    episode_number=summary.episode_number,
-                    state=GenerationState.PENDING
-                )
-                db.add(episode)
-                db.flush()
+    # Create/prepare Episode DB records for everything in this batch
+    episode_map = {}  # episode_number -> Episode ORM object
+    for summary in summaries_to_generate:
+        existing = existing_by_num.get(summary.episode_number)
+
+        if existing:
+            episode = existing
+            if episode.state == GenerationState.GENERATING:
+                episode.reset_for_regen()
+        else:
+            # Client-side id, so the whole batch is written by the single flush below
+            episode = Episode(
+                id=generate_uuid(),
+                project_id=project_id,
+                episode_number=summary.episode_number,
+                state=GenerationState.PENDING
+            )
+            db.add(episode)
 
-            episode.mark_generating()
-            episode_map[summary.episode_number] = episode
-        db.flush()
+        episode.mark_generating()
+        episode_map[summary.episode_number] = episode
+    db.flush()
 
-        # Build summary data for the batch
-        chunk_summaries = [
-            {
-                "episode_number": s.episode_number,
-                "title": s.title,
-                "summary": s.summary,
-                "key_beats": s.key_beats or [],
-                "cliffhanger": s.cliffhanger
-            }
-            for s in chunk
-        ]
+    # Split into chunks of 1-3 episodes per AI call (to stay within token limits)
+    chunks = [
+        summaries_to_generate[i:i + AI_BATCH_SIZE]
+        for i in range(0, len(summaries_to_generate), AI_BATCH_SIZE)
+    ]
 
-        # Single AI call for 1-3 episodes
-        try:
-            scripts_batch = await generator.generate_episode_scripts_batch(
-                episode_summaries=chunk_summaries,
+    # Run the AI calls for all chunks concurrently (bounded by
+    # MAX_CONCURRENT_SCRIPT_CALLS). Every chunk sees the same previous-episode
+    # context: episodes generated before this request, not earlier chunks.
+    try:
+        batches = await asyncio.gather(*[
+            _generate_scripts_chunk(
+                chunk,
                 characters=characters_data,
                 locations=locations_data,
                 series_title=series_title,
                 previous_episodes=previous_episodes if previous_episodes else None
             )
-        except Exception as e:
-            # Rollback all episodes in this chunk to PENDING so retry works
-            for ep in episode_map.values():
-                ep.reset_for_regen()
-            db.flush()
-            raise HTTPException(status_code=500, detail=f"Script generation failed: {str(e)}")
+            for chunk in chunks
+        ])
+    except Exception as e:
+        # Rollback all episodes in this batch to PENDING so retry works
+        for ep in episode_map.values():
+            ep.reset_for_regen()
+        db.flush()
+        raise HTTPException(status_code=500, detail=f"Script generation failed: {str(e)}")
+
+    generated_episodes = []
 
+    # Write the results sequentially on the request's session
+    for chunk, scripts_batch in zip(chunks, batches):
         # Process each episode from the batch response
-        for script_data in scripts_batch:
-            ep_number = script_data.get("episodeNumber", script_data.get("episode_number"))
+        for script_data in map(_normalize_keys, scripts_batch):
+            ep_number = script_data.get("episode_number")
             if ep_number is None:
                 continue
 
@@ -200,79 +398,65 @@ async def generate_episodes(
             if not summary:
                 continue
 
-            # Update episode with generated data (camelCase with snake_case fallback)
+            # Update episode with generated data
             episode.title = script_data.get("title", summary.title)
-            episode.cold_open = script_data.get("coldOpen", script_data.get("cold_open", ""))
-            episode.music_cue = script_data.get("musicCue", script_data.get("music_cue", ""))
-            episode.cliffhanger_moment = script_data.get("cliffhangerMoment", script_data.get("cliffhanger_moment", ""))
+            episode.cold_open = script_data.get("cold_open", "")
+            episode.music_cue = script_data.get("music_cue", "")
+            episode.cliffhanger_moment = script_data.get("cliffhanger_moment", "")
 
             # Clear existing scenes if regenerating
-            for scene in episode.scenes:
-                db.delete(scene)
-            db.flush()
+            _delete_episode_scenes(db, episode.id)
 
-            # Create scenes
-            for scene_data in script_data.get("scenes", []):
+            # Build scene and dialogue rows up front; scene ids are generated
+            # here so dialogue lines can reference them without a flush
+            scene_mappings = []
+            dialogue_mappings = []
+            for scene_data in map(_normalize_keys, script_data.get("scenes", [])):
                 # Find location by name (case-insensitive, with partial match fallback)
-                location_name = scene_data.get("location", "")
-                location = next(
-                    (l for l in project.locations if l.name.lower() == location_name.lower()),
-                    None
-                )
-                if not location and location_name:
-                    location = next(
-                        (l for l in project.locations
-                         if location_name.lower() in l.name.lower() or l.name.lower() in location_name.lower()),
-                        None
-                    )
-
-                scene = Scene(
-                    episode_id=episode.id,
-                    location_id=location.id if location else None,
-                    scene_number=scene_data.get("sceneNumber", scene_data.get("scene_number", 1)),
-                    title=scene_data.get("title", ""),
-                    duration_seconds=_parse_duration(scene_data.get("duration", scene_data.get("duration_seconds", 15))),
-                    time_of_day=scene_data.get("timeOfDay", scene_data.get("time_of_day", "day")),
-                    mood=scene_data.get("mood", "dramatic"),
-                    action_beats=scene_data.get("actionBeats", scene_data.get("action_beats", [])),
-                    camera_notes=scene_data.get("cameraWork", scene_data.get("camera_notes", ""))
-                )
-                db.add(scene)
-                db.flush()
+                location_id = structure.location_id_for(scene_data.get("location", ""))
+
+                scene_id = generate_uuid()
+                scene_mappings.append({
+                    "id": scene_id,
+                    "episode_id": episode.id,
+                    "location_id": location_id,
+                    "scene_number": scene_data.get("scene_number", 1),
+                    "title": scene_data.get("title", ""),
+                    "duration_seconds": _parse_duration(scene_data.get("duration_seconds", 15)),
+                    "time_of_day": scene_data.get("time_of_day", "day"),
+                    "mood": scene_data.get("mood", "dramatic"),
+                    "action_beats": scene_data.get("action_beats", []),
+                    "camera_notes": scene_data.get("camera_notes", "")
+                })
 
                 # Create dialogue lines
                 for i, line_data in enumerate(scene_data.get("dialogue", [])):
                     char_name = line_data.get("character", "")
-                    character = next(
-                        (c for c in project.characters if c.name.lower() == char_name.lower()),
-                        None
-                    )
-
-                    dialogue = DialogueLine(
-                        scene_id=scene.id,
-                        character_id=character.id if character else None,
-                        character_name=char_name,
-                        line_number=i + 1,
-                        line_text=line_data.get("line", ""),
-                        direction=line_data.get("direction", ""),
-                        emotion=line_data.get("emotion", "")
-                    )
-                    db.add(dialogue)
+                    dialogue_mappings.append({
+                        "id": generate_uuid(),
+                        "scene_id": scene_id,
+                        "character_id": structure.character_ids_by_name.get(char_name.lower()),
+                        "character_name": char_name,
+                        "line_number": i + 1,
+                        "line_text": line_data.get("line", ""),
+                        "direction": line_data.get("direction", ""),
+                        "emotion": line_data.get("emotion", "")
+                    })
+
+            # One multi-row INSERT per table instead of a flush per row
+            if scene_mappings:
+                db.execute(insert(Scene), scene_mappings)
+            if dialogue_mappings:
+                db.execute(insert(DialogueLine), dialogue_mappings)
+            db.expire(episode, ["scenes"])
 
             episode.mark_generated()
             generated_episodes.append(episode)
 
-            # Add to previous episodes for next chunk's context
-            previous_episodes.append({
-                "episode_number": episode.episode_number,
-                "title": episode.title,
-                "summary": summary.summary
-            })
-
-        # Rollback any episodes that stayed GENERATING (AI didn't return them)
-        for ep in episode_map.values():
-            if ep.state == GenerationState.GENERATING:
-                ep.reset_for_regen()
+    # Rollback any episodes that stayed GENERATING (AI didn't return them)
+    for ep in episode_map.values():
+        if ep.state == GenerationState.GENERATING:
+            ep.reset_for_regen()
 
     # Update project step
     if project.current_step < 5:
@@ -280,11 +464,16 @@ async def generate_episodes(
 
     db.commit()
 
+    started = db.query(func.count(Episode.id)).filter(
+        Episode.project_id == project_id,
+        Episode.state != GenerationState.PENDING
+    ).scalar()
+
     return {
         "status": "generated",
         "episodes_generated": len(generated_episodes),
         "episode_numbers": [ep.episode_number for ep in generated_episodes],
-        "remaining": project.num_episodes - len([e for e in project.episodes if e.state != GenerationState.PENDING])
+        "remaining": project.num_episodes - started
     }
 
 
@@ -292,24 +481,42 @@ async def generate_episodes(
 episode_router = APIRouter(prefix="/episodes", tags=["episodes"])
 
 
-@episode_router.get("/{episode_id}", response_model=EpisodeDetail)
-def get_episode(episode_id: str, db: Session = Depends(get_db)):
-    """Get full episode with scenes and dialogue"""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
-    if not episode:
+@episode_router.get("/{episode_id}", response_model=EpisodeDetail, response_class=ORJSONResponse)
+def get_episode(episode_id: str, request: Request, db: Session = Depends(get_db)):
+    """Get full episode with scenes and dialogue. Supports If-None-Match."""
+    scene_ids = select(Scene.id).where(Scene.episode_id == episode_id)
+    version = db.query(
+        Episode.updated_at,
+        select(func.count(ImagePrompt.id)).where(ImagePrompt.scene_id.in_(scene_ids)).scalar_subquery(),
+        select(func.count(VideoPrompt.id)).where(VideoPrompt.scene_id.in_(scene_ids)).scalar_subquery(),
+    ).filter(Episode.id == episode_id).first()
+    if not version:
         raise HTTPException(status_code=404, detail="Episode not found")
-    
-    return _episode_to_detail(episode)
+    etag = make_etag(episode_id, *version)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Same version -> same body; serve the already-encoded bytes
+    cache_key = (episode_id, *version)
+    body = _EPISODE_DETAIL_CACHE.get(cache_key)
+    if body is None:
+        episode = db.query(Episode).options(
+            selectinload(Episode.scenes).selectinload(Scene.dialogue_lines),
+            selectinload(Episode.scenes).selectinload(Scene.image_prompts),
+            selectinload(Episode.scenes).selectinload(Scene.video_prompts),
+        ).filter(Episode.id == episode_id).first()
+        if not episode:
+            raise HTTPException(status_code=404, detail="Episode not found")
+        body = orjson.dumps(_episode_to_detail(episode).model_dump(mode="json"))
+        _EPISODE_DETAIL_CACHE.set(cache_key, body)
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @episode_router.post("/{episode_id}/approve")
 def approve_episode(episode_id: str, db: Session = Depends(get_db)):
     """Approve an episode"""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
-    if not episode:
-        raise HTTPException(status_code=404, detail="Episode not found")
-
-    episode.approve()
+    transition_by_id(db, Episode, episode_id, GenerationState.APPROVED)
     db.commit()
     return {"status": "approved", "episode_id": episode_id}
 
@@ -317,7 +524,24 @@ def approve_episode(episode_id: str, db: Session = Depends(get_db)):
 @episode_router.get("/{episode_id}/screenplay")
 def get_episode_screenplay(episode_id: str, db: Session = Depends(get_db)):
     """Get episode formatted as a Hollywood screenplay"""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
+    # Scene headings also show location names/types, so their edits are part of the version
+    version = db.query(
+        Episode.updated_at,
+        select(func.count(Location.id)).where(Location.project_id == Episode.project_id).scalar_subquery(),
+        select(func.max(Location.updated_at)).where(Location.project_id == Episode.project_id).scalar_subquery(),
+    ).filter(Episode.id == episode_id).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="Episode not found")
+
+    cache_key = (episode_id, *version)
+    screenplay = _SCREENPLAY_CACHE.get(cache_key)
+    if screenplay is not None:
+        return {"screenplay": screenplay}
+
+    episode = db.query(Episode).options(
+        selectinload(Episode.scenes).joinedload(Scene.location),
+        selectinload(Episode.scenes).selectinload(Scene.dialogue_lines),
+    ).filter(Episode.id == episode_id).first()
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
 
@@ -331,7 +555,7 @@ def get_episode_screenplay(episode_id: str, db: Session = Depends(get_db)):
         "scenes": []
     }
 
-    for scene in sorted(episode.scenes, key=lambda s: s.scene_number):
+    for scene in episode.scenes:
         scene_data = {
             "scene_number": scene.scene_number,
             "title": scene.title,
@@ -349,18 +573,28 @@ def get_episode_screenplay(episode_id: str, db: Session = Depends(get_db)):
                     "direction": line.direction,
                     "emotion": line.emotion
                 }
-                for line in sorted(scene.dialogue_lines, key=lambda d: d.line_number)
+                for line in scene.dialogue_lines
             ]
         }
         ep_data["scenes"].append(scene_data)
 
     screenplay = format_episode_screenplay(ep_data)
+    _SCREENPLAY_CACHE.set(cache_key, screenplay)
     return {"screenplay": screenplay}
 
 
-def _episode_to_response(episode: Episode) -> EpisodeResponse:
-    """Convert Episode to response schema"""
-    return EpisodeResponse(
+def _episode_to_response(episode: Episode, scenes_count: Optional[int] = None) -> EpisodeResponse:
+    """Convert Episode to response schema. Pass scenes_count when it was
+    counted in SQL to avoid loading the scenes collection.
+
+    In that case the row is a load_only() partial, so the response is built
+    with model_construct() instead of model_validate() (which would read
+    every attribute, including the scenes collection). The state is mapped
+    to the schema's mirror enum, which the serializer expects.
+    """
+    if scenes_count is None:
+        return EpisodeResponse.model_validate(episode)
+    return EpisodeResponse.model_construct(
         id=episode.id,
         project_id=episode.project_id,
         episode_number=episode.episode_number,
@@ -368,67 +602,23 @@ def _episode_to_response(episode: Episode) -> EpisodeResponse:
         cold_open=episode.cold_open,
         music_cue=episode.music_cue,
         cliffhanger_moment=episode.cliffhanger_moment,
-        state=episode.state,
-        scenes_count=len(episode.scenes),
+        state=GenerationStateOut(episode.state.value),
+        scenes_count=scenes_count,
         created_at=episode.created_at
     )
 
 
 def _episode_to_detail(episode: Episode) -> EpisodeDetail:
-    """Convert Episode to detailed response with scenes"""
-    scenes = []
-    for scene in sorted(episode.scenes, key=lambda s: s.scene_number):
-        dialogue_lines = [
-            DialogueLineResponse(
-                id=d.id,
-                scene_id=d.scene_id,
-                character_id=d.character_id,
-                character_name=d.character_name,
-                line_number=d.line_number,
-                line_text=d.line_text,
-                direction=d.direction,
-                emotion=d.emotion
-            )
-            for d in sorted(scene.dialogue_lines, key=lambda d: d.line_number)
-        ]
-        
-        scenes.append(SceneResponse(
-            id=scene.id,
-            episode_id=scene.episode_id,
-            location_id=scene.location_id,
-            scene_number=scene.scene_number,
-            title=scene.title,
-            duration_seconds=scene.duration_seconds,
-            time_of_day=scene.time_of_day,
-            mood=scene.mood,
-            action_beats=scene.action_beats,
-            camera_notes=scene.camera_notes,
-            dialogue_lines=dialogue_lines,
-            image_prompts_count=len(scene.image_prompts),
-            video_prompts_count=len(scene.video_prompts)
-        ))
-    
-    return EpisodeDetail(
-        id=episode.id,
-        project_id=episode.project_id,
-        episode_number=episode.episode_number,
-        title=episode.title,
-        cold_open=episode.cold_open,
-        music_cue=episode.music_cue,
-        cliffhanger_moment=episode.cliffhanger_moment,
-        state=episode.state,
-        scenes_count=len(episode.scenes),
-        created_at=episode.created_at,
-        scenes=scenes
-    )
+    """Convert Episode to detailed response with scenes. Validated straight
+    from the ORM objects (from_attributes); load scenes, dialogue and
+    prompts eagerly first, the counts are read off those collections.
+    """
+    return EpisodeDetail.model_validate(episode)
 
 
 @episode_router.post("/{episode_id}/unapprove")
 def unapprove_episode(episode_id: str, db: Session = Depends(get_db)):
     """Unapprove an episode (revert to generated for re-review)"""
-    episode = db.query(Episode).filter(Episode.id == episode_id).first()
-    if not episode:
-        raise HTTPException(status_code=404, detail="Episode not found")
-    episode.unapprove()
+    transition_by_id(db, Episode, episode_id, GenerationState.GENERATED)
     db.commit()
     return {"status": "unapproved", "episode_id": episode_id}
@@ -3,14 +3,17 @@ Export API routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-import json
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+import gzip
+import orjson
 import os
 from datetime import datetime
 
 from app.database.session import get_db
-from app.models.models import Project
+from app.models.models import (
+    Project, Character, Location, Episode, Scene, ImagePrompt, VideoPrompt
+)
 from app.services.script_formatter import format_project_screenplays
 
 router = APIRouter(prefix="/projects/{project_id}/export", tags=["export"])
@@ -18,15 +21,146 @@ router = APIRouter(prefix="/projects/{project_id}/export", tags=["export"])
 OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "outputs")
 
 
+# ============================================================================
+# EAGER LOADING OPTIONS (one query per level instead of one per row)
+# ============================================================================
+
+def _load_project_graph(
+    db: Session,
+    project_id: str,
+    *,
+    need_scripts: bool = False,
+    need_prompts: bool = False,
+    need_refs: bool = False,
+    need_story: bool = False,
+) -> Project:
+    """Load a project with just the collections an export needs, one query per level.
+
+    need_scripts: episodes → scenes with location and dialogue
+    need_prompts: episodes → scenes with image and video prompts
+    need_refs:    characters/locations with their reference images, and thumbnails
+    need_story:   ideas and episode summaries
+    """
+    options = []
+    if need_scripts or need_prompts:
+        scenes = selectinload(Project.episodes).selectinload(Episode.scenes)
+        if need_scripts:
+            options += [
+                scenes.joinedload(Scene.location),
+                scenes.selectinload(Scene.dialogue_lines),
+            ]
+        if need_prompts:
+            options += [
+                scenes.selectinload(Scene.image_prompts),
+                scenes.selectinload(Scene.video_prompts),
+            ]
+    if need_refs:
+        options += [
+            selectinload(Project.characters).joinedload(Character.reference),
+            selectinload(Project.locations).joinedload(Location.reference),
+            selectinload(Project.thumbnails),
+        ]
+    if need_story:
+        options += [
+            selectinload(Project.ideas),
+            selectinload(Project.episode_summaries),
+        ]
+
+    project = db.query(Project).options(*options).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+
+def _episode_export_options():
+    """Scenes with everything export_project serializes, loaded per batch of episodes."""
+    scenes = selectinload(Episode.scenes)
+    return [
+        scenes.joinedload(Scene.location),
+        scenes.selectinload(Scene.dialogue_lines),
+        scenes.selectinload(Scene.image_prompts).selectinload(ImagePrompt.generated_image),
+        scenes.selectinload(Scene.video_prompts).selectinload(VideoPrompt.generated_video),
+    ]
+
+
+EXPORT_EPISODE_BATCH = 50
+
+
+def _export_episode_dict(episode: Episode) -> dict:
+    return {
+        "id": episode.id,
+        "episode_number": episode.episode_number,
+        "title": episode.title,
+        "cold_open": episode.cold_open,
+        "music_cue": episode.music_cue,
+        "cliffhanger_moment": episode.cliffhanger_moment,
+        "state": episode.state.value,
+        "scenes": [
+            {
+                "id": scene.id,
+                "scene_number": scene.scene_number,
+                "title": scene.title,
+                "location": scene.location.name if scene.location else None,
+                "time_of_day": scene.time_of_day,
+                "duration_seconds": scene.duration_seconds,
+                "mood": scene.mood,
+                "action_beats": scene.action_beats,
+                "camera_notes": scene.camera_notes,
+                "dialogue": [
+                    {
+                        "character": line.character_name,
+                        "line": line.line_text,
+                        "direction": line.direction,
+                        "emotion": line.emotion
+                    }
+                    for line in scene.dialogue_lines
+                ],
+                "image_prompts": [
+                    {
+                        "id": prompt.id,
+                        "shot_number": prompt.shot_number,
+                        "shot_type": prompt.shot_type,
+                        "description": prompt.description,
+                        "prompt_text": prompt.prompt_text,
+                        "negative_prompt": prompt.negative_prompt,
+                        "state": prompt.state.value,
+                        "generated_image": {
+                            "id": prompt.generated_image.id,
+                            "image_path": prompt.generated_image.image_path,
+                            "state": prompt.generated_image.state.value
+                        } if prompt.generated_image else None
+                    }
+                    for prompt in scene.image_prompts
+                ],
+                "video_prompts": [
+                    {
+                        "id": vp.id,
+                        "segment_number": vp.segment_number,
+                        "prompt_text": vp.prompt_text,
+                        "duration_seconds": vp.duration_seconds,
+                        "camera_movement": vp.camera_movement,
+                        "state": vp.state.value,
+                        "generated_video": {
+                            "id": vp.generated_video.id,
+                            "video_path": vp.generated_video.video_path,
+                            "state": vp.generated_video.state.value
+                        } if vp.generated_video else None
+                    }
+                    for vp in scene.video_prompts
+                ]
+            }
+            for scene in episode.scenes
+        ]
+    }
+
+
 @router.get("")
 def export_project(project_id: str, db: Session = Depends(get_db)):
     """Export full project as JSON"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = _load_project_graph(db, project_id, need_refs=True, need_story=True)
     
-    # Build export data
-    export_data = {
+    # Everything except episodes is small; build it up front
+    head = {
         "meta": {
             "exported_at": datetime.utcnow().isoformat(),
             "project_id": project.id,
@@ -106,113 +240,69 @@ def export_project(project_id: str, db: Session = Depends(get_db)):
                 "emotional_arc": ep.emotional_arc,
                 "state": ep.state.value
             }
-            for ep in sorted(project.episode_summaries, key=lambda x: x.episode_number)
+            for ep in project.episode_summaries
         ],
-        "episodes": [
-            {
-                "id": episode.id,
-                "episode_number": episode.episode_number,
-                "title": episode.title,
-                "cold_open": episode.cold_open,
-                "music_cue": episode.music_cue,
-                "cliffhanger_moment": episode.cliffhanger_moment,
-                "state": episode.state.value,
-                "scenes": [
-                    {
-                        "id": scene.id,
-                        "scene_number": scene.scene_number,
-                        "title": scene.title,
-                        "location": scene.location.name if scene.location else None,
-                        "time_of_day": scene.time_of_day,
-                        "duration_seconds": scene.duration_seconds,
-                        "mood": scene.mood,
-                        "action_beats": scene.action_beats,
-                        "camera_notes": scene.camera_notes,
-                        "dialogue": [
-                            {
-                                "character": line.character_name,
-                                "line": line.line_text,
-                                "direction": line.direction,
-                                "emotion": line.emotion
-                            }
-                            for line in sorted(scene.dialogue_lines, key=lambda x: x.line_number)
-                        ],
-                        "image_prompts": [
-                            {
-                                "id": prompt.id,
-                                "shot_number": prompt.shot_number,
-                                "shot_type": prompt.shot_type,
-                                "description": prompt.description,
-                                "prompt_text": prompt.prompt_text,
-                                "negative_prompt": prompt.negative_prompt,
-                                "state": prompt.state.value,
-                                "generated_image": {
-                                    "id": prompt.generated_image.id,
-                                    "image_path": prompt.generated_image.image_path,
-                                    "state": prompt.generated_image.state.value
-                                } if prompt.generated_image else None
-                            }
-                            for prompt in sorted(scene.image_prompts, key=lambda x: x.shot_number)
-                        ],
-                        "video_prompts": [
-                            {
-                                "id": vp.id,
-                                "segment_number": vp.segment_number,
-                                "prompt_text": vp.prompt_text,
-                                "duration_seconds": vp.duration_seconds,
-                                "camera_movement": vp.camera_movement,
-                                "state": vp.state.value,
-                                "generated_video": {
-                                    "id": vp.generated_video.id,
-                                    "video_path": vp.generated_video.video_path,
-                                    "state": vp.generated_video.state.value
-                                } if vp.generated_video else None
-                            }
-                            for vp in sorted(scene.video_prompts, key=lambda x: x.segment_number)
-                        ]
-                    }
-                    for scene in sorted(episode.scenes, key=lambda x: x.scene_number)
-                ]
-            }
-            for episode in sorted(project.episodes, key=lambda x: x.episode_number)
-        ],
-        "thumbnails": [
-            {
-                "id": thumb.id,
-                "episode_id": thumb.episode_id,
-                "orientation": thumb.orientation,
-                "prompt_text": thumb.prompt_text,
-                "image_path": thumb.image_path,
-                "state": thumb.state.value
-            }
-            for thumb in project.thumbnails
-        ]
     }
-    
-    # Save to file
-    os.makedirs(OUTPUTS_DIR, exist_ok=True)
+    thumbnails = [
+        {
+            "id": thumb.id,
+            "episode_id": thumb.episode_id,
+            "orientation": thumb.orientation,
+            "prompt_text": thumb.prompt_text,
+            "image_path": thumb.image_path,
+            "state": thumb.state.value
+        }
+        for thumb in project.thumbnails
+    ]
+    episodes = (
+        db.query(Episode)
+        .options(*_episode_export_options())
+        .filter(Episode.project_id == project_id)
+        .order_by(Episode.episode_number)
+        .yield_per(EXPORT_EPISODE_BATCH)
+    )
+
+    def chunks():
+        # Stream the episodes one at a time so peak memory is a batch, not the project
+        yield orjson.dumps(head)[:-1] + b',"episodes":['
+        for i, episode in enumerate(episodes):
+            yield (b',' if i else b'') + orjson.dumps(_export_episode_dict(episode))
+        yield b'],"thumbnails":' + orjson.dumps(thumbnails) + b'}'
+
     filename = f"{project.id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-    filepath = os.path.join(OUTPUTS_DIR, filename)
-    
-    with open(filepath, 'w') as f:
-        json.dump(export_data, f, indent=2)
-    
-    return FileResponse(
-        path=filepath,
-        filename=filename,
-        media_type='application/json'
+    os.makedirs(OUTPUTS_DIR, exist_ok=True)
+    archive_path = os.path.join(OUTPUTS_DIR, filename + ".gz")
+
+    def body():
+        # Keep a gzipped copy in outputs/ as the bytes go out; level 1 is cheap
+        # and still shrinks the repetitive JSON several times over
+        partial_path = archive_path + ".part"
+        try:
+            with gzip.open(partial_path, "wb", compresslevel=1) as archive:
+                for chunk in chunks():
+                    archive.write(chunk)
+                    yield chunk
+            os.replace(partial_path, archive_path)
+        except BaseException:
+            # Client went away or the query failed: don't leave a truncated archive
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+    return StreamingResponse(
+        body(),
+        media_type='application/json',
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
 
 @router.get("/scripts")
 def export_scripts_only(project_id: str, db: Session = Depends(get_db)):
     """Export just the episode scripts as JSON"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = _load_project_graph(db, project_id, need_scripts=True)
     
     scripts = []
-    for episode in sorted(project.episodes, key=lambda x: x.episode_number):
+    for episode in project.episodes:
         script = {
             "episode_number": episode.episode_number,
             "title": episode.title,
@@ -221,7 +311,7 @@ def export_scripts_only(project_id: str, db: Session = Depends(get_db)):
             "scenes": []
         }
         
-        for scene in sorted(episode.scenes, key=lambda x: x.scene_number):
+        for scene in episode.scenes:
             scene_data = {
                 "scene_number": scene.scene_number,
                 "title": scene.title,
@@ -231,7 +321,7 @@ def export_scripts_only(project_id: str, db: Session = Depends(get_db)):
                 "dialogue": []
             }
             
-            for line in sorted(scene.dialogue_lines, key=lambda x: x.line_number):
+            for line in scene.dialogue_lines:
                 if line.direction:
                     scene_data["dialogue"].append({
                         "character": line.character_name,
@@ -261,9 +351,7 @@ def export_scripts_only(project_id: str, db: Session = Depends(get_db)):
 @router.get("/prompts")
 def export_all_prompts(project_id: str, db: Session = Depends(get_db)):
     """Export all image and video prompts"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = _load_project_graph(db, project_id, need_prompts=True, need_refs=True)
     
     prompts = {
         "character_refs": [
@@ -292,9 +380,9 @@ def export_all_prompts(project_id: str, db: Session = Depends(get_db)):
         ]
     }
     
-    for episode in sorted(project.episodes, key=lambda x: x.episode_number):
-        for scene in sorted(episode.scenes, key=lambda x: x.scene_number):
-            for img_prompt in sorted(scene.image_prompts, key=lambda x: x.shot_number):
+    for episode in project.episodes:
+        for scene in episode.scenes:
+            for img_prompt in scene.image_prompts:
                 prompts["image_prompts"].append({
                     "episode": episode.episode_number,
                     "scene": scene.scene_number,
@@ -304,7 +392,7 @@ def export_all_prompts(project_id: str, db: Session = Depends(get_db)):
                     "negative_prompt": img_prompt.negative_prompt
                 })
             
-            for vid_prompt in sorted(scene.video_prompts, key=lambda x: x.segment_number):
+            for vid_prompt in scene.video_prompts:
                 prompts["video_prompts"].append({
                     "episode": episode.episode_number,
                     "scene": scene.scene_number,
@@ -320,13 +408,11 @@ def export_all_prompts(project_id: str, db: Session = Depends(get_db)):
 @router.get("/screenplay")
 def export_screenplay(project_id: str, db: Session = Depends(get_db)):
     """Export all episode scripts as a formatted Hollywood screenplay (.txt)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = _load_project_graph(db, project_id, need_scripts=True)
 
     # Build episode data dicts for the formatter
     episodes_data = []
-    for episode in sorted(project.episodes, key=lambda x: x.episode_number):
+    for episode in project.episodes:
         ep_data = {
             "episode_number": episode.episode_number,
             "title": episode.title,
@@ -336,7 +422,7 @@ def export_screenplay(project_id: str, db: Session = Depends(get_db)):
             "scenes": []
         }
 
-        for scene in sorted(episode.scenes, key=lambda x: x.scene_number):
+        for scene in episode.scenes:
             scene_data = {
                 "scene_number": scene.scene_number,
                 "title": scene.title,
@@ -354,7 +440,7 @@ def export_screenplay(project_id: str, db: Session = Depends(get_db)):
                         "direction": line.direction,
                         "emotion": line.emotion
                     }
-                    for line in sorted(scene.dialogue_lines, key=lambda x: x.line_number)
+                    for line in scene.dialogue_lines
                 ]
             }
             ep_data["scenes"].append(scene_data)
@@ -3,29 +3,46 @@ Ideas API routes (Step 1-2)
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
+from datetime import datetime
 
 from app.database.session import get_db
-from app.models.models import Project, Idea, IdeaState
+from app.models.models import Project, Idea, IdeaState, generate_uuid
 from app.models.schemas import IdeaResponse, GenerateIdeasRequest, CustomOutlineRequest
+from app.services.cache import LRUCache
 from app.services.generator import generator
-from app.api import parse_state_filter
+from app.api import parse_state_filter, state_members, load_project, cached_json, require_project, run_or_enqueue, transition_by_id
 from app.middleware.rate_limit import limiter, AI_GENERATION_LIMIT
 
 router = APIRouter(prefix="/projects/{project_id}/ideas", tags=["ideas"])
 
+# Encoded list bodies keyed by (project_id, state filter, idea count, latest updated_at)
+_IDEAS_CACHE = LRUCache(maxsize=128)
+
 
 @router.get("", response_model=List[IdeaResponse])
-def list_ideas(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def list_ideas(request: Request, project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
     """List all ideas for a project. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    version = db.query(
+        Project.id,
+        select(func.count(Idea.id)).where(Idea.project_id == project_id).scalar_subquery(),
+        select(func.max(Idea.updated_at)).where(Idea.project_id == project_id).scalar_subquery(),
+    ).filter(Project.id == project_id).first()
+    if not version:
         raise HTTPException(status_code=404, detail="Project not found")
-    states = parse_state_filter(state)
-    if states:
-        return [i for i in project.ideas if i.state.value in states]
-    return project.ideas
+
+    def build():
+        project = load_project(db, project_id, selectinload(Project.ideas))
+        ideas = project.ideas
+        states = parse_state_filter(state)
+        if states:
+            members = state_members(IdeaState, states)
+            ideas = [i for i in ideas if i.state in members]
+        return [IdeaResponse.model_validate(i).model_dump(mode="json") for i in ideas]
+
+    return cached_json(request, _IDEAS_CACHE, (project_id, state, *version[1:]), build)
 
 
 @router.post("/generate", response_model=List[IdeaResponse])
@@ -34,67 +51,76 @@ async def generate_ideas(
     request: Request,
     project_id: str,
     body: GenerateIdeasRequest = None,
+    background: bool = Query(False),
     db: Session = Depends(get_db)
 ):
     """Generate 3 new ideas for a project (Step 1)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    setting_hint = body.setting_hint if body else None
+    return await run_or_enqueue(
+        db, project_id, "ideas", background,
+        lambda db, project_id: _generate_ideas(db, project_id, setting_hint)
+    )
+
+
+async def _generate_ideas(db: Session, project_id: str, setting_hint: Optional[str]) -> List[IdeaResponse]:
+    if not db.query(Project.id).filter(Project.id == project_id).first():
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Clear existing ideas if regenerating
-    for idea in project.ideas:
-        db.delete(idea)
+    # Clear existing ideas if regenerating (one DELETE; ideas have no child rows)
+    db.execute(delete(Idea).where(Idea.project_id == project_id))
     
     # Generate new ideas
-    setting_hint = body.setting_hint if body else None
     ideas_data = await generator.generate_ideas(setting_hint)
     
+    # Every column is set client-side, so the response is built from the
+    # in-memory rows before commit expires them (no refresh round-trips)
+    now = datetime.utcnow()
     ideas = []
     for idea_data in ideas_data:
         idea = Idea(
+            id=generate_uuid(),
             project_id=project_id,
             title=idea_data.get("title", "Untitled"),
             setting=idea_data.get("setting", ""),
             logline=idea_data.get("logline", ""),
             hook=idea_data.get("hook", ""),
             main_conflict=idea_data.get("main_conflict", ""),
-            state=IdeaState.DRAFT
+            state=IdeaState.DRAFT,
+            created_at=now
         )
         db.add(idea)
         ideas.append(idea)
+    response = [IdeaResponse.model_validate(idea) for idea in ideas]
     
     db.commit()
-    for idea in ideas:
-        db.refresh(idea)
     
-    return ideas
+    return response
 
 
-@router.post("/custom", response_model=IdeaResponse)
-async def add_custom_idea(
+@router.post("/custom", response_model=IdeaResponse, dependencies=[Depends(require_project())])
+def add_custom_idea(
     project_id: str,
     request: CustomOutlineRequest,
     db: Session = Depends(get_db)
 ):
     """Add a custom idea (user-provided outline)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     
     idea = Idea(
+        id=generate_uuid(),
         project_id=project_id,
         title=request.title,
         setting=request.setting,
         logline=request.logline,
         hook=request.hook,
         main_conflict=request.main_conflict,
-        state=IdeaState.DRAFT
+        state=IdeaState.DRAFT,
+        created_at=datetime.utcnow()
     )
     db.add(idea)
+    response = IdeaResponse.model_validate(idea)
     db.commit()
-    db.refresh(idea)
     
-    return idea
+    return response
 
 
 # Separate router for idea-level operations
@@ -104,25 +130,30 @@ idea_router = APIRouter(prefix="/ideas", tags=["ideas"])
 @idea_router.post("/{idea_id}/approve")
 def approve_idea(idea_id: str, db: Session = Depends(get_db)):
     """Approve/select an idea (Step 2)"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
+    idea = db.query(Idea.project_id, Idea.title, Idea.setting).filter(Idea.id == idea_id).first()
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
     
-    # Reject all other ideas for this project
-    for other in idea.project.ideas:
-        if other.id != idea_id and other.state == IdeaState.DRAFT:
-            other.state = IdeaState.REJECTED
-    
-    # Approve this idea
-    idea.approve()
+    # Approve this idea (409 unless it is still a draft)
+    transition_by_id(db, Idea, idea_id, IdeaState.APPROVED)
     
-    # Update project with idea details
-    idea.project.title = idea.title
-    idea.project.setting = idea.setting
+    # Reject all other draft ideas for this project in one UPDATE
+    db.execute(
+        update(Idea)
+        .where(Idea.project_id == idea.project_id, Idea.id != idea_id, Idea.state == IdeaState.DRAFT)
+        .values(state=IdeaState.REJECTED)
+    )
     
-    # Advance project to step 2 (idea selected)
-    if idea.project.current_step < 2:
-        idea.project.current_step = 2
+    # Copy idea details onto the project and advance it to step 2 (idea selected)
+    db.execute(
+        update(Project)
+        .where(Project.id == idea.project_id)
+        .values(
+            title=idea.title,
+            setting=idea.setting,
+            current_step=case((Project.current_step < 2, 2), else_=Project.current_step)
+        )
+    )
     
     db.commit()
     
@@ -132,11 +163,7 @@ def approve_idea(idea_id: str, db: Session = Depends(get_db)):
 @idea_router.post("/{idea_id}/reject")
 def reject_idea(idea_id: str, db: Session = Depends(get_db)):
     """Reject an idea"""
-    idea = db.query(Idea).filter(Idea.id == idea_id).first()
-    if not idea:
-        raise HTTPException(status_code=404, detail="Idea not found")
-    
-    idea.reject()
+    transition_by_id(db, Idea, idea_id, IdeaState.REJECTED)
     db.commit()
     
     return {"status": "rejected", "idea_id": idea_id}
@@ -8,16 +8,21 @@ Images API routes (Steps 6, 7, 8, 9, 10)
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import DateTime, Integer, String, cast, func, insert, literal, null, select, union_all, update
+from sqlalchemy.orm import Session, selectinload, joinedload
 from typing import List, Optional
+import asyncio
+import hashlib
 import os
 import logging
+import orjson
 
 from app.database.session import get_db
 from app.models.models import (
     Project, Episode, Scene, Character, Location,
     ImagePrompt, CharacterRef, LocationRef, GeneratedImage, Thumbnail,
-    GenerationState, MediaState, PromptState
+    GenerationState, MediaState, PromptState, generate_uuid
 )
 from app.models.schemas import (
     ImagePromptResponse, ImagePromptUpdate,
@@ -25,44 +30,163 @@ from app.models.schemas import (
     GeneratedImageResponse, ThumbnailResponse,
     RefPromptUpdate, ThumbnailPromptUpdate
 )
-from app.services.generator import generator, OUTPUTS_DIR
-from app.api import parse_state_filter
+from app.services.cache import LRUCache
+from app.services.generator import generator, get_image_style, output_url, prune_image_cache, OUTPUTS_DIR
+from app.api import (
+    parse_state_filter, state_members, load_project, reference_options, scene_image_options,
+    cached_json, run_or_enqueue, insert_or_skip, transition_by_id
+)
 from app.middleware.rate_limit import limiter, AI_GENERATION_LIMIT, MEDIA_GENERATION_LIMIT
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/projects/{project_id}", tags=["images"])
 
+# Max text-model calls (image/reference/thumbnail prompts) in flight at once
+MAX_CONCURRENT_PROMPT_CALLS = 8
+_prompt_call_slots = asyncio.Semaphore(MAX_CONCURRENT_PROMPT_CALLS)
+
+# Max image-model calls in flight at once across the bulk image endpoints
+MAX_CONCURRENT_IMAGE_CALLS = 4
+_image_call_slots = asyncio.Semaphore(MAX_CONCURRENT_IMAGE_CALLS)
+
+# Encoded GET bodies keyed by (endpoint, project_id, params, *media version)
+_MEDIA_CACHE = LRUCache(maxsize=256)
+
+# Rows fetched per round-trip when a list is streamed (?stream=true)
+STREAM_BATCH = 500
+
+# Wide shots render landscape, everything else portrait (keys are lowercase)
+_ASPECT_BY_SHOT = {"wide": "16:9", "establishing": "16:9"}
+# Vertical thumbnails are portrait, horizontal (or unset) landscape
+_ASPECT_BY_ORIENTATION = {"vertical": "9:16"}
+
+
+def _media_version(db: Session, project_id: str) -> tuple:
+    """Row count and latest updated_at of every table the media GETs read,
+    in one round-trip. Any insert, update or delete changes it. 404s if
+    the project doesn't exist."""
+    scene_ids = select(Scene.id).join(Episode, Scene.episode_id == Episode.id).where(Episode.project_id == project_id)
+    prompt_ids = select(ImagePrompt.id).where(ImagePrompt.scene_id.in_(scene_ids))
+    char_ids = select(Character.id).where(Character.project_id == project_id)
+    loc_ids = select(Location.id).where(Location.project_id == project_id)
+    sources = [
+        (ImagePrompt, ImagePrompt.scene_id.in_(scene_ids)),
+        (GeneratedImage, GeneratedImage.image_prompt_id.in_(prompt_ids)),
+        (Character, Character.project_id == project_id),
+        (Location, Location.project_id == project_id),
+        (CharacterRef, CharacterRef.character_id.in_(char_ids)),
+        (LocationRef, LocationRef.location_id.in_(loc_ids)),
+        (Thumbnail, Thumbnail.project_id == project_id),
+    ]
+    columns = []
+    for model, condition in sources:
+        columns.append(select(func.count(model.id)).where(condition).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).where(condition).scalar_subquery())
+    version = db.query(Project.id, *columns).filter(Project.id == project_id).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return tuple(version[1:])
+
+
+def _image_hash(prompt_text: str, aspect_ratio: str, style: str) -> str:
+    """Digest of everything that shapes a rendered image"""
+    key = f"{prompt_text}|{aspect_ratio}|{get_image_style(style)}|{generator.image_model}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _is_unchanged(entity, prompt_text: str, save_path: str, aspect_ratio: str, style: str) -> bool:
+    """True when a kept (generated/approved) image was rendered from these exact
+    inputs and is still on disk. Regenerate routes called with ?force=false
+    use it to skip a call that would only redo the same render."""
+    return (
+        entity.state in (MediaState.GENERATED, MediaState.APPROVED)
+        and entity.prompt_hash == _image_hash(prompt_text, aspect_ratio, style)
+        and os.path.exists(save_path)
+    )
+
+
+async def _render_image(
+    entity, prompt_text: str, save_path: str, aspect_ratio: str, style: str, fresh: bool = False
+) -> Optional[str]:
+    """Generate the image for a GENERATING entity and mark it GENERATED.
+    fresh=True skips the generator's content cache (regenerate wants a new take)
+    and then prunes it, since the new take orphans the old entry; batch callers
+    prune once after the whole batch instead.
+    On failure resets it to PENDING (so a retry works) and returns the error."""
+    try:
+        async with _image_call_slots:
+            await generator.generate_image(prompt_text, save_path, aspect_ratio, style=style, use_cache=not fresh)
+        if fresh:
+            await asyncio.to_thread(prune_image_cache)
+        entity.mark_generated(output_url(save_path))
+        entity.prompt_hash = _image_hash(prompt_text, aspect_ratio, style)
+        return None
+    except Exception as e:
+        entity.reset_for_regen()
+        return str(e)
+
 
 # ============================================================================
 # STEP 6: IMAGE PROMPTS
 # ============================================================================
 
-@router.get("/image-prompts", response_model=List[ImagePromptResponse])
-def list_image_prompts(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
-    """List all image prompts for project. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    prompts = []
-    for episode in sorted(project.episodes, key=lambda e: e.episode_number):
-        for scene in sorted(episode.scenes, key=lambda s: s.scene_number):
-            for prompt in sorted(scene.image_prompts, key=lambda p: p.shot_number):
-                prompts.append(prompt)
+def _image_prompts_query(db: Session, project_id: str, state: Optional[str]):
+    """One ordered join instead of walking episodes → scenes → prompts"""
+    query = (
+        db.query(ImagePrompt)
+        .options(joinedload(ImagePrompt.generated_image))
+        .join(Scene, ImagePrompt.scene_id == Scene.id)
+        .join(Episode, Scene.episode_id == Episode.id)
+        .filter(Episode.project_id == project_id)
+    )
     states = parse_state_filter(state)
     if states:
-        prompts = [p for p in prompts if p.state.value in states]
-    return prompts
+        query = query.filter(ImagePrompt.state.in_(state_members(PromptState, states)))
+    return query.order_by(Episode.episode_number, Scene.scene_number, ImagePrompt.shot_number)
+
+
+@router.get("/image-prompts", response_model=List[ImagePromptResponse])
+def list_image_prompts(
+    request: Request,
+    project_id: str,
+    state: Optional[str] = Query(None),
+    stream: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """List all image prompts for project. Optional ?state= filter (comma-separated).
+    ?stream=true sends newline-delimited JSON, fetched STREAM_BATCH rows at a time."""
+    version = _media_version(db, project_id)
+
+    if stream:
+        rows = _image_prompts_query(db, project_id, state).yield_per(STREAM_BATCH)
+        lines = (
+            orjson.dumps(ImagePromptResponse.model_validate(p).model_dump(mode="json")) + b"\n"
+            for p in rows
+        )
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    def build():
+        prompts = _image_prompts_query(db, project_id, state).all()
+        return [ImagePromptResponse.model_validate(p).model_dump(mode="json") for p in prompts]
+
+    return cached_json(request, _MEDIA_CACHE, ("image-prompts", project_id, state, *version), build)
 
 
 @router.post("/image-prompts/generate")
 @limiter.limit(AI_GENERATION_LIMIT)
-async def generate_image_prompts(request: Request, project_id: str, db: Session = Depends(get_db)):
+async def generate_image_prompts(
+    request: Request,
+    project_id: str,
+    background: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     """Generate image prompts for all scenes (Step 6) — batched per episode"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return await run_or_enqueue(db, project_id, "image-prompts", background, _generate_image_prompts)
+
+
+async def _generate_image_prompts(db: Session, project_id: str) -> dict:
+    project = load_project(db, project_id, selectinload(Project.episodes))
 
     # Check prerequisites - need generated episodes
     generated_episodes = [e for e in project.episodes if e.state in [GenerationState.GENERATED, GenerationState.APPROVED]]
@@ -70,67 +194,98 @@ async def generate_image_prompts(request: Request, project_id: str, db: Session
         raise HTTPException(status_code=400, detail="Generate episode scripts first")
 
     characters_data = [
-        {"name": c.name, "physical_description": c.physical_description}
-        for c in project.characters
+        dict(c) for c in db.execute(
+            select(Character.name, Character.physical_description)
+            .where(Character.project_id == project_id)
+        ).mappings()
     ]
 
-    prompts_created = 0
+    # Each location's prompt data is built once and shared by every scene set there
+    locations_data = {
+        loc.id: {"name": loc.name, "visual_details": loc.visual_details, "mood": loc.mood}
+        for loc in db.execute(
+            select(Location.id, Location.name, Location.visual_details, Location.mood)
+            .where(Location.project_id == project_id)
+        )
+    }
 
-    for episode in sorted(generated_episodes, key=lambda e: e.episode_number):
-        # Collect scenes that still need image prompts
-        scenes_needing_prompts = [s for s in episode.scenes if not s.image_prompts]
+    # Just the scene columns the prompt needs, for scenes without prompts yet
+    scene_rows = db.execute(
+        select(
+            Scene.id, Scene.episode_id, Scene.scene_number, Scene.title, Scene.mood, Scene.action_beats,
+            Scene.location_id,
+        )
+        .where(
+            Scene.episode_id.in_([e.id for e in generated_episodes]),
+            ~select(ImagePrompt.id).where(ImagePrompt.scene_id == Scene.id).exists(),
+        )
+        .order_by(Scene.scene_number)
+    ).all()
+    rows_by_episode = {}
+    for row in scene_rows:
+        rows_by_episode.setdefault(row.episode_id, []).append(row)
+
+    # Collect each episode's scenes that still need image prompts
+    jobs = []  # (episode, scenes needing prompts, scene data for the AI call)
+    for episode in generated_episodes:
+        scenes_needing_prompts = rows_by_episode.get(episode.id)
         if not scenes_needing_prompts:
             continue
 
         # Build scene data with locations for the batch prompt
         scenes_data = []
-        for scene in sorted(scenes_needing_prompts, key=lambda s: s.scene_number):
-            location_data = {}
-            if scene.location:
-                location_data = {
-                    "name": scene.location.name,
-                    "visual_details": scene.location.visual_details,
-                    "mood": scene.location.mood
-                }
+        for scene in scenes_needing_prompts:
             scenes_data.append({
                 "scene_number": scene.scene_number,
                 "title": scene.title,
                 "mood": scene.mood,
                 "action_beats": scene.action_beats or [],
-                "location": location_data
+                "location": locations_data.get(scene.location_id, {})
             })
+        jobs.append((episode, scenes_needing_prompts, scenes_data))
 
-        # 1 AI call per episode (instead of 1 per scene)
+    # 1 AI call per episode (instead of 1 per scene), episodes run concurrently
+    async def run(episode, scenes_data):
         logger.info(f"Generating image prompts for episode {episode.episode_number} ({len(scenes_data)} scenes)")
-        result = await generator.generate_episode_image_prompts(
-            episode_title=episode.title or f"Episode {episode.episode_number}",
-            scenes=scenes_data,
-            characters=characters_data,
-            style=project.image_style
-        )
+        async with _prompt_call_slots:
+            return await generator.generate_episode_image_prompts(
+                episode_title=episode.title or f"Episode {episode.episode_number}",
+                scenes=scenes_data,
+                characters=characters_data,
+                style=project.image_style
+            )
+
+    results = await asyncio.gather(*(run(episode, scenes_data) for episode, _, scenes_data in jobs))
 
-        # Map shots back to the correct scene DB objects
+    prompt_rows = []
+
+    for (episode, scenes_needing_prompts, _), result in zip(jobs, results):
+        # Map shots back to the correct scene rows
         scene_map = {s.scene_number: s for s in scenes_needing_prompts}
 
         for scene_result in result:
             scene_num = scene_result.get("scene_number")
-            scene_obj = scene_map.get(scene_num)
-            if not scene_obj:
+            scene_row = scene_map.get(scene_num)
+            if not scene_row:
                 logger.warning(f"AI returned scene_number {scene_num} not found in episode {episode.episode_number}, skipping")
                 continue
 
             for shot in scene_result.get("shots", []):
-                prompt = ImagePrompt(
-                    scene_id=scene_obj.id,
-                    shot_number=shot.get("shot_number", 1),
-                    shot_type=shot.get("shot_type", "medium"),
-                    description=shot.get("description", ""),
-                    prompt_text=shot.get("prompt_text", ""),
-                    negative_prompt=shot.get("negative_prompt", ""),
-                    state=PromptState.GENERATED
-                )
-                db.add(prompt)
-                prompts_created += 1
+                prompt_rows.append({
+                    "id": generate_uuid(),
+                    "scene_id": scene_row.id,
+                    "shot_number": shot.get("shot_number", 1),
+                    "shot_type": shot.get("shot_type", "medium"),
+                    "description": shot.get("description", ""),
+                    "prompt_text": shot.get("prompt_text", ""),
+                    "negative_prompt": shot.get("negative_prompt", ""),
+                    "state": PromptState.GENERATED
+                })
+
+    # One multi-row INSERT for the whole project
+    if prompt_rows:
+        db.execute(insert(ImagePrompt), prompt_rows)
+    prompts_created = len(prompt_rows)
 
     # Update step
     if project.current_step < 6:
@@ -175,11 +330,7 @@ def update_image_prompt(prompt_id: str, data: ImagePromptUpdate, db: Session = D
 @image_prompt_router.post("/{prompt_id}/approve")
 def approve_image_prompt(prompt_id: str, db: Session = Depends(get_db)):
     """Approve an image prompt"""
-    prompt = db.query(ImagePrompt).filter(ImagePrompt.id == prompt_id).first()
-    if not prompt:
-        raise HTTPException(status_code=404, detail="Image prompt not found")
-    
-    prompt.approve()
+    transition_by_id(db, ImagePrompt, prompt_id, PromptState.APPROVED, not_found="Image prompt not found")
     db.commit()
     return {"status": "approved"}
 
@@ -189,83 +340,121 @@ def approve_image_prompt(prompt_id: str, db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.get("/character-refs", response_model=List[CharacterRefResponse])
-def list_character_refs(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def list_character_refs(request: Request, project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
     """List character reference images. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    version = _media_version(db, project_id)
+
+    def build():
+        # Only the refs themselves; the owning character rows are just a join
+        query = (
+            db.query(CharacterRef)
+            .join(Character, CharacterRef.character_id == Character.id)
+            .filter(Character.project_id == project_id)
+        )
+        states = parse_state_filter(state)
+        if states:
+            query = query.filter(CharacterRef.state.in_(state_members(MediaState, states)))
+        refs = query.all()
+        return [CharacterRefResponse.model_validate(r).model_dump(mode="json") for r in refs]
 
-    refs = [c.reference for c in project.characters if c.reference]
-    states = parse_state_filter(state)
-    if states:
-        refs = [r for r in refs if r.state.value in states]
-    return refs
+    return cached_json(request, _MEDIA_CACHE, ("character-refs", project_id, state, *version), build)
 
 
 @router.get("/location-refs", response_model=List[LocationRefResponse])
-def list_location_refs(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def list_location_refs(request: Request, project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
     """List location reference images. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    version = _media_version(db, project_id)
+
+    def build():
+        # Only the refs themselves; the owning location rows are just a join
+        query = (
+            db.query(LocationRef)
+            .join(Location, LocationRef.location_id == Location.id)
+            .filter(Location.project_id == project_id)
+        )
+        states = parse_state_filter(state)
+        if states:
+            query = query.filter(LocationRef.state.in_(state_members(MediaState, states)))
+        refs = query.all()
+        return [LocationRefResponse.model_validate(r).model_dump(mode="json") for r in refs]
 
-    refs = [l.reference for l in project.locations if l.reference]
-    states = parse_state_filter(state)
-    if states:
-        refs = [r for r in refs if r.state.value in states]
-    return refs
+    return cached_json(request, _MEDIA_CACHE, ("location-refs", project_id, state, *version), build)
 
 
 @router.post("/references/generate")
 @limiter.limit(AI_GENERATION_LIMIT)
-async def generate_reference_prompts(request: Request, project_id: str, db: Session = Depends(get_db)):
+async def generate_reference_prompts(
+    request: Request,
+    project_id: str,
+    background: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     """Generate prompts for character and location reference images (Step 7)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return await run_or_enqueue(db, project_id, "references", background, _generate_reference_prompts)
+
+
+async def _generate_reference_prompts(db: Session, project_id: str) -> dict:
+    project = load_project(db, project_id, selectinload(Project.characters), selectinload(Project.locations))
+
+    # Which characters/locations already have a reference (ids only)
+    chars_with_ref = set(db.scalars(
+        select(CharacterRef.character_id)
+        .join(Character, CharacterRef.character_id == Character.id)
+        .where(Character.project_id == project_id)
+    ))
+    locs_with_ref = set(db.scalars(
+        select(LocationRef.location_id)
+        .join(Location, LocationRef.location_id == Location.id)
+        .where(Location.project_id == project_id)
+    ))
     
+    # Generate character and location reference prompts concurrently,
+    # skipping any that already have a reference
+    characters = [c for c in project.characters if c.id not in chars_with_ref]
+    locations = [l for l in project.locations if l.id not in locs_with_ref]
+
+    async def char_prompt(character):
+        async with _prompt_call_slots:
+            return await generator.generate_character_ref_prompt({
+                "name": character.name,
+                "physical_description": character.physical_description,
+                "personality": character.personality,
+                "role": character.role
+            }, style=project.image_style)
+
+    async def loc_prompt(location):
+        async with _prompt_call_slots:
+            return await generator.generate_location_ref_prompt({
+                "name": location.name,
+                "type": location.type,
+                "description": location.description,
+                "visual_details": location.visual_details,
+                "mood": location.mood
+            }, style=project.image_style)
+
+    prompt_texts = await asyncio.gather(
+        *(char_prompt(c) for c in characters),
+        *(loc_prompt(l) for l in locations),
+    )
+    char_texts, loc_texts = prompt_texts[:len(characters)], prompt_texts[len(characters):]
+
+    # One multi-row INSERT per table; a ref created meanwhile by a concurrent
+    # request wins and is not counted
+    char_rows = [
+        {"id": generate_uuid(), "character_id": c.id, "prompt_text": text, "state": MediaState.PENDING}
+        for c, text in zip(characters, char_texts)
+    ]
+    loc_rows = [
+        {"id": generate_uuid(), "location_id": l.id, "prompt_text": text, "state": MediaState.PENDING}
+        for l, text in zip(locations, loc_texts)
+    ]
     refs_created = 0
-    
-    # Generate character reference prompts
-    for character in project.characters:
-        if character.reference:
-            continue  # Skip if already has reference
-        
-        prompt_text = await generator.generate_character_ref_prompt({
-            "name": character.name,
-            "physical_description": character.physical_description,
-            "personality": character.personality,
-            "role": character.role
-        }, style=project.image_style)
-        
-        ref = CharacterRef(
-            character_id=character.id,
-            prompt_text=prompt_text,
-            state=MediaState.PENDING
-        )
-        db.add(ref)
-        refs_created += 1
-    
-    # Generate location reference prompts
-    for location in project.locations:
-        if location.reference:
-            continue
-        
-        prompt_text = await generator.generate_location_ref_prompt({
-            "name": location.name,
-            "type": location.type,
-            "description": location.description,
-            "visual_details": location.visual_details,
-            "mood": location.mood
-        }, style=project.image_style)
-        
-        ref = LocationRef(
-            location_id=location.id,
-            prompt_text=prompt_text,
-            state=MediaState.PENDING
-        )
-        db.add(ref)
-        refs_created += 1
+    if char_rows:
+        stmt = insert_or_skip(db, CharacterRef, "character_id").returning(CharacterRef.id)
+        refs_created += len(db.execute(stmt, char_rows).all())
+    if loc_rows:
+        stmt = insert_or_skip(db, LocationRef, "location_id").returning(LocationRef.id)
+        refs_created += len(db.execute(stmt, loc_rows).all())
     
     # Update step
     if project.current_step < 7:
@@ -279,6 +468,21 @@ async def generate_reference_prompts(request: Request, project_id: str, db: Sess
     }
 
 
+def _approve_generated_ref(db: Session, model, ref_id: str, not_found: str) -> None:
+    """GENERATED → APPROVED in one UPDATE. The state guard lives in the WHERE
+    clause, so two concurrent approvals can't both pass it."""
+    result = db.execute(
+        update(model)
+        .where(model.id == ref_id, model.state == MediaState.GENERATED)
+        .values(state=MediaState.APPROVED)
+    )
+    if result.rowcount:
+        return
+    if not db.query(model.id).filter(model.id == ref_id).first():
+        raise HTTPException(status_code=404, detail=not_found)
+    raise HTTPException(status_code=400, detail="Image not yet generated")
+
+
 # Character ref routes
 character_ref_router = APIRouter(prefix="/character-refs", tags=["images"])
 
@@ -299,14 +503,7 @@ def update_character_ref_prompt(ref_id: str, data: RefPromptUpdate, db: Session
 @character_ref_router.post("/{ref_id}/approve")
 def approve_character_ref(ref_id: str, db: Session = Depends(get_db)):
     """Approve character reference image"""
-    ref = db.query(CharacterRef).filter(CharacterRef.id == ref_id).first()
-    if not ref:
-        raise HTTPException(status_code=404, detail="Character reference not found")
-    
-    if ref.state != MediaState.GENERATED:
-        raise HTTPException(status_code=400, detail="Image not yet generated")
-    
-    ref.approve()
+    _approve_generated_ref(db, CharacterRef, ref_id, "Character reference not found")
     db.commit()
     return {"status": "approved"}
 
@@ -314,43 +511,38 @@ def approve_character_ref(ref_id: str, db: Session = Depends(get_db)):
 @character_ref_router.post("/{ref_id}/reject")
 def reject_character_ref(ref_id: str, db: Session = Depends(get_db)):
     """Reject character reference image"""
-    ref = db.query(CharacterRef).filter(CharacterRef.id == ref_id).first()
-    if not ref:
-        raise HTTPException(status_code=404, detail="Character reference not found")
-    
-    ref.reject()
+    transition_by_id(db, CharacterRef, ref_id, MediaState.REJECTED, not_found="Character reference not found")
     db.commit()
     return {"status": "rejected"}
 
 
 @character_ref_router.post("/{ref_id}/regenerate")
-async def regenerate_character_ref(ref_id: str, db: Session = Depends(get_db)):
-    """Regenerate character reference image (also works for first-time generation from PENDING)"""
+async def regenerate_character_ref(ref_id: str, force: bool = Query(True), db: Session = Depends(get_db)):
+    """Regenerate character reference image (also works for first-time generation from PENDING).
+    ?force=false returns {"status": "cached"} instead when nothing it depends on changed."""
     ref = db.query(CharacterRef).filter(CharacterRef.id == ref_id).first()
     if not ref:
         raise HTTPException(status_code=404, detail="Character reference not found")
 
     style = ref.character.project.image_style if ref.character and ref.character.project else None
 
-    if ref.state != MediaState.PENDING:
-        ref.reset_for_regen()
-    ref.mark_generating()
-    db.flush()
-
     save_path = os.path.join(
         OUTPUTS_DIR, "refs", f"char_{ref.character_id}.png"
     )
+    if not force and _is_unchanged(ref, ref.prompt_text, save_path, "3:4", style):
+        return {"status": "cached"}
 
-    try:
-        await generator.generate_image(ref.prompt_text, save_path, "3:4", style=style)
-        rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-        ref.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-        db.commit()
-        return {"status": "regenerated"}
-    except Exception as e:
-        ref.reset_for_regen()  # GENERATING → PENDING so retry works
-        db.commit()
-        raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)}")
+    # State changes stay in the session until the single commit below; flushing
+    # before the render would hold SQLite's write lock for the whole model call
+    if ref.state != MediaState.PENDING:
+        ref.reset_for_regen()
+    ref.mark_generating()
+
+    error = await _render_image(ref, ref.prompt_text, save_path, "3:4", style, fresh=True)
+    db.commit()
+    if error:
+        raise HTTPException(status_code=500, detail=f"Regeneration failed: {error}")
+    return {"status": "regenerated"}
 
 
 # Location ref routes
@@ -373,14 +565,7 @@ def update_location_ref_prompt(ref_id: str, data: RefPromptUpdate, db: Session =
 @location_ref_router.post("/{ref_id}/approve")
 def approve_location_ref(ref_id: str, db: Session = Depends(get_db)):
     """Approve location reference image"""
-    ref = db.query(LocationRef).filter(LocationRef.id == ref_id).first()
-    if not ref:
-        raise HTTPException(status_code=404, detail="Location reference not found")
-    
-    if ref.state != MediaState.GENERATED:
-        raise HTTPException(status_code=400, detail="Image not yet generated")
-    
-    ref.approve()
+    _approve_generated_ref(db, LocationRef, ref_id, "Location reference not found")
     db.commit()
     return {"status": "approved"}
 
@@ -388,43 +573,36 @@ def approve_location_ref(ref_id: str, db: Session = Depends(get_db)):
 @location_ref_router.post("/{ref_id}/reject")
 def reject_location_ref(ref_id: str, db: Session = Depends(get_db)):
     """Reject location reference image"""
-    ref = db.query(LocationRef).filter(LocationRef.id == ref_id).first()
-    if not ref:
-        raise HTTPException(status_code=404, detail="Location reference not found")
-    
-    ref.reject()
+    transition_by_id(db, LocationRef, ref_id, MediaState.REJECTED, not_found="Location reference not found")
     db.commit()
     return {"status": "rejected"}
 
 
 @location_ref_router.post("/{ref_id}/regenerate")
-async def regenerate_location_ref(ref_id: str, db: Session = Depends(get_db)):
-    """Regenerate location reference image (also works for first-time generation from PENDING)"""
+async def regenerate_location_ref(ref_id: str, force: bool = Query(True), db: Session = Depends(get_db)):
+    """Regenerate location reference image (also works for first-time generation from PENDING).
+    ?force=false returns {"status": "cached"} instead when nothing it depends on changed."""
     ref = db.query(LocationRef).filter(LocationRef.id == ref_id).first()
     if not ref:
         raise HTTPException(status_code=404, detail="Location reference not found")
 
     style = ref.location.project.image_style if ref.location and ref.location.project else None
 
-    if ref.state != MediaState.PENDING:
-        ref.reset_for_regen()
-    ref.mark_generating()
-    db.flush()
-
     save_path = os.path.join(
         OUTPUTS_DIR, "refs", f"loc_{ref.location_id}.png"
     )
+    if not force and _is_unchanged(ref, ref.prompt_text, save_path, "16:9", style):
+        return {"status": "cached"}
 
-    try:
-        await generator.generate_image(ref.prompt_text, save_path, "16:9", style=style)
-        rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-        ref.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-        db.commit()
-        return {"status": "regenerated"}
-    except Exception as e:
-        ref.reset_for_regen()  # GENERATING → PENDING so retry works
-        db.commit()
-        raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)}")
+    if ref.state != MediaState.PENDING:
+        ref.reset_for_regen()
+    ref.mark_generating()
+
+    error = await _render_image(ref, ref.prompt_text, save_path, "16:9", style, fresh=True)
+    db.commit()
+    if error:
+        raise HTTPException(status_code=500, detail=f"Regeneration failed: {error}")
+    return {"status": "regenerated"}
 
 
 # ============================================================================
@@ -433,60 +611,65 @@ async def regenerate_location_ref(ref_id: str, db: Session = Depends(get_db)):
 
 @router.post("/images/generate")
 @limiter.limit(MEDIA_GENERATION_LIMIT)
-async def generate_images(request: Request, project_id: str, db: Session = Depends(get_db)):
+async def generate_images(
+    request: Request,
+    project_id: str,
+    background: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     """Generate images from approved prompts (Step 8) using Gemini 3 Pro"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return await run_or_enqueue(db, project_id, "images", background, _generate_images)
 
-    images_created = 0
-    errors = []
 
+async def _generate_images(db: Session, project_id: str) -> dict:
+    project = load_project(db, project_id, *scene_image_options())
+
+    # Collect the work first: approved prompts without an image get a new
+    # placeholder row, stuck GENERATING images are retried
+    work = []  # (scene, prompt, image, aspect ratio)
+    new_images = []
     for episode in project.episodes:
         for scene in episode.scenes:
             for prompt in scene.image_prompts:
                 image = prompt.generated_image
-                needs_generation = False
-
                 if prompt.state == PromptState.APPROVED and not image:
-                    image = GeneratedImage(image_prompt_id=prompt.id)
-                    db.add(image)
-                    db.flush()
-                    needs_generation = True
+                    image = GeneratedImage(id=generate_uuid(), image_prompt_id=prompt.id, state=MediaState.PENDING)
+                    new_images.append(image)
                 elif image and image.state == MediaState.GENERATING:
-                    # Retry stuck GENERATING images
                     image.reset_for_regen()
-                    needs_generation = True
-
-                if not needs_generation:
+                else:
                     continue
-
                 image.mark_generating()
-                db.flush()
+                aspect_ratio = _ASPECT_BY_SHOT.get((prompt.shot_type or "").lower(), "9:16")
+                work.append((scene, prompt, image, aspect_ratio))
+
+    # Dispatch same-aspect shots back to back (stable sort keeps story order
+    # within each ratio) so the backend sees runs of one output shape
+    work.sort(key=lambda item: item[3])
+
+    # Nothing is flushed until the commit after rendering: each row is then
+    # written once in its final state, and SQLite's write lock isn't held
+    # across the model calls. Placeholders carry client-side ids, so that
+    # one flush inserts them all as a single executemany.
+    db.add_all(new_images)
+
+    def render(scene, prompt, image, aspect_ratio):
+        save_path = os.path.join(
+            OUTPUTS_DIR, "images",
+            f"scene_{scene.id}_{prompt.shot_number}.png"
+        )
+        return _render_image(image, prompt.prompt_text, save_path, aspect_ratio, project.image_style)
 
-                # Map shot type to aspect ratio
-                shot_type = (prompt.shot_type or "medium").lower()
-                if shot_type in ("wide", "establishing"):
-                    aspect_ratio = "16:9"
-                else:
-                    aspect_ratio = "9:16"
-
-                save_path = os.path.join(
-                    OUTPUTS_DIR, "images",
-                    f"scene_{scene.id}_{prompt.shot_number}.png"
-                )
-
-                try:
-                    await generator.generate_image(
-                        prompt.prompt_text, save_path, aspect_ratio, style=project.image_style
-                    )
-                    rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-                    image.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-                    images_created += 1
-                except Exception as e:
-                    logger.error(f"Image generation failed for prompt {prompt.id}: {e}")
-                    errors.append({"prompt_id": prompt.id, "error": str(e)})
-                    image.reset_for_regen()
+    # All images render concurrently, bounded by _image_call_slots
+    outcomes = await asyncio.gather(*(render(*item) for item in work))
+    await asyncio.to_thread(prune_image_cache)
+
+    errors = []
+    for (_, prompt, _, _), error in zip(work, outcomes):
+        if error:
+            logger.error(f"Image generation failed for prompt {prompt.id}: {error}")
+            errors.append({"prompt_id": prompt.id, "error": error})
+    images_created = len(work) - len(errors)
 
     # Update step
     if project.current_step < 8:
@@ -503,58 +686,47 @@ async def generate_images(request: Request, project_id: str, db: Session = Depen
 
 @router.post("/references/generate-images")
 @limiter.limit(MEDIA_GENERATION_LIMIT)
-async def generate_reference_images(request: Request, project_id: str, db: Session = Depends(get_db)):
+async def generate_reference_images(
+    request: Request,
+    project_id: str,
+    background: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     """Generate reference images using Gemini 3 Pro"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return await run_or_enqueue(db, project_id, "reference-images", background, _generate_reference_images)
 
-    refs_generated = 0
-    errors = []
 
-    # Generate character reference images (portrait 3:4)
+async def _generate_reference_images(db: Session, project_id: str) -> dict:
+    project = load_project(db, project_id, *reference_options())
+
+    # Character refs are portrait 3:4, location refs landscape 16:9
+    work = []  # (error key, name, ref, save path, aspect ratio)
     for char in project.characters:
         if char.reference and char.reference.state in (MediaState.PENDING, MediaState.GENERATING):
-            char.reference.mark_generating()
-            db.flush()
-
-            save_path = os.path.join(
-                OUTPUTS_DIR, "refs", f"char_{char.id}.png"
-            )
-
-            try:
-                await generator.generate_image(
-                    char.reference.prompt_text, save_path, "3:4", style=project.image_style
-                )
-                rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-                char.reference.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-                refs_generated += 1
-            except Exception as e:
-                logger.error(f"Character ref generation failed for {char.name}: {e}")
-                errors.append({"character": char.name, "error": str(e)})
-                char.reference.reset_for_regen()  # GENERATING → PENDING so retry works
-
-    # Generate location reference images (landscape 16:9)
+            save_path = os.path.join(OUTPUTS_DIR, "refs", f"char_{char.id}.png")
+            work.append(("character", char.name, char.reference, save_path, "3:4"))
     for loc in project.locations:
         if loc.reference and loc.reference.state in (MediaState.PENDING, MediaState.GENERATING):
-            loc.reference.mark_generating()
-            db.flush()
+            save_path = os.path.join(OUTPUTS_DIR, "refs", f"loc_{loc.id}.png")
+            work.append(("location", loc.name, loc.reference, save_path, "16:9"))
 
-            save_path = os.path.join(
-                OUTPUTS_DIR, "refs", f"loc_{loc.id}.png"
-            )
+    # State changes are flushed once, in final form, by the commit below
+    for _, _, ref, _, _ in work:
+        ref.mark_generating()
 
-            try:
-                await generator.generate_image(
-                    loc.reference.prompt_text, save_path, "16:9", style=project.image_style
-                )
-                rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-                loc.reference.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-                refs_generated += 1
-            except Exception as e:
-                logger.error(f"Location ref generation failed for {loc.name}: {e}")
-                errors.append({"location": loc.name, "error": str(e)})
-                loc.reference.reset_for_regen()  # GENERATING → PENDING so retry works
+    # All references render concurrently, bounded by _image_call_slots
+    outcomes = await asyncio.gather(*(
+        _render_image(ref, ref.prompt_text, save_path, aspect_ratio, project.image_style)
+        for _, _, ref, save_path, aspect_ratio in work
+    ))
+    await asyncio.to_thread(prune_image_cache)
+
+    errors = []
+    for (kind, name, _, _, _), error in zip(work, outcomes):
+        if error:
+            logger.error(f"{kind.capitalize()} ref generation failed for {name}: {error}")
+            errors.append({kind: name, "error": error})
+    refs_generated = len(work) - len(errors)
 
     db.commit()
 
@@ -570,118 +742,131 @@ async def generate_reference_images(request: Request, project_id: str, db: Sessi
 # ============================================================================
 
 @router.get("/thumbnails", response_model=List[ThumbnailResponse])
-def list_thumbnails(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def list_thumbnails(request: Request, project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
     """List all thumbnails. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    thumbs = project.thumbnails
-    states = parse_state_filter(state)
-    if states:
-        thumbs = [t for t in thumbs if t.state.value in states]
-    return thumbs
+    version = _media_version(db, project_id)
+
+    def build():
+        project = load_project(db, project_id, selectinload(Project.thumbnails))
+        thumbs = project.thumbnails
+        states = parse_state_filter(state)
+        if states:
+            members = state_members(MediaState, states)
+            thumbs = [t for t in thumbs if t.state in members]
+        return [ThumbnailResponse.model_validate(t).model_dump(mode="json") for t in thumbs]
+
+    return cached_json(request, _MEDIA_CACHE, ("thumbnails", project_id, state, *version), build)
 
 
 @router.post("/thumbnails/generate")
 @limiter.limit(MEDIA_GENERATION_LIMIT)
-async def generate_thumbnails(request: Request, project_id: str, db: Session = Depends(get_db)):
+async def generate_thumbnails(
+    request: Request,
+    project_id: str,
+    background: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     """Generate thumbnail prompts and images for all episodes (Step 9)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return await run_or_enqueue(db, project_id, "thumbnails", background, _generate_thumbnails)
+
+
+async def _generate_thumbnails(db: Session, project_id: str) -> dict:
+    project = load_project(db, project_id, selectinload(Project.episodes))
 
     characters_data = [
-        {
-            "name": c.name,
-            "role": c.role,
-            "physical_description": c.physical_description
-        }
-        for c in project.characters
+        dict(c) for c in db.execute(
+            select(Character.name, Character.role, Character.physical_description)
+            .where(Character.project_id == project_id)
+        ).mappings()
     ]
 
-    thumbnails_created = 0
-    errors = []
+    # Episodes that already have thumbnails, and only the stuck rows among them
+    episodes_with_thumbs = set(db.scalars(
+        select(Thumbnail.episode_id).distinct().where(Thumbnail.project_id == project_id)
+    ))
+    stuck_by_episode = {}
+    for thumb in db.query(Thumbnail).filter(
+        Thumbnail.project_id == project_id, Thumbnail.state == MediaState.GENERATING
+    ):
+        stuck_by_episode.setdefault(thumb.episode_id, []).append(thumb)
+
+    # Ask for every missing episode's thumbnail prompts up front, concurrently
+    new_episodes = [e for e in project.episodes if e.id not in episodes_with_thumbs]
+
+    async def thumb_prompts_for(episode):
+        async with _prompt_call_slots:
+            return await generator.generate_thumbnail_prompts(
+                episode={
+                    "episode_number": episode.episode_number,
+                    "title": episode.title,
+                    "cliffhanger_moment": episode.cliffhanger_moment
+                },
+                characters=characters_data
+            )
 
-    for episode in project.episodes:
-        # Check if thumbnails already exist for this episode
-        existing = [t for t in project.thumbnails if t.episode_id == episode.id]
+    prompts_by_episode = dict(zip(
+        (e.id for e in new_episodes),
+        await asyncio.gather(*(thumb_prompts_for(e) for e in new_episodes))
+    ))
 
+    # One multi-row INSERT; thumbnails a concurrent request already created
+    # for the same episode/orientation are skipped rather than duplicated
+    thumb_rows = [
+        {
+            "id": generate_uuid(),
+            "project_id": project_id,
+            "episode_id": episode_id,
+            "orientation": thumb_data.get("orientation", "horizontal"),
+            "prompt_text": thumb_data.get("prompt_text", ""),
+            "state": MediaState.PENDING
+        }
+        for episode_id, thumb_prompts in prompts_by_episode.items()
+        for thumb_data in thumb_prompts
+    ]
+    inserted_ids = set()
+    if thumb_rows:
+        stmt = insert_or_skip(db, Thumbnail, "episode_id", "orientation").returning(Thumbnail.id)
+        inserted_ids = set(db.execute(stmt, thumb_rows).scalars())
+    thumbs_by_id = {t.id: t for t in db.query(Thumbnail).filter(Thumbnail.id.in_(inserted_ids))}
+    new_thumbs = {}
+    for row in thumb_rows:
+        if row["id"] in thumbs_by_id:
+            new_thumbs.setdefault(row["episode_id"], []).append(thumbs_by_id[row["id"]])
+
+    work = []  # (episode, thumbnail)
+    for episode in project.episodes:
         # Retry any stuck GENERATING thumbnails
-        stuck_thumbs = [t for t in existing if t.state == MediaState.GENERATING]
-        for thumb in stuck_thumbs:
+        for thumb in stuck_by_episode.get(episode.id, []):
             thumb.reset_for_regen()
             thumb.mark_generating()
-            db.flush()
-
-            aspect_ratio = "9:16" if thumb.orientation == "vertical" else "16:9"
-            save_path = os.path.join(
-                OUTPUTS_DIR, "thumbnails",
-                f"ep_{episode.episode_number}_{thumb.orientation}.png"
-            )
-
-            try:
-                await generator.generate_image(thumb.prompt_text, save_path, aspect_ratio, style=project.image_style)
-                rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-                thumb.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-                thumbnails_created += 1
-            except Exception as e:
-                logger.error(f"Thumbnail retry failed for ep {episode.episode_number} {thumb.orientation}: {e}")
-                errors.append({"episode": episode.episode_number, "orientation": thumb.orientation, "error": str(e)})
-                thumb.reset_for_regen()
-
-        # Skip episode if it already has (non-stuck) thumbnails
-        if existing and not stuck_thumbs:
-            continue
+            work.append((episode, thumb))
 
         # Only generate new thumbnails if none existed before
-        if existing:
+        if episode.id in episodes_with_thumbs:
             continue
 
-        episode_data = {
-            "episode_number": episode.episode_number,
-            "title": episode.title,
-            "cliffhanger_moment": episode.cliffhanger_moment
-        }
+        for thumb in new_thumbs.get(episode.id, []):
+            thumb.mark_generating()
+            work.append((episode, thumb))
 
-        thumb_prompts = await generator.generate_thumbnail_prompts(
-            episode=episode_data,
-            characters=characters_data
+    def render(episode, thumb):
+        aspect_ratio = _ASPECT_BY_ORIENTATION.get(thumb.orientation, "16:9")
+        save_path = os.path.join(
+            OUTPUTS_DIR, "thumbnails",
+            f"ep_{episode.episode_number}_{thumb.orientation}.png"
         )
+        return _render_image(thumb, thumb.prompt_text, save_path, aspect_ratio, project.image_style)
 
-        for thumb_data in thumb_prompts:
-            orientation = thumb_data.get("orientation", "horizontal")
-            thumb = Thumbnail(
-                project_id=project_id,
-                episode_id=episode.id,
-                orientation=orientation,
-                prompt_text=thumb_data.get("prompt_text", ""),
-            )
-            db.add(thumb)
-            db.flush()
-            thumb.mark_generating()
+    # All thumbnails render concurrently, bounded by _image_call_slots
+    outcomes = await asyncio.gather(*(render(*item) for item in work))
+    await asyncio.to_thread(prune_image_cache)
 
-            # Generate the actual thumbnail image
-            aspect_ratio = "9:16" if orientation == "vertical" else "16:9"
-            save_path = os.path.join(
-                OUTPUTS_DIR, "thumbnails",
-                f"ep_{episode.episode_number}_{orientation}.png"
-            )
-
-            try:
-                await generator.generate_image(
-                    thumb.prompt_text, save_path, aspect_ratio, style=project.image_style
-                )
-                rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-                thumb.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-                thumbnails_created += 1
-            except Exception as e:
-                logger.error(f"Thumbnail generation failed for ep {episode.episode_number} {orientation}: {e}")
-                errors.append({
-                    "episode": episode.episode_number,
-                    "orientation": orientation,
-                    "error": str(e)
-                })
-                thumb.reset_for_regen()
+    errors = []
+    for (episode, thumb), error in zip(work, outcomes):
+        if error:
+            logger.error(f"Thumbnail generation failed for ep {episode.episode_number} {thumb.orientation}: {error}")
+            errors.append({"episode": episode.episode_number, "orientation": thumb.orientation, "error": error})
+    thumbnails_created = len(work) - len(errors)
 
     # Update step
     if project.current_step < 9:
@@ -716,11 +901,7 @@ def update_thumbnail_prompt(thumb_id: str, data: ThumbnailPromptUpdate, db: Sess
 @thumbnail_router.post("/{thumb_id}/approve")
 def approve_thumbnail(thumb_id: str, db: Session = Depends(get_db)):
     """Approve thumbnail"""
-    thumb = db.query(Thumbnail).filter(Thumbnail.id == thumb_id).first()
-    if not thumb:
-        raise HTTPException(status_code=404, detail="Thumbnail not found")
-    
-    thumb.approve()
+    transition_by_id(db, Thumbnail, thumb_id, MediaState.APPROVED)
     db.commit()
     return {"status": "approved"}
 
@@ -728,27 +909,20 @@ def approve_thumbnail(thumb_id: str, db: Session = Depends(get_db)):
 @thumbnail_router.post("/{thumb_id}/reject")
 def reject_thumbnail(thumb_id: str, db: Session = Depends(get_db)):
     """Reject thumbnail"""
-    thumb = db.query(Thumbnail).filter(Thumbnail.id == thumb_id).first()
-    if not thumb:
-        raise HTTPException(status_code=404, detail="Thumbnail not found")
-    
-    thumb.reject()
+    transition_by_id(db, Thumbnail, thumb_id, MediaState.REJECTED)
     db.commit()
     return {"status": "rejected"}
 
 
 @thumbnail_router.post("/{thumb_id}/regenerate")
-async def regenerate_thumbnail(thumb_id: str, db: Session = Depends(get_db)):
-    """Regenerate thumbnail image"""
+async def regenerate_thumbnail(thumb_id: str, force: bool = Query(True), db: Session = Depends(get_db)):
+    """Regenerate thumbnail image.
+    ?force=false returns {"status": "cached"} instead when nothing it depends on changed."""
     thumb = db.query(Thumbnail).filter(Thumbnail.id == thumb_id).first()
     if not thumb:
         raise HTTPException(status_code=404, detail="Thumbnail not found")
 
-    thumb.reset_for_regen()
-    thumb.mark_generating()
-    db.flush()
-
-    aspect_ratio = "9:16" if thumb.orientation == "vertical" else "16:9"
+    aspect_ratio = _ASPECT_BY_ORIENTATION.get(thumb.orientation, "16:9")
     ep_num = thumb.episode.episode_number if thumb.episode else "unknown"
     save_path = os.path.join(
         OUTPUTS_DIR, "thumbnails",
@@ -756,17 +930,17 @@ async def regenerate_thumbnail(thumb_id: str, db: Session = Depends(get_db)):
     )
 
     style = thumb.project.image_style if thumb.project else None
+    if not force and _is_unchanged(thumb, thumb.prompt_text, save_path, aspect_ratio, style):
+        return {"status": "cached"}
 
-    try:
-        await generator.generate_image(thumb.prompt_text, save_path, aspect_ratio, style=style)
-        rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-        thumb.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-        db.commit()
-        return {"status": "regenerated"}
-    except Exception as e:
-        thumb.reset_for_regen()  # GENERATING → PENDING so retry works
-        db.commit()
-        raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)}")
+    thumb.reset_for_regen()
+    thumb.mark_generating()
+
+    error = await _render_image(thumb, thumb.prompt_text, save_path, aspect_ratio, style, fresh=True)
+    db.commit()
+    if error:
+        raise HTTPException(status_code=500, detail=f"Regeneration failed: {error}")
+    return {"status": "regenerated"}
 
 
 # ============================================================================
@@ -774,89 +948,156 @@ async def regenerate_thumbnail(thumb_id: str, db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.get("/images/review")
-def get_images_for_review(project_id: str, db: Session = Depends(get_db)):
+def get_images_for_review(request: Request, project_id: str, db: Session = Depends(get_db)):
     """Get all images pending review (Step 10)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
+    version = _media_version(db, project_id)
+    return cached_json(
+        request, _MEDIA_CACHE, ("review", project_id, *version),
+        lambda: _review_payload(db, project_id)
+    )
+
+
+@router.get("/images/review/{bucket}")
+def get_review_page(
+    request: Request,
+    project_id: str,
+    bucket: str,
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    stream: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """One review bucket (pending, approved or rejected), a page at a time.
+    ?stream=true sends the whole bucket as newline-delimited JSON instead,
+    fetched STREAM_BATCH rows at a time."""
+    state = _REVIEW_BUCKETS.get(bucket)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Unknown review bucket: {bucket}")
+    version = _media_version(db, project_id)
+    query = _review_query(project_id, (state,))
+
+    if stream:
+        rows = db.execute(query.execution_options(yield_per=STREAM_BATCH))
+        return StreamingResponse(
+            (orjson.dumps(_review_item(row)) + b"\n" for row in rows),
+            media_type="application/x-ndjson"
+        )
+
+    def build():
+        total = db.scalar(select(func.count()).select_from(query.subquery()))
+        items = [_review_item(row) for row in db.execute(query.limit(limit).offset(offset))]
+        return {"items": items, "total": total, "limit": limit, "offset": offset}
+
+    return cached_json(
+        request, _MEDIA_CACHE, ("review", project_id, bucket, limit, offset, *version), build
+    )
+
+
+_REVIEW_STATES = (MediaState.GENERATED, MediaState.APPROVED, MediaState.REJECTED)
+# Plain strings looked up once per row instead of Enum.value property access
+_REVIEW_STATE_VALUES = {s: s.value for s in _REVIEW_STATES}
+# Review bucket name (URL and payload key) -> state it lists
+_REVIEW_BUCKETS = {"pending": MediaState.GENERATED, "approved": MediaState.APPROVED, "rejected": MediaState.REJECTED}
+
+
+def _review_query(project_id: str, states: tuple):
+    """Every scene image, reference and thumbnail in states, as one UNION ALL
+    ordered by type and then the order each list was always shown in.
+    Thumbnails sort by episode number, vertical before horizontal, since a
+    batch renders them concurrently; id comes last so pages are stable."""
+    # Every branch selects the same columns; ones a type doesn't have are NULL
+    no_str, no_int, no_time = cast(null(), String), cast(null(), Integer), cast(null(), DateTime)
+    scene_images = (
+        select(
+            literal(0).label("kind"), GeneratedImage.id, GeneratedImage.image_path, GeneratedImage.state,
+            no_str.label("name"), no_str.label("episode_id"), no_str.label("orientation"),
+            ImagePrompt.description.label("description"), Episode.episode_number.label("episode_number"),
+            Scene.scene_number.label("scene_number"), ImagePrompt.shot_number.label("shot_number"),
+            no_time.label("created_at"),
+        )
+        .join(ImagePrompt, GeneratedImage.image_prompt_id == ImagePrompt.id)
+        .join(Scene, ImagePrompt.scene_id == Scene.id)
+        .join(Episode, Scene.episode_id == Episode.id)
+        .where(Episode.project_id == project_id, GeneratedImage.state.in_(states))
+    )
+    char_refs = (
+        select(
+            literal(1), CharacterRef.id, CharacterRef.image_path, CharacterRef.state,
+            Character.name, no_str, no_str, no_str, no_int, no_int, no_int, Character.created_at,
+        )
+        .join(Character, CharacterRef.character_id == Character.id)
+        .where(Character.project_id == project_id, CharacterRef.state.in_(states))
+    )
+    loc_refs = (
+        select(
+            literal(2), LocationRef.id, LocationRef.image_path, LocationRef.state,
+            Location.name, no_str, no_str, no_str, no_int, no_int, no_int, Location.created_at,
+        )
+        .join(Location, LocationRef.location_id == Location.id)
+        .where(Location.project_id == project_id, LocationRef.state.in_(states))
+    )
+    thumbs = (
+        select(
+            literal(3), Thumbnail.id, Thumbnail.image_path, Thumbnail.state,
+            no_str, Thumbnail.episode_id, Thumbnail.orientation, no_str, Episode.episode_number,
+            no_int, no_int, Thumbnail.created_at,
+        )
+        .outerjoin(Episode, Thumbnail.episode_id == Episode.id)
+        .where(Thumbnail.project_id == project_id, Thumbnail.state.in_(states))
+    )
+    media = union_all(scene_images, char_refs, loc_refs, thumbs).subquery()
+    return select(media).order_by(
+        media.c.kind, media.c.episode_number, media.c.scene_number, media.c.shot_number,
+        media.c.orientation.desc(), media.c.created_at, media.c.id
+    )
+
+
+def _review_item(row) -> dict:
+    """Review list entry for one _review_query() row"""
+    if row.kind == 0:
+        return {
+            "id": row.id,
+            "type": "scene_image",
+            "episode_number": row.episode_number,
+            "scene_number": row.scene_number,
+            "shot_number": row.shot_number,
+            "description": row.description,
+            "image_path": row.image_path,
+            "state": _REVIEW_STATE_VALUES[row.state]
+        }
+    if row.kind == 3:
+        return {
+            "id": row.id,
+            "type": "thumbnail",
+            "episode_id": row.episode_id,
+            "orientation": row.orientation,
+            "image_path": row.image_path,
+            "state": _REVIEW_STATE_VALUES[row.state]
+        }
+    return {
+        "id": row.id,
+        "type": "character_ref" if row.kind == 1 else "location_ref",
+        "name": row.name,
+        "image_path": row.image_path,
+        "state": _REVIEW_STATE_VALUES[row.state]
+    }
+
+
+def _review_payload(db: Session, project_id: str) -> dict:
+    """Bucket every scene image, reference and thumbnail by review state,
+    from one _review_query() round-trip."""
     pending_images = []
     approved_images = []
     rejected_images = []
-    
-    # Scene images
-    for episode in project.episodes:
-        for scene in episode.scenes:
-            for prompt in scene.image_prompts:
-                if prompt.generated_image:
-                    img_data = {
-                        "id": prompt.generated_image.id,
-                        "type": "scene_image",
-                        "episode_number": episode.episode_number,
-                        "scene_number": scene.scene_number,
-                        "shot_number": prompt.shot_number,
-                        "description": prompt.description,
-                        "image_path": prompt.generated_image.image_path,
-                        "state": prompt.generated_image.state.value
-                    }
-                    if prompt.generated_image.state == MediaState.GENERATED:
-                        pending_images.append(img_data)
-                    elif prompt.generated_image.state == MediaState.APPROVED:
-                        approved_images.append(img_data)
-                    elif prompt.generated_image.state == MediaState.REJECTED:
-                        rejected_images.append(img_data)
-    
-    # Character refs
-    for char in project.characters:
-        if char.reference:
-            ref_data = {
-                "id": char.reference.id,
-                "type": "character_ref",
-                "name": char.name,
-                "image_path": char.reference.image_path,
-                "state": char.reference.state.value
-            }
-            if char.reference.state == MediaState.GENERATED:
-                pending_images.append(ref_data)
-            elif char.reference.state == MediaState.APPROVED:
-                approved_images.append(ref_data)
-            elif char.reference.state == MediaState.REJECTED:
-                rejected_images.append(ref_data)
-    
-    # Location refs
-    for loc in project.locations:
-        if loc.reference:
-            ref_data = {
-                "id": loc.reference.id,
-                "type": "location_ref",
-                "name": loc.name,
-                "image_path": loc.reference.image_path,
-                "state": loc.reference.state.value
-            }
-            if loc.reference.state == MediaState.GENERATED:
-                pending_images.append(ref_data)
-            elif loc.reference.state == MediaState.APPROVED:
-                approved_images.append(ref_data)
-            elif loc.reference.state == MediaState.REJECTED:
-                rejected_images.append(ref_data)
-    
-    # Thumbnails
-    for thumb in project.thumbnails:
-        thumb_data = {
-            "id": thumb.id,
-            "type": "thumbnail",
-            "episode_id": thumb.episode_id,
-            "orientation": thumb.orientation,
-            "image_path": thumb.image_path,
-            "state": thumb.state.value
-        }
-        if thumb.state == MediaState.GENERATED:
-            pending_images.append(thumb_data)
-        elif thumb.state == MediaState.APPROVED:
-            approved_images.append(thumb_data)
-        elif thumb.state == MediaState.REJECTED:
-            rejected_images.append(thumb_data)
-    
+    buckets = {
+        MediaState.GENERATED: pending_images,
+        MediaState.APPROVED: approved_images,
+        MediaState.REJECTED: rejected_images,
+    }
+
+    for row in db.execute(_review_query(project_id, _REVIEW_STATES)):
+        buckets[row.state].append(_review_item(row))
+
     return {
         "pending": pending_images,
         "approved": approved_images,
@@ -874,11 +1115,7 @@ generated_image_router = APIRouter(prefix="/generated-images", tags=["images"])
 @generated_image_router.post("/{image_id}/approve")
 def approve_generated_image(image_id: str, db: Session = Depends(get_db)):
     """Approve generated image"""
-    image = db.query(GeneratedImage).filter(GeneratedImage.id == image_id).first()
-    if not image:
-        raise HTTPException(status_code=404, detail="Image not found")
-    
-    image.approve()
+    transition_by_id(db, GeneratedImage, image_id, MediaState.APPROVED, not_found="Image not found")
     db.commit()
     return {"status": "approved"}
 
@@ -886,11 +1123,7 @@ def approve_generated_image(image_id: str, db: Session = Depends(get_db)):
 @generated_image_router.post("/{image_id}/reject")
 def reject_generated_image(image_id: str, db: Session = Depends(get_db)):
     """Reject generated image"""
-    image = db.query(GeneratedImage).filter(GeneratedImage.id == image_id).first()
-    if not image:
-        raise HTTPException(status_code=404, detail="Image not found")
-    
-    image.reject()
+    transition_by_id(db, GeneratedImage, image_id, MediaState.REJECTED, not_found="Image not found")
     db.commit()
     return {"status": "rejected"}
 
@@ -910,28 +1143,17 @@ async def regenerate_generated_image(image_id: str, db: Session = Depends(get_db
     except AttributeError:
         pass
 
-    image.reset_for_regen()
-    image.mark_generating()
-    db.flush()
-
-    shot_type = (prompt.shot_type or "medium").lower()
-    if shot_type in ("wide", "establishing"):
-        aspect_ratio = "16:9"
-    else:
-        aspect_ratio = "9:16"
+    aspect_ratio = _ASPECT_BY_SHOT.get((prompt.shot_type or "").lower(), "9:16")
 
     save_path = os.path.join(
         OUTPUTS_DIR, "images",
         f"scene_{prompt.scene_id}_{prompt.shot_number}.png"
     )
+    image.reset_for_regen()
+    image.mark_generating()
 
-    try:
-        await generator.generate_image(prompt.prompt_text, save_path, aspect_ratio, style=style)
-        rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
-        image.mark_generated(f"/outputs/{rel_path.replace(os.sep, '/')}")
-        db.commit()
-        return {"status": "regenerated"}
-    except Exception as e:
-        image.reset_for_regen()  # GENERATING → PENDING so retry works
-        db.commit()
-        raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)}")
+    error = await _render_image(image, prompt.prompt_text, save_path, aspect_ratio, style, fresh=True)
+    db.commit()
+    if error:
+        raise HTTPException(status_code=500, detail=f"Regeneration failed: {error}")
+    return {"status": "regenerated"}
@@ -0,0 +1,24 @@
+"""
+Background job status routes
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database.session import get_db
+from app.models.models import Job
+from app.models.schemas import JobResponse
+from app.services.jobs import fail_interrupted, is_interrupted
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    """Poll a job queued with ?background=true"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if is_interrupted(job):
+        fail_interrupted(db, job)
+    return job
@@ -3,19 +3,24 @@ Project API routes
 """
 
 from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import String, cast, func, literal, select, union_all, update
 from sqlalchemy.orm import Session, selectinload
-from typing import List
+from typing import List, Union
 
 from app.database.session import get_db
+from app.api import load_project, require_project
 from app.models.models import (
     Project, Idea, Character, Location, EpisodeSummary, Episode,
     Scene, ImagePrompt, GeneratedImage, VideoPrompt, GeneratedVideo,
-    CharacterRef, LocationRef, MediaState
+    CharacterRef, LocationRef, IdeaState, StructureState, GenerationState, MediaState,
+    generate_uuid
 )
 from app.models.schemas import (
-    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetail, StepProgress, STEP_NAMES,
+    ProjectCreate, ProjectUpdate, ProjectSummary, ProjectResponse, ProjectDetail, StepProgress, STEP_NAMES,
     PipelineResponse, EntityStateCounts
 )
 
@@ -46,23 +51,94 @@ def _full_project_options():
     ]
 
 
-def _light_project_options():
-    """Lighter eager loading for project list (no deep nesting)."""
+def _advance_check_options(step: int):
+    """Eager loading options for Project.can_advance_to(step): just the
+    relationships that step's _check_step_N reads."""
+    if step in (2, 3):
+        return [selectinload(Project.ideas)]
+    if step in (4, 5):
+        return [
+            selectinload(Project.characters),
+            selectinload(Project.locations),
+            selectinload(Project.episode_summaries),
+        ]
+    if step in (6, 7):
+        return [selectinload(Project.episodes)]
+    if step in (8, 9):
+        return [
+            selectinload(Project.characters).selectinload(Character.reference),
+            selectinload(Project.locations).selectinload(Location.reference),
+            selectinload(Project.episodes)
+                .selectinload(Episode.scenes)
+                .selectinload(Scene.image_prompts),
+        ]
+    if step in (10, 11):
+        return [
+            selectinload(Project.episodes)
+                .selectinload(Episode.scenes)
+                .selectinload(Scene.image_prompts)
+                .selectinload(ImagePrompt.generated_image),
+        ]
+    if step == 12:
+        return [
+            selectinload(Project.episodes)
+                .selectinload(Episode.scenes)
+                .selectinload(Scene.video_prompts),
+        ]
+    return []
+
+
+def _project_counts():
+    """Dashboard counts for ProjectResponse as correlated COUNT subqueries,
+    so a project list is one query instead of a loaded episode/scene tree."""
+    def count(stmt, label):
+        return stmt.correlate(Project).scalar_subquery().label(label)
+
     return [
-        selectinload(Project.ideas),
-        selectinload(Project.characters),
-        selectinload(Project.locations),
-        selectinload(Project.episodes)
-            .selectinload(Episode.scenes)
-            .selectinload(Scene.image_prompts)
-            .selectinload(ImagePrompt.generated_image),
-        selectinload(Project.episodes)
-            .selectinload(Episode.scenes)
-            .selectinload(Scene.video_prompts)
-            .selectinload(VideoPrompt.generated_video),
+        count(select(func.count(Idea.id)).where(Idea.project_id == Project.id), "ideas_count"),
+        count(select(func.count(Character.id)).where(Character.project_id == Project.id), "characters_count"),
+        count(select(func.count(Location.id)).where(Location.project_id == Project.id), "locations_count"),
+        count(
+            select(func.count(Episode.id))
+            .where(Episode.project_id == Project.id, Episode.state != GenerationState.PENDING),
+            "episodes_generated"
+        ),
+        count(
+            select(func.count(GeneratedImage.id))
+            .join(ImagePrompt, GeneratedImage.image_prompt_id == ImagePrompt.id)
+            .join(Scene, ImagePrompt.scene_id == Scene.id)
+            .join(Episode, Scene.episode_id == Episode.id)
+            .where(Episode.project_id == Project.id, GeneratedImage.state == MediaState.GENERATED),
+            "images_pending_review"
+        ),
+        count(
+            select(func.count(GeneratedVideo.id))
+            .join(VideoPrompt, GeneratedVideo.video_prompt_id == VideoPrompt.id)
+            .join(Scene, VideoPrompt.scene_id == Scene.id)
+            .join(Episode, Scene.episode_id == Episode.id)
+            .where(
+                Episode.project_id == Project.id,
+                GeneratedVideo.state.in_([MediaState.GENERATED, MediaState.APPROVED])
+            ),
+            "videos_generated"
+        ),
     ]
 
 
+# _project_counts() row for a project that was just created
+_NO_COUNTS = SimpleNamespace(
+    ideas_count=0, characters_count=0, locations_count=0,
+    episodes_generated=0, images_pending_review=0, videos_generated=0
+)
+
+
+# Columns of ProjectSummary, for responses that skip the dashboard counts
+_SUMMARY_COLUMNS = (
+    Project.id, Project.title, Project.setting, Project.num_episodes, Project.image_style,
+    Project.current_step, Project.created_at, Project.updated_at,
+)
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
@@ -70,67 +146,72 @@ def _light_project_options():
 @router.post("", response_model=ProjectResponse)
 def create_project(data: ProjectCreate, db: Session = Depends(get_db)):
     """Create a new project"""
+    # Every column is set client-side and a new project has nothing under it,
+    # so the response needs no refresh or count query after the INSERT
+    now = datetime.utcnow()
     project = Project(
+        id=generate_uuid(),
         title=data.title,
         setting=data.setting,
         num_episodes=data.num_episodes,
-        current_step=1
+        image_style="drama",
+        current_step=1,
+        created_at=now,
+        updated_at=now
     )
     db.add(project)
+    response = _project_to_response(project, _NO_COUNTS)
     db.commit()
-    db.refresh(project)
-    return _project_to_response(project)
+    return response
 
 
 @router.get("", response_model=List[ProjectResponse])
 def list_projects(db: Session = Depends(get_db)):
     """List all projects"""
-    projects = (
-        db.query(Project)
-        .options(*_light_project_options())
-        .order_by(Project.updated_at.desc())
-        .all()
-    )
-    return [_project_to_response(p) for p in projects]
+    rows = db.query(Project, *_project_counts()).order_by(Project.updated_at.desc()).all()
+    return [_project_to_response(row[0], row) for row in rows]
 
 
 @router.get("/{project_id}", response_model=ProjectDetail)
 def get_project(project_id: str, db: Session = Depends(get_db)):
     """Get project with all details"""
-    project = (
-        db.query(Project)
-        .options(*_full_project_options())
-        .filter(Project.id == project_id)
-        .first()
-    )
-    if not project:
+    row = db.query(Project, *_project_counts()).filter(Project.id == project_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Project not found")
-    return _project_to_detail(project)
-
-
-@router.patch("/{project_id}", response_model=ProjectResponse)
-def update_project(project_id: str, data: ProjectUpdate, db: Session = Depends(get_db)):
-    """Update project settings (e.g. num_episodes)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    return _project_to_detail(row[0], row)
+
+
+@router.patch("/{project_id}", response_model=Union[ProjectResponse, ProjectSummary])
+def update_project(
+    project_id: str,
+    data: ProjectUpdate,
+    full: bool = Query(False),
+    db: Session = Depends(get_db)
+):
+    """Update project settings (e.g. num_episodes).
+    Returns the project's own columns from one UPDATE ... RETURNING;
+    ?full=true adds the dashboard counts."""
+
+    values = data.model_dump(exclude_none=True)
+    if values:
+        row = db.execute(
+            update(Project).where(Project.id == project_id).values(**values).returning(*_SUMMARY_COLUMNS)
+        ).first()
+    else:
+        row = db.query(*_SUMMARY_COLUMNS).filter(Project.id == project_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Project not found")
-
-    if data.num_episodes is not None:
-        project.num_episodes = data.num_episodes
-    if data.image_style is not None:
-        project.image_style = data.image_style
-
     db.commit()
-    db.refresh(project)
-    return _project_to_response(project)
+
+    if full:
+        row = db.query(Project, *_project_counts()).filter(Project.id == project_id).one()
+        return _project_to_response(row[0], row)
+    return _project_to_summary(row)
 
 
 @router.delete("/{project_id}")
-def delete_project(project_id: str, db: Session = Depends(get_db)):
+def delete_project(project: Project = Depends(require_project()), db: Session = Depends(get_db)):
     """Delete a project"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     db.delete(project)
     db.commit()
     return {"status": "deleted"}
@@ -139,20 +220,18 @@ def delete_project(project_id: str, db: Session = Depends(get_db)):
 @router.get("/{project_id}/progress", response_model=StepProgress)
 def get_step_progress(project_id: str, db: Session = Depends(get_db)):
     """Get current step progress"""
-    project = (
-        db.query(Project)
-        .options(*_full_project_options())
-        .filter(Project.id == project_id)
-        .first()
-    )
-    if not project:
+    step = db.query(Project.current_step).filter(Project.id == project_id).scalar()
+    if step is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    step = project.current_step
+    # Only the relationships the next step's prerequisite check walks
+    project = load_project(db, project_id, *_advance_check_options(step + 1))
     can_proceed = project.can_advance_to(step + 1)
 
-    # Calculate progress based on current step
-    items_total, items_completed, items_pending, blocking_reason = _get_step_stats(project, step)
+    # Calculate progress based on current step (counted in SQL)
+    items_total, items_completed, items_pending, blocking_reason = _get_step_stats(
+        _get_state_counts(db, project_id), step, project.num_episodes
+    )
 
     return StepProgress(
         current_step=step,
@@ -168,14 +247,7 @@ def get_step_progress(project_id: str, db: Session = Depends(get_db)):
 @router.get("/{project_id}/pipeline", response_model=PipelineResponse)
 def get_pipeline(project_id: str, db: Session = Depends(get_db)):
     """Get state distribution across all entity types for pipeline dashboard"""
-    project = (
-        db.query(Project)
-        .options(*_full_project_options())
-        .filter(Project.id == project_id)
-        .first()
-    )
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    project = load_project(db, project_id, *_full_project_options())
 
     def count_states(items):
         counter = Counter(item.state.value for item in items)
@@ -232,11 +304,8 @@ def get_pipeline(project_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/{project_id}/advance-step")
-def advance_step(project_id: str, db: Session = Depends(get_db)):
+def advance_step(project: Project = Depends(require_project()), db: Session = Depends(get_db)):
     """Advance to next step if allowed"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
 
     next_step = project.current_step + 1
     if next_step > 12:
@@ -258,16 +327,8 @@ def advance_step(project_id: str, db: Session = Depends(get_db)):
 # HELPER FUNCTIONS
 # ============================================================================
 
-def _project_to_response(project: Project) -> ProjectResponse:
-    """Convert Project model to response schema"""
-    # Count images pending review (data already eager-loaded)
-    images_pending = 0
-    for episode in project.episodes:
-        for scene in episode.scenes:
-            for img_prompt in scene.image_prompts:
-                if img_prompt.generated_image and img_prompt.generated_image.state == MediaState.GENERATED:
-                    images_pending += 1
-
+def _project_to_response(project: Project, counts) -> ProjectResponse:
+    """Convert Project model plus its _project_counts() row to response schema"""
     return ProjectResponse(
         id=project.id,
         title=project.title,
@@ -277,23 +338,32 @@ def _project_to_response(project: Project) -> ProjectResponse:
         current_step=project.current_step,
         created_at=project.created_at,
         updated_at=project.updated_at,
-        ideas_count=len(project.ideas),
-        characters_count=len(project.characters),
-        locations_count=len(project.locations),
-        episodes_generated=len([e for e in project.episodes if e.state.value != "pending"]),
-        images_pending_review=images_pending,
-        videos_generated=sum(
-            1 for e in project.episodes
-            for s in e.scenes
-            for vp in s.video_prompts
-            if vp.generated_video and vp.generated_video.state.value in ("generated", "approved")
-        )
+        ideas_count=counts.ideas_count,
+        characters_count=counts.characters_count,
+        locations_count=counts.locations_count,
+        episodes_generated=counts.episodes_generated,
+        images_pending_review=counts.images_pending_review,
+        videos_generated=counts.videos_generated
     )
 
 
-def _project_to_detail(project: Project) -> ProjectDetail:
+def _project_to_summary(row) -> ProjectSummary:
+    """Convert a _SUMMARY_COLUMNS row to response schema"""
+    return ProjectSummary(
+        id=row.id,
+        title=row.title,
+        setting=row.setting,
+        num_episodes=row.num_episodes,
+        image_style=row.image_style or "drama",
+        current_step=row.current_step,
+        created_at=row.created_at,
+        updated_at=row.updated_at
+    )
+
+
+def _project_to_detail(project: Project, counts) -> ProjectDetail:
     """Convert Project model to detailed response"""
-    base = _project_to_response(project)
+    base = _project_to_response(project, counts)
     return ProjectDetail(
         **base.model_dump(),
         ideas=[],  # Will be populated by Pydantic from relationship
@@ -303,8 +373,47 @@ def _project_to_detail(project: Project) -> ProjectDetail:
     )
 
 
-def _get_step_stats(project: Project, step: int) -> tuple:
-    """Get statistics for current step"""
+# Entity label -> state enum, for mapping the stored enum names back to values
+_STATE_ENUMS = {
+    "ideas": IdeaState,
+    "characters": StructureState,
+    "locations": StructureState,
+    "episode_summaries": StructureState,
+    "episodes": GenerationState,
+    "generated_images": MediaState,
+}
+
+
+def _get_state_counts(db: Session, project_id: str) -> Counter:
+    """Per-state row counts of the entities _get_step_stats reads, keyed by
+    (entity label, state value), from one UNION ALL of GROUP BY selects."""
+    def by_state(label, model):
+        # States are cast to text so branches over different enum types union
+        return select(
+            literal(label).label("entity"), cast(model.state, String).label("state"), func.count().label("n")
+        ).select_from(model)
+
+    rows = db.execute(union_all(
+        by_state("ideas", Idea).where(Idea.project_id == project_id).group_by(Idea.state),
+        by_state("characters", Character).where(Character.project_id == project_id).group_by(Character.state),
+        by_state("locations", Location).where(Location.project_id == project_id).group_by(Location.state),
+        by_state("episode_summaries", EpisodeSummary)
+            .where(EpisodeSummary.project_id == project_id).group_by(EpisodeSummary.state),
+        by_state("episodes", Episode).where(Episode.project_id == project_id).group_by(Episode.state),
+        by_state("generated_images", GeneratedImage)
+            .join(ImagePrompt, GeneratedImage.image_prompt_id == ImagePrompt.id)
+            .join(Scene, ImagePrompt.scene_id == Scene.id)
+            .join(Episode, Scene.episode_id == Episode.id)
+            .where(Episode.project_id == project_id).group_by(GeneratedImage.state),
+    )).all()
+    return Counter({(entity, _STATE_ENUMS[entity][state].value): n for entity, state, n in rows})
+
+
+def _get_step_stats(counts: Counter, step: int, num_episodes: int) -> tuple:
+    """Get statistics for current step from _get_state_counts()"""
+    def total(entity):
+        return sum(n for (label, _), n in counts.items() if label == entity)
+
     items_total = 0
     items_completed = 0
     items_pending = 0
@@ -312,63 +421,44 @@ def _get_step_stats(project: Project, step: int) -> tuple:
 
     if step == 1:  # Generate Ideas
         items_total = 3
-        items_completed = len(project.ideas)
+        items_completed = total("ideas")
         items_pending = 3 - items_completed
         if items_pending > 0:
             blocking_reason = "Generate ideas first"
 
     elif step == 2:  # Select Idea
-        items_total = len(project.ideas)
-        items_completed = len([i for i in project.ideas if i.state.value == "approved"])
+        items_total = total("ideas")
+        items_completed = counts["ideas", "approved"]
         if items_completed == 0:
             blocking_reason = "Select an idea to continue"
 
     elif step == 3:  # Generate Structure
         items_total = 3  # characters, locations, episode_summaries
-        if len(project.characters) > 0:
-            items_completed += 1
-        if len(project.locations) > 0:
-            items_completed += 1
-        if len(project.episode_summaries) > 0:
-            items_completed += 1
+        items_completed = sum(1 for entity in ("characters", "locations", "episode_summaries") if total(entity) > 0)
         items_pending = items_total - items_completed
         if items_pending > 0:
             blocking_reason = "Generate structure (characters, locations, episode arc)"
 
     elif step == 4:  # Approve Structure
-        chars_approved = all(c.state.value == "approved" for c in project.characters)
-        locs_approved = all(l.state.value == "approved" for l in project.locations)
-        eps_approved = all(e.state.value == "approved" for e in project.episode_summaries)
-
-        items_total = len(project.characters) + len(project.locations) + len(project.episode_summaries)
-        items_completed = (
-            len([c for c in project.characters if c.state.value == "approved"]) +
-            len([l for l in project.locations if l.state.value == "approved"]) +
-            len([e for e in project.episode_summaries if e.state.value == "approved"])
-        )
+        structure = ("characters", "locations", "episode_summaries")
+        items_total = sum(total(entity) for entity in structure)
+        items_completed = sum(counts[entity, "approved"] for entity in structure)
         items_pending = items_total - items_completed
 
-        if not (chars_approved and locs_approved and eps_approved):
+        if items_pending > 0:
             blocking_reason = "Approve all characters, locations, and episode summaries"
 
     elif step == 5:  # Generate Episodes
-        items_total = project.num_episodes
-        items_completed = len([e for e in project.episodes if e.state.value in ["generated", "approved"]])
+        items_total = num_episodes
+        items_completed = counts["episodes", "generated"] + counts["episodes", "approved"]
         items_pending = items_total - items_completed
         if items_pending > 0:
             blocking_reason = f"Generate remaining {items_pending} episodes"
 
     elif step == 10:  # Review Images
-        all_images = []
-        for episode in project.episodes:
-            for scene in episode.scenes:
-                for img_prompt in scene.image_prompts:
-                    if img_prompt.generated_image:
-                        all_images.append(img_prompt.generated_image)
-
-        items_total = len(all_images)
-        items_completed = len([i for i in all_images if i.state.value == "approved"])
-        items_pending = len([i for i in all_images if i.state.value == "generated"])
+        items_total = total("generated_images")
+        items_completed = counts["generated_images", "approved"]
+        items_pending = counts["generated_images", "generated"]
 
         if items_pending > 0:
             blocking_reason = f"Review {items_pending} pending images"
@@ -5,12 +5,14 @@ Recovery API routes for resetting stuck GENERATING entities
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Integer, case, cast, literal, null, select, union_all, update
 from sqlalchemy.orm import Session
 
 from app.database.session import get_db
+from app.api import require_project
 from app.models.models import (
-    Project, Episode, CharacterRef, LocationRef, GeneratedImage,
-    Thumbnail, GeneratedVideo,
+    Episode, Scene, Character, Location, ImagePrompt, VideoPrompt,
+    CharacterRef, LocationRef, GeneratedImage, Thumbnail, GeneratedVideo,
     GenerationState, MediaState
 )
 
@@ -49,82 +51,110 @@ def reset_stuck_entity(entity_type: str, entity_id: str, db: Session = Depends(g
     return {"status": "reset", "entity_id": entity_id, "new_state": "pending"}
 
 
-@router.get("/projects/{project_id}/stuck")
+def _stuck_select(entity_type: str, model_class, rank: int, *order_cols):
+    """One UNION branch: (entity_type, id, created_at) plus sort keys padded
+    with NULLs so every branch has the same shape."""
+    order_cols = order_cols + (null(),) * (3 - len(order_cols))
+    return select(
+        literal(rank).label("rank"),
+        literal(entity_type).label("entity_type"),
+        model_class.id.label("entity_id"),
+        model_class.created_at.label("created_at"),
+        *(cast(col, Integer).label(f"k{n}") for n, col in enumerate(order_cols)),
+    )
+
+
+def _stuck_selects(project_id: str, cutoff: datetime) -> dict:
+    """Entity type -> select of its rows stuck in GENERATING since before
+    cutoff. Each one only touches rows in GENERATING (partial indexes), so
+    the scan stays cheap no matter how much finished media the project holds."""
+    return {
+        "episodes": _stuck_select("episodes", Episode, 0, Episode.episode_number)
+        .where(Episode.project_id == project_id, Episode.state == GenerationState.GENERATING,
+               Episode.created_at < cutoff),
+        # Images then videos per scene, in script order
+        "generated-images": _stuck_select("generated-images", GeneratedImage, 1,
+                                          Episode.episode_number, Scene.scene_number, ImagePrompt.shot_number)
+        .join(ImagePrompt, GeneratedImage.image_prompt_id == ImagePrompt.id)
+        .join(Scene, ImagePrompt.scene_id == Scene.id)
+        .join(Episode, Scene.episode_id == Episode.id)
+        .where(Episode.project_id == project_id, GeneratedImage.state == MediaState.GENERATING,
+               GeneratedImage.created_at < cutoff),
+        "generated-videos": _stuck_select("generated-videos", GeneratedVideo, 2,
+                                          Episode.episode_number, Scene.scene_number, VideoPrompt.segment_number)
+        .join(VideoPrompt, GeneratedVideo.video_prompt_id == VideoPrompt.id)
+        .join(Scene, VideoPrompt.scene_id == Scene.id)
+        .join(Episode, Scene.episode_id == Episode.id)
+        .where(Episode.project_id == project_id, GeneratedVideo.state == MediaState.GENERATING,
+               GeneratedVideo.created_at < cutoff),
+        "character-refs": _stuck_select("character-refs", CharacterRef, 3)
+        .join(Character, CharacterRef.character_id == Character.id)
+        .where(Character.project_id == project_id, CharacterRef.state == MediaState.GENERATING,
+               CharacterRef.created_at < cutoff),
+        "location-refs": _stuck_select("location-refs", LocationRef, 4)
+        .join(Location, LocationRef.location_id == Location.id)
+        .where(Location.project_id == project_id, LocationRef.state == MediaState.GENERATING,
+               LocationRef.created_at < cutoff),
+        "thumbnails": _stuck_select("thumbnails", Thumbnail, 5)
+        .where(Thumbnail.project_id == project_id, Thumbnail.state == MediaState.GENERATING,
+               Thumbnail.created_at < cutoff),
+    }
+
+
+@router.get("/projects/{project_id}/stuck", dependencies=[Depends(require_project())])
 def get_stuck_entities(
     project_id: str,
     minutes: int = Query(default=10, ge=1),
     db: Session = Depends(get_db)
 ):
     """Get all entities stuck in GENERATING for more than N minutes"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
 
     cutoff = datetime.utcnow() - timedelta(minutes=minutes)
-    stuck = []
-
-    # Check episodes
-    for ep in project.episodes:
-        if ep.state == GenerationState.GENERATING and ep.created_at < cutoff:
-            stuck.append({
-                "entity_type": "episodes",
-                "entity_id": ep.id,
-                "state": ep.state.value,
-                "created_at": ep.created_at.isoformat(),
-            })
-
-    # Check nested media entities through episodes -> scenes
-    for ep in project.episodes:
-        for scene in ep.scenes:
-            for ip in scene.image_prompts:
-                if ip.generated_image and ip.generated_image.state == MediaState.GENERATING:
-                    if ip.generated_image.created_at < cutoff:
-                        stuck.append({
-                            "entity_type": "generated-images",
-                            "entity_id": ip.generated_image.id,
-                            "state": ip.generated_image.state.value,
-                            "created_at": ip.generated_image.created_at.isoformat(),
-                        })
-            for vp in scene.video_prompts:
-                if vp.generated_video and vp.generated_video.state == MediaState.GENERATING:
-                    if vp.generated_video.created_at < cutoff:
-                        stuck.append({
-                            "entity_type": "generated-videos",
-                            "entity_id": vp.generated_video.id,
-                            "state": vp.generated_video.state.value,
-                            "created_at": vp.generated_video.created_at.isoformat(),
-                        })
-
-    # Check character refs
-    for char in project.characters:
-        if char.reference and char.reference.state == MediaState.GENERATING:
-            if char.reference.created_at < cutoff:
-                stuck.append({
-                    "entity_type": "character-refs",
-                    "entity_id": char.reference.id,
-                    "state": char.reference.state.value,
-                    "created_at": char.reference.created_at.isoformat(),
-                })
-
-    # Check location refs
-    for loc in project.locations:
-        if loc.reference and loc.reference.state == MediaState.GENERATING:
-            if loc.reference.created_at < cutoff:
-                stuck.append({
-                    "entity_type": "location-refs",
-                    "entity_id": loc.reference.id,
-                    "state": loc.reference.state.value,
-                    "created_at": loc.reference.created_at.isoformat(),
-                })
-
-    # Check thumbnails
-    for thumb in project.thumbnails:
-        if thumb.state == MediaState.GENERATING and thumb.created_at < cutoff:
-            stuck.append({
-                "entity_type": "thumbnails",
-                "entity_id": thumb.id,
-                "state": thumb.state.value,
-                "created_at": thumb.created_at.isoformat(),
-            })
-
+    stuck_query = union_all(*_stuck_selects(project_id, cutoff).values()).subquery()
+
+    # Media sort by (episode, scene) first so a scene's images and videos
+    # stay together, as the old per-scene walk listed them
+    media = stuck_query.c.rank.in_((1, 2))
+    rows = db.execute(
+        select(stuck_query.c.entity_type, stuck_query.c.entity_id, stuck_query.c.created_at)
+        .order_by(
+            case((media, 1), else_=stuck_query.c.rank),
+            stuck_query.c.k0, stuck_query.c.k1, stuck_query.c.rank,
+            stuck_query.c.k2, stuck_query.c.created_at,
+        )
+    ).all()
+
+    stuck = [
+        {
+            "entity_type": row.entity_type,
+            "entity_id": row.entity_id,
+            "state": MediaState.GENERATING.value,
+            "created_at": row.created_at.isoformat(),
+        }
+        for row in rows
+    ]
     return {"stuck": stuck, "count": len(stuck)}
+
+
+@router.post("/projects/{project_id}/reset-stuck", dependencies=[Depends(require_project())])
+def reset_stuck_entities(
+    project_id: str,
+    minutes: int = Query(default=10, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Reset every entity stuck in GENERATING for more than N minutes back to
+    PENDING: one UPDATE per entity table, committed together"""
+
+    cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+    reset = {}
+    for entity_type, stuck_select in _stuck_selects(project_id, cutoff).items():
+        model_class, _, pending_state = ENTITY_MAP[entity_type]
+        stuck_ids = stuck_select.with_only_columns(model_class.id).correlate(None)
+        result = db.execute(
+            update(model_class)
+            .where(model_class.id.in_(stuck_ids))
+            .values(state=pending_state)
+        )
+        reset[entity_type] = result.rowcount
+    db.commit()
+    return {"status": "reset", "reset": reset, "count": sum(reset.values())}
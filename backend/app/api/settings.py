@@ -3,15 +3,18 @@ Settings API - Manage application configuration (API keys, auth, etc.)
 """
 
 import os
+import time
 import logging
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from app.database.session import get_db
+from app.database.session import get_db, get_db_context
+from app.api import upsert
 from app.models.models import AppSetting
+from app.services.cache import LRUCache
 from app.services import generator as generator_module
 from app.middleware.auth import is_auth_enabled, validate_password, create_token
 
@@ -32,6 +35,7 @@ class ApiKeyRequest(BaseModel):
 class ApiKeyStatus(BaseModel):
     configured: bool
     source: str  # "database", "environment", or "none"
+    validation: str = "unknown"  # "valid", "invalid", "pending", or "unknown"
 
 
 class LoginRequest(BaseModel):
@@ -43,21 +47,31 @@ class LoginRequest(BaseModel):
 # ============================================================================
 
 GEMINI_KEY_SETTING = "gemini_api_key"
+VALIDATION_SETTING = "gemini_api_key_validation_status"
 
+# Polled on every page load; holds (expires_at, ApiKeyStatus). Cleared when
+# this process saves or deletes the key, the TTL covers other workers
+_KEY_STATUS_CACHE = LRUCache(maxsize=1)
+KEY_STATUS_TTL = 60
 
-def get_api_key_source(db: Session) -> tuple[bool, str]:
-    """Check where the API key is coming from"""
-    # Check database first
-    setting = db.query(AppSetting).filter(AppSetting.key == GEMINI_KEY_SETTING).first()
-    if setting and setting.value:
-        return True, "database"
+
+def get_api_key_source(db: Session) -> tuple[bool, str, str]:
+    """Check where the API key is coming from, and its last validation result"""
+    # Check database first (key and validation status in one query)
+    settings = dict(
+        db.query(AppSetting.key, AppSetting.value)
+        .filter(AppSetting.key.in_([GEMINI_KEY_SETTING, VALIDATION_SETTING]))
+        .all()
+    )
+    if settings.get(GEMINI_KEY_SETTING):
+        return True, "database", settings.get(VALIDATION_SETTING, "unknown")
 
     # Check environment variable
     env_key = os.getenv("GEMINI_API_KEY", "")
     if env_key:
-        return True, "environment"
+        return True, "environment", "unknown"
 
-    return False, "none"
+    return False, "none", "unknown"
 
 
 def load_api_key_from_db(db: Session) -> str | None:
@@ -68,6 +82,41 @@ def load_api_key_from_db(db: Session) -> str | None:
     return None
 
 
+def _save_validation(db: Session, status: str) -> None:
+    upsert(db, AppSetting, ["key"], {"key": VALIDATION_SETTING, "value": status, "updated_at": datetime.utcnow()})
+
+
+def _probe_api_key(api_key: str) -> str:
+    """Make a minimal test call with the key. Returns "valid", "invalid", or
+    "unknown" when the call failed for other reasons (quota, network, etc.)"""
+    try:
+        from google import genai
+        test_client = genai.Client(api_key=api_key)
+        test_client.models.generate_content(
+            model="gemini-2.0-flash",
+            contents="Say OK",
+            config={"max_output_tokens": 5}
+        )
+    except Exception as e:
+        error_msg = str(e)
+        if any(marker in error_msg for marker in ("API_KEY_INVALID", "401", "PERMISSION_DENIED", "403")):
+            logger.warning(f"API key rejected by Gemini: {error_msg}")
+            return "invalid"
+        logger.warning(f"API key validation warning: {error_msg}")
+        return "unknown"
+    return "valid"
+
+
+def _validate_api_key(api_key: str) -> None:
+    """Background task: probe the saved key and record the result, unless a
+    newer key has replaced it in the meantime"""
+    status = _probe_api_key(api_key)
+    with get_db_context() as db:
+        if load_api_key_from_db(db) == api_key:
+            _save_validation(db, status)
+    _KEY_STATUS_CACHE.clear()
+
+
 # ============================================================================
 # AUTH ENDPOINTS (no prefix - top-level /login and /auth/status)
 # ============================================================================
@@ -98,16 +147,30 @@ def login(request: LoginRequest):
 @router.get("/api-key/status", response_model=ApiKeyStatus)
 def get_api_key_status(db: Session = Depends(get_db)):
     """Check if an API key is configured (never returns the actual key)"""
-    configured, source = get_api_key_source(db)
-    return ApiKeyStatus(configured=configured, source=source)
+    cached = _KEY_STATUS_CACHE.get(GEMINI_KEY_SETTING)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    configured, source, validation = get_api_key_source(db)
+    status = ApiKeyStatus(configured=configured, source=source, validation=validation)
+    # The settings modal polls while a probe runs (possibly in another worker)
+    if validation != "pending":
+        _KEY_STATUS_CACHE.set(GEMINI_KEY_SETTING, (time.monotonic() + KEY_STATUS_TTL, status))
+    return status
 
 
 @router.post("/api-key")
-def set_api_key(request: ApiKeyRequest, db: Session = Depends(get_db)):
+def set_api_key(
+    request: ApiKeyRequest,
+    background_tasks: BackgroundTasks,
+    validate: bool = Query(True),
+    db: Session = Depends(get_db)
+):
     """
     Set the Gemini API key.
-    Validates the key by making a lightweight test call, then saves to DB
-    and reinitializes the generator.
+    Checks the key format, saves it to DB and reinitializes the generator.
+    With ?validate (default) a lightweight test call runs after the response;
+    its result is reported by /settings/api-key/status.
     """
     api_key = request.api_key.strip()
     if not api_key:
@@ -116,51 +179,30 @@ def set_api_key(request: ApiKeyRequest, db: Session = Depends(get_db)):
     if not api_key.startswith("AIza"):
         raise HTTPException(status_code=400, detail="Invalid API key format. Gemini keys start with 'AIza'")
 
-    # Validate the key by trying to initialize a generator with it
-    try:
-        from google import genai
-        test_client = genai.Client(api_key=api_key)
-        # Make a minimal test call to verify the key works
-        test_client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents="Say OK",
-            config={"max_output_tokens": 5}
-        )
-    except Exception as e:
-        error_msg = str(e)
-        if "API_KEY_INVALID" in error_msg or "401" in error_msg:
-            raise HTTPException(status_code=400, detail="Invalid API key. Please check your key and try again.")
-        elif "PERMISSION_DENIED" in error_msg or "403" in error_msg:
-            raise HTTPException(status_code=400, detail="API key does not have permission to access Gemini. Check your API key permissions.")
-        else:
-            logger.warning(f"API key validation warning: {error_msg}")
-            # Key format looks right but test failed for other reasons (quota, network, etc.)
-            # Still save it — the user can troubleshoot later
-
-    # Save to database
-    setting = db.query(AppSetting).filter(AppSetting.key == GEMINI_KEY_SETTING).first()
-    if setting:
-        setting.value = api_key
-        setting.updated_at = datetime.utcnow()
-    else:
-        setting = AppSetting(key=GEMINI_KEY_SETTING, value=api_key)
-        db.add(setting)
+    # Save to database (one upsert statement per setting)
+    upsert(db, AppSetting, ["key"], {"key": GEMINI_KEY_SETTING, "value": api_key, "updated_at": datetime.utcnow()})
+    _save_validation(db, "pending" if validate else "unknown")
     db.commit()
+    _KEY_STATUS_CACHE.clear()
 
     # Reinitialize the generator with the new key
     generator_module.reinitialize(api_key)
 
     logger.info("API key updated and generator reinitialized")
-    return {"status": "ok", "message": "API key saved and validated successfully"}
+    if validate:
+        background_tasks.add_task(_validate_api_key, api_key)
+        return {"status": "ok", "message": "API key saved. Validating in the background."}
+    return {"status": "ok", "message": "API key saved"}
 
 
 @router.delete("/api-key")
 def delete_api_key(db: Session = Depends(get_db)):
     """Remove the stored API key. Falls back to environment variable if set."""
-    setting = db.query(AppSetting).filter(AppSetting.key == GEMINI_KEY_SETTING).first()
-    if setting:
-        db.delete(setting)
-        db.commit()
+    db.query(AppSetting).filter(
+        AppSetting.key.in_([GEMINI_KEY_SETTING, VALIDATION_SETTING])
+    ).delete(synchronize_session=False)
+    db.commit()
+    _KEY_STATUS_CACHE.clear()
 
     # Reinitialize with env var fallback
     env_key = os.getenv("GEMINI_API_KEY", "")
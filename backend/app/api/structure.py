@@ -4,7 +4,7 @@ Structure API routes (Step 3-4): Characters, Locations, Episode Summaries
 
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 
 from app.database.session import get_db
@@ -18,7 +18,7 @@ from app.models.schemas import (
     EpisodeSummaryResponse, EpisodeSummaryUpdate
 )
 from app.services.generator import generator
-from app.api import parse_state_filter
+from app.api import parse_state_filter, state_members, require_project, transition_by_id
 from app.middleware.rate_limit import limiter, AI_GENERATION_LIMIT
 
 logger = logging.getLogger(__name__)
@@ -32,11 +32,13 @@ router = APIRouter(prefix="/projects/{project_id}", tags=["structure"])
 
 @router.post("/structure/generate")
 @limiter.limit(AI_GENERATION_LIMIT)
-async def generate_structure(request: Request, project_id: str, db: Session = Depends(get_db)):
+async def generate_structure(
+    request: Request,
+    project_id: str,
+    project: Project = Depends(require_project()),
+    db: Session = Depends(get_db)
+):
     """Generate characters, locations, and episode arc (Step 3)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
 
     # Get approved idea
     approved_idea = next((i for i in project.ideas if i.state == IdeaState.APPROVED), None)
@@ -158,14 +160,15 @@ async def generate_structure(request: Request, project_id: str, db: Session = De
 # ============================================================================
 
 @router.get("/characters", response_model=List[CharacterResponse])
-def list_characters(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def list_characters(
+    state: Optional[str] = Query(None),
+    project: Project = Depends(require_project(selectinload(Project.characters)))
+):
     """List all characters. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     states = parse_state_filter(state)
     if states:
-        return [c for c in project.characters if c.state.value in states]
+        members = state_members(StructureState, states)
+        return [c for c in project.characters if c.state in members]
     return project.characters
 
 
@@ -201,11 +204,7 @@ def update_character(character_id: str, data: CharacterUpdate, db: Session = Dep
 @character_router.post("/{character_id}/approve")
 def approve_character(character_id: str, db: Session = Depends(get_db)):
     """Approve a character"""
-    char = db.query(Character).filter(Character.id == character_id).first()
-    if not char:
-        raise HTTPException(status_code=404, detail="Character not found")
-    
-    char.approve()
+    transition_by_id(db, Character, character_id, StructureState.APPROVED)
     db.commit()
     return {"status": "approved", "character_id": character_id}
 
@@ -215,14 +214,15 @@ def approve_character(character_id: str, db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.get("/locations", response_model=List[LocationResponse])
-def list_locations(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def list_locations(
+    state: Optional[str] = Query(None),
+    project: Project = Depends(require_project(selectinload(Project.locations)))
+):
     """List all locations. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     states = parse_state_filter(state)
     if states:
-        return [l for l in project.locations if l.state.value in states]
+        members = state_members(StructureState, states)
+        return [l for l in project.locations if l.state in members]
     return project.locations
 
 
@@ -258,11 +258,7 @@ def update_location(location_id: str, data: LocationUpdate, db: Session = Depend
 @location_router.post("/{location_id}/approve")
 def approve_location(location_id: str, db: Session = Depends(get_db)):
     """Approve a location"""
-    loc = db.query(Location).filter(Location.id == location_id).first()
-    if not loc:
-        raise HTTPException(status_code=404, detail="Location not found")
-    
-    loc.approve()
+    transition_by_id(db, Location, location_id, StructureState.APPROVED)
     db.commit()
     return {"status": "approved", "location_id": location_id}
 
@@ -272,15 +268,16 @@ def approve_location(location_id: str, db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.get("/episode-summaries", response_model=List[EpisodeSummaryResponse])
-def list_episode_summaries(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
+def list_episode_summaries(
+    state: Optional[str] = Query(None),
+    project: Project = Depends(require_project(selectinload(Project.episode_summaries)))
+):
     """List all episode summaries. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     summaries = project.episode_summaries
     states = parse_state_filter(state)
     if states:
-        summaries = [s for s in summaries if s.state.value in states]
+        members = state_members(StructureState, states)
+        summaries = [s for s in summaries if s.state in members]
     return sorted(summaries, key=lambda x: x.episode_number)
 
 
@@ -316,11 +313,7 @@ def update_episode_summary(summary_id: str, data: EpisodeSummaryUpdate, db: Sess
 @episode_summary_router.post("/{summary_id}/approve")
 def approve_episode_summary(summary_id: str, db: Session = Depends(get_db)):
     """Approve an episode summary"""
-    ep = db.query(EpisodeSummary).filter(EpisodeSummary.id == summary_id).first()
-    if not ep:
-        raise HTTPException(status_code=404, detail="Episode summary not found")
-    
-    ep.approve()
+    transition_by_id(db, EpisodeSummary, summary_id, StructureState.APPROVED, not_found="Episode summary not found")
     db.commit()
     return {"status": "approved", "summary_id": summary_id}
 
@@ -330,11 +323,15 @@ def approve_episode_summary(summary_id: str, db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.post("/structure/approve-all")
-def approve_all_structure(project_id: str, db: Session = Depends(get_db)):
+def approve_all_structure(
+    project: Project = Depends(require_project(
+        selectinload(Project.characters),
+        selectinload(Project.locations),
+        selectinload(Project.episode_summaries),
+    )),
+    db: Session = Depends(get_db)
+):
     """Approve all characters, locations, and episode summaries at once"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
     
     for char in project.characters:
         if char.state != StructureState.APPROVED:
@@ -367,10 +364,7 @@ def approve_all_structure(project_id: str, db: Session = Depends(get_db)):
 @character_router.post("/{character_id}/unapprove")
 def unapprove_character(character_id: str, db: Session = Depends(get_db)):
     """Unapprove a character (revert to modified for re-editing)"""
-    char = db.query(Character).filter(Character.id == character_id).first()
-    if not char:
-        raise HTTPException(status_code=404, detail="Character not found")
-    char.unapprove()
+    transition_by_id(db, Character, character_id, StructureState.MODIFIED)
     db.commit()
     return {"status": "unapproved", "character_id": character_id}
 
@@ -378,10 +372,7 @@ def unapprove_character(character_id: str, db: Session = Depends(get_db)):
 @location_router.post("/{location_id}/unapprove")
 def unapprove_location(location_id: str, db: Session = Depends(get_db)):
     """Unapprove a location (revert to modified for re-editing)"""
-    loc = db.query(Location).filter(Location.id == location_id).first()
-    if not loc:
-        raise HTTPException(status_code=404, detail="Location not found")
-    loc.unapprove()
+    transition_by_id(db, Location, location_id, StructureState.MODIFIED)
     db.commit()
     return {"status": "unapproved", "location_id": location_id}
 
@@ -389,9 +380,6 @@ def unapprove_location(location_id: str, db: Session = Depends(get_db)):
 @episode_summary_router.post("/{summary_id}/unapprove")
 def unapprove_episode_summary(summary_id: str, db: Session = Depends(get_db)):
     """Unapprove an episode summary (revert to modified for re-editing)"""
-    ep = db.query(EpisodeSummary).filter(EpisodeSummary.id == summary_id).first()
-    if not ep:
-        raise HTTPException(status_code=404, detail="Episode summary not found")
-    ep.unapprove()
+    transition_by_id(db, EpisodeSummary, summary_id, StructureState.MODIFIED, not_found="Episode summary not found")
     db.commit()
     return {"status": "unapproved", "summary_id": summary_id}
@@ -5,21 +5,21 @@ Videos API routes (Steps 11, 12)
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Optional
 import os
 import logging
 
 from app.database.session import get_db
 from app.models.models import (
-    Project, Episode, Scene, VideoPrompt, GeneratedVideo,
-    GenerationState, MediaState, PromptState
+    Project, Episode, Scene, ImagePrompt, VideoPrompt, GeneratedVideo,
+    GenerationState, MediaState, PromptState, generate_uuid
 )
 from app.models.schemas import (
     VideoPromptResponse, VideoPromptUpdate, GeneratedVideoResponse
 )
-from app.services.generator import generator, OUTPUTS_DIR
-from app.api import parse_state_filter
+from app.services.generator import generator, output_url, OUTPUTS_DIR
+from app.api import parse_state_filter, state_members, transition_by_id, load_project, scene_video_options, run_or_enqueue
 from app.middleware.rate_limit import limiter, AI_GENERATION_LIMIT, MEDIA_GENERATION_LIMIT
 
 logger = logging.getLogger(__name__)
@@ -34,28 +34,35 @@ router = APIRouter(prefix="/projects/{project_id}", tags=["videos"])
 @router.get("/video-prompts", response_model=List[VideoPromptResponse])
 def list_video_prompts(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
     """List all video prompts for project. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    if not db.query(Project.id).filter(Project.id == project_id).first():
         raise HTTPException(status_code=404, detail="Project not found")
 
-    prompts = []
-    for episode in sorted(project.episodes, key=lambda e: e.episode_number):
-        for scene in sorted(episode.scenes, key=lambda s: s.scene_number):
-            for prompt in sorted(scene.video_prompts, key=lambda p: p.segment_number):
-                prompts.append(prompt)
+    # One ordered join instead of walking episodes → scenes → prompts
+    query = (
+        db.query(VideoPrompt)
+        .options(joinedload(VideoPrompt.generated_video))
+        .join(Scene, VideoPrompt.scene_id == Scene.id)
+        .join(Episode, Scene.episode_id == Episode.id)
+        .filter(Episode.project_id == project_id)
+    )
     states = parse_state_filter(state)
     if states:
-        prompts = [p for p in prompts if p.state.value in states]
-    return prompts
+        query = query.filter(VideoPrompt.state.in_(state_members(PromptState, states)))
+    return query.order_by(Episode.episode_number, Scene.scene_number, VideoPrompt.segment_number).all()
 
 
 @router.post("/video-prompts/generate")
 @limiter.limit(AI_GENERATION_LIMIT)
 async def generate_video_prompts(request: Request, project_id: str, db: Session = Depends(get_db)):
     """Generate video prompts for all scenes (Step 11)"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    scenes = selectinload(Project.episodes).selectinload(Episode.scenes)
+    project = load_project(
+        db, project_id,
+        selectinload(Project.characters),
+        scenes.selectinload(Scene.video_prompts),
+        scenes.joinedload(Scene.location),
+        scenes.selectinload(Scene.image_prompts).joinedload(ImagePrompt.generated_image),
+    )
     
     characters_data = [
         {"name": c.name, "physical_description": c.physical_description}
@@ -95,6 +102,12 @@ async def generate_video_prompts(request: Request, project_id: str, db: Session
                 for p in scene.image_prompts
             ]
             
+            # First generated image per shot number, for reference lookups
+            image_id_by_shot = {}
+            for img_prompt in scene.image_prompts:
+                if img_prompt.generated_image:
+                    image_id_by_shot.setdefault(img_prompt.shot_number, img_prompt.generated_image.id)
+            
             # Generate video prompts
             prompts_data = await generator.generate_video_prompts(
                 scene=scene_data,
@@ -106,12 +119,7 @@ async def generate_video_prompts(request: Request, project_id: str, db: Session
             for prompt_data in prompts_data:
                 # Find reference image if specified
                 ref_shot = prompt_data.get("reference_image_shot")
-                ref_image_id = None
-                if ref_shot:
-                    for img_prompt in scene.image_prompts:
-                        if img_prompt.shot_number == ref_shot and img_prompt.generated_image:
-                            ref_image_id = img_prompt.generated_image.id
-                            break
+                ref_image_id = image_id_by_shot.get(ref_shot) if ref_shot else None
                 
                 prompt = VideoPrompt(
                     scene_id=scene.id,
@@ -168,11 +176,7 @@ def update_video_prompt(prompt_id: str, data: VideoPromptUpdate, db: Session = D
 @video_prompt_router.post("/{prompt_id}/approve")
 def approve_video_prompt(prompt_id: str, db: Session = Depends(get_db)):
     """Approve a video prompt"""
-    prompt = db.query(VideoPrompt).filter(VideoPrompt.id == prompt_id).first()
-    if not prompt:
-        raise HTTPException(status_code=404, detail="Video prompt not found")
-    
-    prompt.approve()
+    transition_by_id(db, VideoPrompt, prompt_id, PromptState.APPROVED, not_found="Video prompt not found")
     db.commit()
     return {"status": "approved"}
 
@@ -183,11 +187,18 @@ def approve_video_prompt(prompt_id: str, db: Session = Depends(get_db)):
 
 @router.post("/videos/generate")
 @limiter.limit(MEDIA_GENERATION_LIMIT)
-async def generate_videos(request: Request, project_id: str, db: Session = Depends(get_db)):
+async def generate_videos(
+    request: Request,
+    project_id: str,
+    background: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     """Generate videos from approved prompts (Step 12) using Veo 3.1"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    return await run_or_enqueue(db, project_id, "videos", background, _generate_videos)
+
+
+async def _generate_videos(db: Session, project_id: str) -> dict:
+    project = load_project(db, project_id, *scene_video_options())
 
     videos_created = 0
     errors = []
@@ -199,9 +210,8 @@ async def generate_videos(request: Request, project_id: str, db: Session = Depen
                 needs_generation = False
 
                 if prompt.state == PromptState.APPROVED and not video:
-                    video = GeneratedVideo(video_prompt_id=prompt.id)
+                    video = GeneratedVideo(id=generate_uuid(), video_prompt_id=prompt.id, state=MediaState.PENDING)
                     db.add(video)
-                    db.flush()
                     needs_generation = True
                 elif video and video.state == MediaState.GENERATING:
                     # Retry stuck GENERATING videos
@@ -211,8 +221,8 @@ async def generate_videos(request: Request, project_id: str, db: Session = Depen
                 if not needs_generation:
                     continue
 
+                # Written once, in its final state, by the commit at the end
                 video.mark_generating()
-                db.flush()
 
                 save_path = os.path.join(
                     OUTPUTS_DIR, "videos",
@@ -226,9 +236,8 @@ async def generate_videos(request: Request, project_id: str, db: Session = Depen
                         duration_seconds=prompt.duration_seconds or 8,
                         aspect_ratio="9:16"
                     )
-                    rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
                     video.mark_generated(
-                        f"/outputs/{rel_path.replace(os.sep, '/')}",
+                        output_url(save_path),
                         duration=prompt.duration_seconds
                     )
                     videos_created += 1
@@ -253,20 +262,20 @@ async def generate_videos(request: Request, project_id: str, db: Session = Depen
 @router.get("/videos", response_model=List[GeneratedVideoResponse])
 def list_videos(project_id: str, state: Optional[str] = Query(None), db: Session = Depends(get_db)):
     """List all generated videos. Optional ?state= filter (comma-separated)."""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    if not db.query(Project.id).filter(Project.id == project_id).first():
         raise HTTPException(status_code=404, detail="Project not found")
 
-    videos = []
-    for episode in sorted(project.episodes, key=lambda e: e.episode_number):
-        for scene in sorted(episode.scenes, key=lambda s: s.scene_number):
-            for prompt in scene.video_prompts:
-                if prompt.generated_video:
-                    videos.append(prompt.generated_video)
+    query = (
+        db.query(GeneratedVideo)
+        .join(VideoPrompt, GeneratedVideo.video_prompt_id == VideoPrompt.id)
+        .join(Scene, VideoPrompt.scene_id == Scene.id)
+        .join(Episode, Scene.episode_id == Episode.id)
+        .filter(Episode.project_id == project_id)
+    )
     states = parse_state_filter(state)
     if states:
-        videos = [v for v in videos if v.state.value in states]
-    return videos
+        query = query.filter(GeneratedVideo.state.in_(state_members(MediaState, states)))
+    return query.order_by(Episode.episode_number, Scene.scene_number, VideoPrompt.segment_number).all()
 
 
 # Generated video routes
@@ -276,11 +285,7 @@ generated_video_router = APIRouter(prefix="/generated-videos", tags=["videos"])
 @generated_video_router.post("/{video_id}/approve")
 def approve_generated_video(video_id: str, db: Session = Depends(get_db)):
     """Approve generated video"""
-    video = db.query(GeneratedVideo).filter(GeneratedVideo.id == video_id).first()
-    if not video:
-        raise HTTPException(status_code=404, detail="Video not found")
-    
-    video.approve()
+    transition_by_id(db, GeneratedVideo, video_id, MediaState.APPROVED, not_found="Video not found")
     db.commit()
     return {"status": "approved"}
 
@@ -288,11 +293,7 @@ def approve_generated_video(video_id: str, db: Session = Depends(get_db)):
 @generated_video_router.post("/{video_id}/reject")
 def reject_generated_video(video_id: str, db: Session = Depends(get_db)):
     """Reject generated video"""
-    video = db.query(GeneratedVideo).filter(GeneratedVideo.id == video_id).first()
-    if not video:
-        raise HTTPException(status_code=404, detail="Video not found")
-    
-    video.reject()
+    transition_by_id(db, GeneratedVideo, video_id, MediaState.REJECTED, not_found="Video not found")
     db.commit()
     return {"status": "rejected"}
 
@@ -307,7 +308,6 @@ async def regenerate_generated_video(video_id: str, db: Session = Depends(get_db
     prompt = video.video_prompt
     video.reset_for_regen()
     video.mark_generating()
-    db.flush()
 
     save_path = os.path.join(
         OUTPUTS_DIR, "videos",
@@ -321,14 +321,13 @@ async def regenerate_generated_video(video_id: str, db: Session = Depends(get_db
             duration_seconds=prompt.duration_seconds or 8,
             aspect_ratio="9:16"
         )
-        rel_path = os.path.relpath(save_path, OUTPUTS_DIR)
         video.mark_generated(
-            f"/outputs/{rel_path.replace(os.sep, '/')}",
+            output_url(save_path),
             duration=prompt.duration_seconds
         )
-        db.commit()
-        return {"status": "regenerated"}
     except Exception as e:
         video.reset_for_regen()  # GENERATING → PENDING so retry works
-        db.commit()
         raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)}")
+    finally:
+        db.commit()
+    return {"status": "regenerated"}
@@ -13,12 +13,20 @@ from app.models.models import Base
 # Database URL from environment or default
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///telenovela.db")
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False
-)
+# Connection pool settings (server databases only; SQLite keeps its default pool)
+if "sqlite" in DATABASE_URL:
+    engine_kwargs = {"connect_args": {"check_same_thread": False}}
+else:
+    engine_kwargs = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_use_lifo": True,  # reuse the most recently returned (warm) connection
+        "pool_pre_ping": True,
+        "pool_recycle": 1800,
+    }
+
+# Create engine (once per process, shared by all requests)
+engine = create_engine(DATABASE_URL, echo=False, **engine_kwargs)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
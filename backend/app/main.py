@@ -16,10 +16,11 @@ import os
 import logging
 
 from app.database.session import init_db, get_db_context
-from app.api import projects, ideas, structure, episodes, images, videos, export, settings, recovery
+from app.api import projects, ideas, structure, episodes, images, videos, export, settings, recovery, jobs
 from app.models.models import AppSetting
 from app.models.mixins import InvalidTransitionError
 from app.services import generator as generator_module
+from app.services.jobs import fail_interrupted_jobs
 from app.middleware.rate_limit import limiter
 from app.middleware.auth import AuthMiddleware
 
@@ -119,6 +120,9 @@ app.include_router(export.router)
 # Recovery routes (reset stuck entities)
 app.include_router(recovery.router)
 
+# Background job status
+app.include_router(jobs.router)
+
 
 # ============================================================================
 # SERVE FRONTEND IN PRODUCTION
@@ -138,7 +142,7 @@ if os.path.isdir(FRONTEND_DIR):
         "character-refs", "location-refs", "generated-images",
         "thumbnails", "video-prompts", "generated-videos",
         "settings", "outputs", "docs", "openapi.json", "health",
-        "login", "auth", "export", "recovery",
+        "login", "auth", "export", "recovery", "jobs",
     )
 
     from starlette.middleware.base import BaseHTTPMiddleware
@@ -222,6 +226,18 @@ def startup():
     except Exception as e:
         logger.warning(f"Could not load saved API key: {e}")
 
+    # Fail background jobs a previous process died in the middle of
+    try:
+        with get_db_context() as db:
+            interrupted = fail_interrupted_jobs(db)
+        if interrupted:
+            logger.info(f"Marked {interrupted} interrupted background job(s) as failed")
+    except Exception as e:
+        logger.warning(f"Could not clean up interrupted jobs: {e}")
+
+    # Trim image cache entries orphaned before the last shutdown
+    generator_module.prune_image_cache()
+
     # Log auth status
     if os.getenv("APP_PASSWORD", "").strip():
         logger.info("Password authentication is ENABLED")
@@ -7,6 +7,7 @@ If APP_PASSWORD is not set, auth is completely disabled (for local dev).
 import os
 import uuid
 import logging
+from functools import lru_cache
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 from fastapi import Request
@@ -33,8 +34,9 @@ EXEMPT_PREFIXES = (
 )
 
 
+@lru_cache(maxsize=1)
 def is_auth_enabled() -> bool:
-    """Check if password auth is enabled"""
+    """Check if password auth is enabled (read once; APP_PASSWORD changes need a restart)"""
     return bool(os.getenv("APP_PASSWORD", "").strip())
 
 
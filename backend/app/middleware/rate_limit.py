@@ -3,11 +3,28 @@ Rate limiting middleware using slowapi.
 Protects expensive AI generation endpoints from abuse.
 """
 
+import os
+
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.requests import Request
+
+# Counter storage. The in-memory default is per uvicorn worker; point this at
+# a shared store (e.g. redis://redis:6379/0, needs the redis package) so all
+# workers enforce one limit with atomic INCR/EXPIRE.
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+
+
+def client_project_key(request: Request) -> str:
+    """Client IP, plus the project for project-scoped routes, so a burst on
+    one project doesn't use up the client's budget for the others."""
+    project_id = request.path_params.get("project_id")
+    address = get_remote_address(request)
+    return f"{address}:{project_id}" if project_id else address
+
 
-# Create the limiter instance (keyed by client IP)
-limiter = Limiter(key_func=get_remote_address)
+# Create the limiter instance
+limiter = Limiter(key_func=client_project_key, storage_uri=RATE_LIMIT_STORAGE_URI)
 
 # Rate limit strings for different endpoint tiers
 AI_GENERATION_LIMIT = "5/minute"     # Text generation (ideas, structure, scripts, prompts)
@@ -47,3 +47,8 @@ class StateMachineMixin:
         """Check if transition is valid without performing it."""
         allowed = self.VALID_TRANSITIONS.get(self.state, set())
         return new_state in allowed
+
+    @classmethod
+    def sources_for(cls, new_state):
+        """States from which new_state may be reached (for guarded bulk UPDATEs)."""
+        return [s for s, allowed in cls.VALID_TRANSITIONS.items() if new_state in allowed]
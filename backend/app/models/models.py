@@ -7,8 +7,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, List
 from sqlalchemy import (
-    Column, String, Integer, Float, Text, DateTime, ForeignKey,
-    Enum as SQLEnum, JSON, create_engine
+    Column, String, Integer, Float, Text, DateTime, ForeignKey, Index,
+    Enum as SQLEnum, JSON, create_engine, text
 )
 from sqlalchemy.orm import relationship, declarative_base, Session
 from sqlalchemy.dialects.sqlite import JSON as SQLiteJSON
@@ -22,6 +22,13 @@ def generate_uuid():
     return str(uuid.uuid4())
 
 
+def _generating_index(table: str) -> Index:
+    """Partial index over just the rows in GENERATING (normally none or a
+    handful), so the stuck-entity scan never reads the whole table."""
+    where = text("state = 'GENERATING'")
+    return Index(f"ix_{table}_generating", "created_at", sqlite_where=where, postgresql_where=where)
+
+
 # ============================================================================
 # STATE ENUMS
 # ============================================================================
@@ -79,8 +86,8 @@ class Project(Base):
     ideas = relationship("Idea", back_populates="project", cascade="all, delete-orphan")
     characters = relationship("Character", back_populates="project", cascade="all, delete-orphan")
     locations = relationship("Location", back_populates="project", cascade="all, delete-orphan")
-    episode_summaries = relationship("EpisodeSummary", back_populates="project", cascade="all, delete-orphan")
-    episodes = relationship("Episode", back_populates="project", cascade="all, delete-orphan")
+    episode_summaries = relationship("EpisodeSummary", back_populates="project", cascade="all, delete-orphan", order_by="EpisodeSummary.episode_number")
+    episodes = relationship("Episode", back_populates="project", cascade="all, delete-orphan", order_by="Episode.episode_number")
     thumbnails = relationship("Thumbnail", back_populates="project", cascade="all, delete-orphan")
     
     def can_advance_to(self, step: int) -> bool:
@@ -174,6 +181,9 @@ class Project(Base):
 
 class Idea(StateMachineMixin, Base):
     __tablename__ = "ideas"
+    __table_args__ = (
+        Index("ix_ideas_project_state", "project_id", "state"),
+    )
 
     VALID_TRANSITIONS = {
         IdeaState.DRAFT: {IdeaState.APPROVED, IdeaState.REJECTED},
@@ -190,6 +200,7 @@ class Idea(StateMachineMixin, Base):
     main_conflict = Column(Text)
     state = Column(SQLEnum(IdeaState), default=IdeaState.DRAFT)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     project = relationship("Project", back_populates="ideas")
 
@@ -210,6 +221,9 @@ class Idea(StateMachineMixin, Base):
 
 class Character(StateMachineMixin, Base):
     __tablename__ = "characters"
+    __table_args__ = (
+        Index("ix_characters_project_state", "project_id", "state"),
+    )
 
     VALID_TRANSITIONS = {
         StructureState.DRAFT: {StructureState.MODIFIED, StructureState.APPROVED},
@@ -230,6 +244,7 @@ class Character(StateMachineMixin, Base):
     arc = Column(Text)
     state = Column(SQLEnum(StructureState), default=StructureState.DRAFT)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     project = relationship("Project", back_populates="characters")
     reference = relationship("CharacterRef", back_populates="character", uselist=False, cascade="all, delete-orphan")
@@ -248,6 +263,9 @@ class Character(StateMachineMixin, Base):
 
 class Location(StateMachineMixin, Base):
     __tablename__ = "locations"
+    __table_args__ = (
+        Index("ix_locations_project_state", "project_id", "state"),
+    )
 
     VALID_TRANSITIONS = {
         StructureState.DRAFT: {StructureState.MODIFIED, StructureState.APPROVED},
@@ -265,6 +283,7 @@ class Location(StateMachineMixin, Base):
     visual_details = Column(Text)
     state = Column(SQLEnum(StructureState), default=StructureState.DRAFT)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     project = relationship("Project", back_populates="locations")
     reference = relationship("LocationRef", back_populates="location", uselist=False, cascade="all, delete-orphan")
@@ -283,6 +302,10 @@ class Location(StateMachineMixin, Base):
 
 class EpisodeSummary(StateMachineMixin, Base):
     __tablename__ = "episode_summaries"
+    __table_args__ = (
+        Index("ix_episode_summaries_project_num", "project_id", "episode_number"),
+        Index("ix_episode_summaries_project_state", "project_id", "state"),
+    )
 
     VALID_TRANSITIONS = {
         StructureState.DRAFT: {StructureState.MODIFIED, StructureState.APPROVED},
@@ -320,6 +343,10 @@ class EpisodeSummary(StateMachineMixin, Base):
 
 class Episode(StateMachineMixin, Base):
     __tablename__ = "episodes"
+    __table_args__ = (
+        Index("ix_episodes_project_num", "project_id", "episode_number"),
+        Index("ix_episodes_project_state_num", "project_id", "state", "episode_number"),
+    )
 
     VALID_TRANSITIONS = {
         GenerationState.PENDING: {GenerationState.GENERATING},
@@ -337,11 +364,16 @@ class Episode(StateMachineMixin, Base):
     cliffhanger_moment = Column(Text)
     state = Column(SQLEnum(GenerationState), default=GenerationState.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     project = relationship("Project", back_populates="episodes")
     scenes = relationship("Scene", back_populates="episode", cascade="all, delete-orphan", order_by="Scene.scene_number")
     thumbnails = relationship("Thumbnail", back_populates="episode", cascade="all, delete-orphan")
 
+    @property
+    def scenes_count(self) -> int:
+        return len(self.scenes)
+
     def mark_generating(self):
         self.transition_to(GenerationState.GENERATING)
 
@@ -365,9 +397,12 @@ class Episode(StateMachineMixin, Base):
 
 class Scene(Base):
     __tablename__ = "scenes"
+    __table_args__ = (
+        Index("ix_scenes_episode_num", "episode_id", "scene_number"),
+    )
     
     id = Column(String, primary_key=True, default=generate_uuid)
-    episode_id = Column(String, ForeignKey("episodes.id"), nullable=False)
+    episode_id = Column(String, ForeignKey("episodes.id", ondelete="CASCADE"), nullable=False)
     location_id = Column(String, ForeignKey("locations.id"), nullable=True)
     scene_number = Column(Integer, nullable=False)
     title = Column(String)
@@ -382,14 +417,25 @@ class Scene(Base):
     location = relationship("Location", back_populates="scenes")
     dialogue_lines = relationship("DialogueLine", back_populates="scene", cascade="all, delete-orphan", order_by="DialogueLine.line_number")
     image_prompts = relationship("ImagePrompt", back_populates="scene", cascade="all, delete-orphan", order_by="ImagePrompt.shot_number")
-    video_prompts = relationship("VideoPrompt", back_populates="scene", cascade="all, delete-orphan")
+    video_prompts = relationship("VideoPrompt", back_populates="scene", cascade="all, delete-orphan", order_by="VideoPrompt.segment_number")
+
+    @property
+    def image_prompts_count(self) -> int:
+        return len(self.image_prompts)
+
+    @property
+    def video_prompts_count(self) -> int:
+        return len(self.video_prompts)
 
 
 class DialogueLine(Base):
     __tablename__ = "dialogue_lines"
+    __table_args__ = (
+        Index("ix_dialogue_lines_scene_num", "scene_id", "line_number"),
+    )
     
     id = Column(String, primary_key=True, default=generate_uuid)
-    scene_id = Column(String, ForeignKey("scenes.id"), nullable=False)
+    scene_id = Column(String, ForeignKey("scenes.id", ondelete="CASCADE"), nullable=False)
     character_id = Column(String, ForeignKey("characters.id"), nullable=True)
     line_number = Column(Integer, nullable=False)
     character_name = Column(String)  # Denormalized for convenience
@@ -408,6 +454,9 @@ class DialogueLine(Base):
 
 class ImagePrompt(StateMachineMixin, Base):
     __tablename__ = "image_prompts"
+    __table_args__ = (
+        Index("ix_image_prompts_scene_shot", "scene_id", "shot_number"),
+    )
 
     VALID_TRANSITIONS = {
         PromptState.PENDING: {PromptState.GENERATED},
@@ -416,7 +465,7 @@ class ImagePrompt(StateMachineMixin, Base):
     }
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    scene_id = Column(String, ForeignKey("scenes.id"), nullable=False)
+    scene_id = Column(String, ForeignKey("scenes.id", ondelete="CASCADE"), nullable=False)
     shot_number = Column(Integer, nullable=False)
     shot_type = Column(String)  # wide, medium, close-up, etc.
     description = Column(Text)  # What's happening in the shot
@@ -424,6 +473,7 @@ class ImagePrompt(StateMachineMixin, Base):
     negative_prompt = Column(Text)
     state = Column(SQLEnum(PromptState), default=PromptState.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     scene = relationship("Scene", back_populates="image_prompts")
     generated_image = relationship("GeneratedImage", back_populates="image_prompt", uselist=False, cascade="all, delete-orphan")
@@ -441,6 +491,10 @@ class ImagePrompt(StateMachineMixin, Base):
 
 class CharacterRef(StateMachineMixin, Base):
     __tablename__ = "character_refs"
+    __table_args__ = (
+        Index("ix_character_refs_character_id", "character_id", unique=True),
+        _generating_index("character_refs"),
+    )
 
     VALID_TRANSITIONS = {
         MediaState.PENDING: {MediaState.GENERATING},
@@ -455,8 +509,10 @@ class CharacterRef(StateMachineMixin, Base):
     prompt_text = Column(Text)
     image_path = Column(String)  # Local file path
     image_url = Column(String)   # Or remote URL
+    prompt_hash = Column(String)  # digest of the inputs behind image_path
     state = Column(SQLEnum(MediaState), default=MediaState.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     character = relationship("Character", back_populates="reference")
 
@@ -476,10 +532,15 @@ class CharacterRef(StateMachineMixin, Base):
     def reset_for_regen(self):
         self.transition_to(MediaState.PENDING)
         self.image_path = None
+        self.prompt_hash = None
 
 
 class LocationRef(StateMachineMixin, Base):
     __tablename__ = "location_refs"
+    __table_args__ = (
+        Index("ix_location_refs_location_id", "location_id", unique=True),
+        _generating_index("location_refs"),
+    )
 
     VALID_TRANSITIONS = {
         MediaState.PENDING: {MediaState.GENERATING},
@@ -494,8 +555,10 @@ class LocationRef(StateMachineMixin, Base):
     prompt_text = Column(Text)
     image_path = Column(String)
     image_url = Column(String)
+    prompt_hash = Column(String)  # digest of the inputs behind image_path
     state = Column(SQLEnum(MediaState), default=MediaState.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     location = relationship("Location", back_populates="reference")
 
@@ -515,6 +578,7 @@ class LocationRef(StateMachineMixin, Base):
     def reset_for_regen(self):
         self.transition_to(MediaState.PENDING)
         self.image_path = None
+        self.prompt_hash = None
 
 
 # ============================================================================
@@ -523,6 +587,10 @@ class LocationRef(StateMachineMixin, Base):
 
 class GeneratedImage(StateMachineMixin, Base):
     __tablename__ = "generated_images"
+    __table_args__ = (
+        Index("ix_generated_images_prompt_state", "image_prompt_id", "state"),
+        _generating_index("generated_images"),
+    )
 
     VALID_TRANSITIONS = {
         MediaState.PENDING: {MediaState.GENERATING},
@@ -533,11 +601,13 @@ class GeneratedImage(StateMachineMixin, Base):
     }
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    image_prompt_id = Column(String, ForeignKey("image_prompts.id"), nullable=False)
+    image_prompt_id = Column(String, ForeignKey("image_prompts.id", ondelete="CASCADE"), nullable=False)
     image_path = Column(String)
     image_url = Column(String)
+    prompt_hash = Column(String)  # digest of the inputs behind image_path
     state = Column(SQLEnum(MediaState), default=MediaState.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     image_prompt = relationship("ImagePrompt", back_populates="generated_image")
 
@@ -557,6 +627,7 @@ class GeneratedImage(StateMachineMixin, Base):
     def reset_for_regen(self):
         self.transition_to(MediaState.PENDING)
         self.image_path = None
+        self.prompt_hash = None
 
 
 # ============================================================================
@@ -565,6 +636,11 @@ class GeneratedImage(StateMachineMixin, Base):
 
 class Thumbnail(StateMachineMixin, Base):
     __tablename__ = "thumbnails"
+    __table_args__ = (
+        Index("ix_thumbnails_episode_orientation", "episode_id", "orientation", unique=True),
+        Index("ix_thumbnails_project_state", "project_id", "state"),
+        _generating_index("thumbnails"),
+    )
 
     VALID_TRANSITIONS = {
         MediaState.PENDING: {MediaState.GENERATING},
@@ -581,8 +657,10 @@ class Thumbnail(StateMachineMixin, Base):
     prompt_text = Column(Text)
     image_path = Column(String)
     image_url = Column(String)
+    prompt_hash = Column(String)  # digest of the inputs behind image_path
     state = Column(SQLEnum(MediaState), default=MediaState.PENDING)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     project = relationship("Project", back_populates="thumbnails")
     episode = relationship("Episode", back_populates="thumbnails")
@@ -603,6 +681,7 @@ class Thumbnail(StateMachineMixin, Base):
     def reset_for_regen(self):
         self.transition_to(MediaState.PENDING)
         self.image_path = None
+        self.prompt_hash = None
 
 
 # ============================================================================
@@ -611,6 +690,9 @@ class Thumbnail(StateMachineMixin, Base):
 
 class VideoPrompt(StateMachineMixin, Base):
     __tablename__ = "video_prompts"
+    __table_args__ = (
+        Index("ix_video_prompts_scene_segment", "scene_id", "segment_number"),
+    )
 
     VALID_TRANSITIONS = {
         PromptState.PENDING: {PromptState.GENERATED},
@@ -619,7 +701,7 @@ class VideoPrompt(StateMachineMixin, Base):
     }
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    scene_id = Column(String, ForeignKey("scenes.id"), nullable=False)
+    scene_id = Column(String, ForeignKey("scenes.id", ondelete="CASCADE"), nullable=False)
     segment_number = Column(Integer, default=1)
     prompt_text = Column(Text)
     duration_seconds = Column(Integer, default=5)
@@ -644,6 +726,10 @@ class VideoPrompt(StateMachineMixin, Base):
 
 class GeneratedVideo(StateMachineMixin, Base):
     __tablename__ = "generated_videos"
+    __table_args__ = (
+        Index("ix_generated_videos_prompt_state", "video_prompt_id", "state"),
+        _generating_index("generated_videos"),
+    )
 
     VALID_TRANSITIONS = {
         MediaState.PENDING: {MediaState.GENERATING},
@@ -654,7 +740,7 @@ class GeneratedVideo(StateMachineMixin, Base):
     }
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    video_prompt_id = Column(String, ForeignKey("video_prompts.id"), nullable=False)
+    video_prompt_id = Column(String, ForeignKey("video_prompts.id", ondelete="CASCADE"), nullable=False)
     video_path = Column(String)
     video_url = Column(String)
     duration_seconds = Column(Float)
@@ -696,6 +782,31 @@ class AppSetting(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    """A generate_* call queued with ?background=true, polled via GET /jobs/{id}"""
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    project_id = Column(String, nullable=False, index=True)
+    kind = Column(String, nullable=False)  # e.g. "image-prompts"
+    status = Column(SQLEnum(JobStatus), default=JobStatus.QUEUED)
+    result = Column(JSON)  # endpoint response body once SUCCEEDED
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 # ============================================================================
 # DATABASE INITIALIZATION
 # ============================================================================
@@ -74,7 +74,8 @@ class ProjectUpdate(BaseModel):
         return v
 
 
-class ProjectResponse(BaseModel):
+class ProjectSummary(BaseModel):
+    """Project's own columns, without the dashboard counts"""
     id: str
     title: Optional[str]
     setting: Optional[str]
@@ -83,7 +84,12 @@ class ProjectResponse(BaseModel):
     current_step: int
     created_at: datetime
     updated_at: datetime
-    
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectResponse(ProjectSummary):
     # Counts for dashboard
     ideas_count: int = 0
     characters_count: int = 0
@@ -513,6 +519,31 @@ class ExportResponse(BaseModel):
     created_at: datetime
 
 
+# ============================================================================
+# JOB SCHEMAS
+# ============================================================================
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobResponse(BaseModel):
+    id: str
+    project_id: str
+    kind: str
+    status: JobStatus
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 # Update forward references
 ProjectDetail.model_rebuild()
 CharacterResponse.model_rebuild()
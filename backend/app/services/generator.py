@@ -7,13 +7,15 @@ Uses google-genai SDK with Gemini 2.5 Pro for text, Gemini 3 Pro for images, and
 import json
 import re
 import os
-import time
 import base64
+import hashlib
+import shutil
 import uuid
 import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 
+import aiofiles
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -24,13 +26,25 @@ _gemini_key = os.getenv("GEMINI_API_KEY", "")
 if _gemini_key:
     os.environ["GOOGLE_API_KEY"] = _gemini_key
 
+import httpx
 from google import genai
-from google.genai import types
+from google.genai import errors as genai_errors, types
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 logger = logging.getLogger(__name__)
 
 # Outputs directory (relative to backend/)
 OUTPUTS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "outputs")
+_OUTPUTS_PREFIX_LEN = len(os.path.join(OUTPUTS_DIR, ""))
+
+
+def output_url(save_path: str) -> str:
+    """Public URL for a file saved under OUTPUTS_DIR.
+
+    Save paths are always built with os.path.join(OUTPUTS_DIR, ...), so the
+    relative part is a plain slice; no os.path.relpath normalisation needed.
+    """
+    return "/outputs/" + save_path[_OUTPUTS_PREFIX_LEN:].replace(os.sep, "/")
 
 # STYLE PRESETS
 IMAGE_STYLES = {
@@ -43,8 +57,82 @@ def get_image_style(style_key: str = None) -> str:
     """Get the IMAGE_STYLE string for a given style key."""
     return IMAGE_STYLES.get(style_key or DEFAULT_IMAGE_STYLE, IMAGE_STYLES[DEFAULT_IMAGE_STYLE])
 
+# Image calls: per-attempt timeout (seconds) and attempts on transient errors
+IMAGE_CALL_TIMEOUT = 120
+IMAGE_CALL_ATTEMPTS = 3
+
+# Disk budget for cache entries no output image links to any more; the oldest
+# are pruned past it (entries still linked from outputs cost no extra space).
+# Kept small: on Cloud Run the writable filesystem counts against memory
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Point dst at src's bytes: a hard link where the filesystem allows it,
+    else a copy. Goes through a temp name and rename, so dst is replaced
+    atomically and a file that used to be there is never written in place
+    (it may be another hard link to a cache entry)."""
+    tmp_path = f"{dst}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def prune_image_cache() -> None:
+    """Delete the oldest cache entries that no output links to (link count 1)
+    until they fit in IMAGE_CACHE_MAX_BYTES. Without hard-link support every
+    entry counts, so the budget caps the whole cache. Scans the whole cache,
+    so call it once per batch of renders (and at startup), not per image."""
+    orphans = []
+    with os.scandir(os.path.join(OUTPUTS_DIR, "cache")) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".png"):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            if st.st_nlink == 1:
+                orphans.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in orphans)
+    for _, size, path in sorted(orphans):
+        if total <= IMAGE_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+# Set on the SDK's HTTP request itself (milliseconds) so a timed-out call is
+# really aborted; a timeout around the worker thread would leave it running
+_IMAGE_HTTP_OPTIONS = types.HttpOptions(timeout=IMAGE_CALL_TIMEOUT * 1000)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Rate limits, server errors and timeouts are worth retrying; bad prompts are not."""
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code == 429 or exc.code >= 500
+    # httpx.TimeoutException is a TransportError
+    return isinstance(exc, httpx.TransportError)
+
+
+@retry(
+    retry=retry_if_exception(_is_transient),
+    wait=wait_exponential(multiplier=1, min=1, max=30),
+    stop=stop_after_attempt(IMAGE_CALL_ATTEMPTS),
+    reraise=True,
+)
+async def _call_image_api(fn, **kwargs):
+    """Run a blocking image SDK call in a thread, retrying transient failures with backoff.
+    The call's config must carry _IMAGE_HTTP_OPTIONS so a hung request times out."""
+    return await asyncio.to_thread(fn, **kwargs)
+
 # Ensure subdirectories exist
-for subdir in ["images", "refs", "thumbnails", "videos"]:
+for subdir in ["images", "refs", "thumbnails", "videos", "cache"]:
     os.makedirs(os.path.join(OUTPUTS_DIR, subdir), exist_ok=True)
 
 
@@ -117,9 +205,28 @@ class GeminiGenerator:
     # IMAGE GENERATION (Gemini 3 Pro)
     # =========================================================================
 
+    def _image_cache_path(self, full_prompt: str, aspect_ratio: str) -> str:
+        """Content-addressed location for an image rendered from these exact inputs"""
+        key = hashlib.sha256(f"{full_prompt}|{aspect_ratio}|{self.image_model}".encode()).hexdigest()
+        return os.path.join(OUTPUTS_DIR, "cache", f"{key}.png")
+
+    async def _store_image(self, image_bytes: bytes, save_path: str, cache_path: str) -> str:
+        """Write the image once, into the content cache, and hard-link it to save_path"""
+        # aiofiles runs the write in a thread so concurrent renders don't
+        # stall the event loop on disk I/O. Write under a unique temp name then
+        # rename, so a concurrent reader never links a half-written cache entry
+        tmp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(image_bytes)
+        os.replace(tmp_path, cache_path)
+        await asyncio.to_thread(_link_or_copy, cache_path, save_path)
+        logger.info(f"Image saved to {save_path}")
+        return save_path
+
     async def generate_image(self, prompt_text: str, save_path: str,
                               aspect_ratio: str = "16:9",
-                              style: str = None) -> str:
+                              style: str = None,
+                              use_cache: bool = True) -> str:
         """Generate an image and save to disk.
 
         Uses generate_content for Gemini models (gemini-*) and
@@ -130,6 +237,9 @@ class GeminiGenerator:
             save_path: Full path where the image should be saved
             aspect_ratio: Aspect ratio (e.g., "16:9", "9:16", "3:4", "1:1")
             style: Style preset key ("drama" or "anime"). Defaults to DEFAULT_IMAGE_STYLE.
+            use_cache: Reuse an earlier render of the same prompt, style, aspect
+                ratio and model instead of calling the model. Pass False to force
+                a fresh take (the new render replaces the cached one).
 
         Returns:
             The save_path where the image was written
@@ -140,19 +250,27 @@ class GeminiGenerator:
             "IMPORTANT: Do not include any text, letters, numbers, words, labels, "
             "watermarks, signatures, or writing of any kind in the image."
         )
-        logger.info(f"Generating image with {self.image_model} (aspect: {aspect_ratio})")
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
 
+        cache_path = self._image_cache_path(full_prompt, aspect_ratio)
+        if use_cache and os.path.exists(cache_path):
+            await asyncio.to_thread(_link_or_copy, cache_path, save_path)
+            logger.info(f"Image cache hit, linked to {save_path}")
+            return save_path
+
+        logger.info(f"Generating image with {self.image_model} (aspect: {aspect_ratio})")
+
         if self.image_model.startswith("gemini"):
             # Gemini models use generate_content with IMAGE response modality
             # Aspect ratio is specified in the prompt since the API doesn't have a param
             content_prompt = f"{full_prompt}. Aspect ratio: {aspect_ratio}"
-            response = await asyncio.to_thread(
+            response = await _call_image_api(
                 self.client.models.generate_content,
                 model=self.image_model,
                 contents=content_prompt,
                 config=types.GenerateContentConfig(
                     response_modalities=["IMAGE", "TEXT"],
+                    http_options=_IMAGE_HTTP_OPTIONS,
                 )
             )
 
@@ -162,21 +280,19 @@ class GeminiGenerator:
                     image_bytes = part.inline_data.data
                     if isinstance(image_bytes, str):
                         image_bytes = base64.b64decode(image_bytes)
-                    with open(save_path, "wb") as f:
-                        f.write(image_bytes)
-                    logger.info(f"Image saved to {save_path}")
-                    return save_path
+                    return await self._store_image(image_bytes, save_path, cache_path)
 
             raise ValueError("No image data in Gemini response")
         else:
             # Imagen models use the dedicated generate_images endpoint
-            response = await asyncio.to_thread(
+            response = await _call_image_api(
                 self.client.models.generate_images,
                 model=self.image_model,
                 prompt=full_prompt,
                 config=types.GenerateImagesConfig(
                     number_of_images=1,
                     aspect_ratio=aspect_ratio,
+                    http_options=_IMAGE_HTTP_OPTIONS,
                 )
             )
 
@@ -185,10 +301,7 @@ class GeminiGenerator:
                 image_bytes = image.image_bytes
                 if isinstance(image_bytes, str):
                     image_bytes = base64.b64decode(image_bytes)
-                with open(save_path, "wb") as f:
-                    f.write(image_bytes)
-                logger.info(f"Image saved to {save_path}")
-                return save_path
+                return await self._store_image(image_bytes, save_path, cache_path)
 
             raise ValueError("No image data in Imagen response")
 
@@ -214,7 +327,10 @@ class GeminiGenerator:
         valid_durations = [4, 6, 8]
         duration_seconds = min(valid_durations, key=lambda x: abs(x - duration_seconds))
 
-        operation = self.client.models.generate_videos(
+        # The SDK calls are blocking; run them off the event loop so other
+        # requests (and their DB work) keep being served while Veo renders
+        operation = await asyncio.to_thread(
+            self.client.models.generate_videos,
             model=self.video_model,
             prompt=prompt_text,
             config=types.GenerateVideosConfig(
@@ -233,14 +349,14 @@ class GeminiGenerator:
         while not operation.done:
             if elapsed >= max_wait:
                 raise TimeoutError(f"Video generation timed out after {max_wait}s")
-            time.sleep(poll_interval)
+            await asyncio.sleep(poll_interval)
             elapsed += poll_interval
-            operation = self.client.operations.get(operation)
+            operation = await asyncio.to_thread(self.client.operations.get, operation)
 
         # Save the generated video
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         generated_video = operation.response.generated_videos[0]
-        generated_video.video.save(save_path)
+        await asyncio.to_thread(generated_video.video.save, save_path)
 
         return save_path
 
@@ -605,8 +721,9 @@ QUALITY CHECKLIST — Every episode must pass these
 Generate episodes {start_ep} through {end_ep}.
 RESPOND ONLY WITH VALID JSON, NO MARKDOWN."""
 
-        # Use higher token limit for scripts
-        response = self.client.models.generate_content(
+        # Use higher token limit for scripts (off the event loop, like generate())
+        response = await asyncio.to_thread(
+            self.client.models.generate_content,
             model=self.text_model,
             contents=prompt,
             config=self.script_generation_config
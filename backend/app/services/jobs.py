@@ -0,0 +1,113 @@
+"""
+Background jobs
+Runs a generate_* body on the event loop after its request has returned.
+Status lives in the jobs table so any uvicorn worker can answer GET /jobs/{id}.
+Running jobs touch updated_at on a heartbeat; one that stops beating belonged
+to a process that exited mid-job and is failed as interrupted.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.database.session import get_db_context
+from app.models.models import Job, JobStatus, generate_uuid
+
+logger = logging.getLogger(__name__)
+
+# (db, project_id) -> response body; the job opens its own session
+JobWork = Callable[[Session, str], Awaitable[Any]]
+
+# Strong refs so running tasks aren't garbage-collected mid-flight
+_tasks: set = set()
+
+# A live job refreshes updated_at this often (seconds)...
+JOB_HEARTBEAT_SECONDS = 30
+# ...so one not refreshed for this long has no process running it
+JOB_STALE_AFTER = timedelta(minutes=2)
+
+_ACTIVE = (JobStatus.QUEUED, JobStatus.RUNNING)
+_INTERRUPTED = "interrupted (the server restarted before the job finished)"
+
+
+def enqueue(db: Session, project_id: str, kind: str, work: JobWork) -> Job:
+    """Record a QUEUED job and start it in the background"""
+    job = Job(
+        id=generate_uuid(),
+        project_id=project_id,
+        kind=kind,
+        status=JobStatus.QUEUED,
+        created_at=datetime.utcnow()
+    )
+    db.add(job)
+    db.commit()
+
+    task = asyncio.create_task(_run(job.id, project_id, work))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+def _set_status(job_id: str, status: JobStatus, **values) -> None:
+    with get_db_context() as db:
+        db.execute(update(Job).where(Job.id == job_id).values(status=status, **values))
+
+
+def _stale_before() -> datetime:
+    return datetime.utcnow() - JOB_STALE_AFTER
+
+
+def is_interrupted(job: Job) -> bool:
+    """True for a QUEUED/RUNNING job whose process stopped heartbeating"""
+    return job.status in _ACTIVE and (job.updated_at is None or job.updated_at < _stale_before())
+
+
+def fail_interrupted(db: Session, job: Job) -> None:
+    """Mark a job found by is_interrupted() as FAILED"""
+    job.status = JobStatus.FAILED
+    job.error = _INTERRUPTED
+    db.commit()
+
+
+def fail_interrupted_jobs(db: Session) -> int:
+    """FAIL every QUEUED/RUNNING job left behind by an exited process.
+    Only stale ones: another worker's jobs are still heartbeating."""
+    result = db.execute(
+        update(Job)
+        .where(Job.status.in_(_ACTIVE), or_(Job.updated_at.is_(None), Job.updated_at < _stale_before()))
+        .values(status=JobStatus.FAILED, error=_INTERRUPTED)
+    )
+    db.commit()
+    return result.rowcount
+
+
+async def _heartbeat(job_id: str) -> None:
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        with get_db_context() as db:
+            db.execute(update(Job).where(Job.id == job_id).values(updated_at=datetime.utcnow()))
+
+
+async def _run(job_id: str, project_id: str, work: JobWork) -> None:
+    _set_status(job_id, JobStatus.RUNNING)
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        with get_db_context() as db:
+            result = await work(db, project_id)
+    except HTTPException as e:
+        error = str(e.detail)
+    except Exception as e:
+        logger.exception(f"Job {job_id} failed")
+        error = str(e)
+    else:
+        _set_status(job_id, JobStatus.SUCCEEDED, result=jsonable_encoder(result))
+        return
+    finally:
+        heartbeat.cancel()
+    _set_status(job_id, JobStatus.FAILED, error=error)
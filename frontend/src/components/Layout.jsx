@@ -10,6 +10,7 @@ export default function Layout({ children, project }) {
   const [pipeline, setPipeline] = useState(null);
   const [showSettings, setShowSettings] = useState(false);
   const [apiKeyConfigured, setApiKeyConfigured] = useState(null);
+  const [apiKeyInvalid, setApiKeyInvalid] = useState(false);
   const [episodes, setEpisodes] = useState([]);
   const [productionExpanded, setProductionExpanded] = useState(false);
 
@@ -49,7 +50,10 @@ export default function Layout({ children, project }) {
   // Check API key status on mount
   useEffect(() => {
     api.getApiKeyStatus()
-      .then((data) => setApiKeyConfigured(data.configured))
+      .then((data) => {
+        setApiKeyConfigured(data.configured);
+        setApiKeyInvalid(data.validation === 'invalid');
+      })
       .catch(() => setApiKeyConfigured(null));
   }, [showSettings]);
 
@@ -72,9 +76,13 @@ export default function Layout({ children, project }) {
         <button
           className="btn-settings"
           onClick={() => setShowSettings(true)}
-          title={apiKeyConfigured === false ? 'Settings - API key not configured!' : 'Settings'}
+          title={
+            apiKeyConfigured === false ? 'Settings - API key not configured!'
+              : apiKeyInvalid ? 'Settings - API key was rejected by Gemini!'
+              : 'Settings'
+          }
         >
-          {apiKeyConfigured === false && <span className="settings-warning-dot" />}
+          {(apiKeyConfigured === false || apiKeyInvalid) && <span className="settings-warning-dot" />}
           <svg width="20" height="20" viewBox="0 0 20 20" fill="currentColor">
             <path fillRule="evenodd" d="M11.49 3.17c-.38-1.56-2.6-1.56-2.98 0a1.532 1.532 0 01-2.286.948c-1.372-.836-2.942.734-2.106 2.106.54.886.061 2.042-.947 2.287-1.561.379-1.561 2.6 0 2.978a1.532 1.532 0 01.947 2.287c-.836 1.372.734 2.942 2.106 2.106a1.532 1.532 0 012.287.947c.379 1.561 2.6 1.561 2.978 0a1.533 1.533 0 012.287-.947c1.372.836 2.942-.734 2.106-2.106a1.533 1.533 0 01.947-2.287c1.561-.379 1.561-2.6 0-2.978a1.532 1.532 0 01-.947-2.287c.836-1.372-.734-2.942-2.106-2.106a1.532 1.532 0 01-2.287-.947zM10 13a3 3 0 100-6 3 3 0 000 6z" clipRule="evenodd" />
           </svg>
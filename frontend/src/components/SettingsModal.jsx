@@ -1,26 +1,43 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import api from '../api/client';
 
 export default function SettingsModal({ onClose }) {
   const [apiKey, setApiKey] = useState('');
-  const [status, setStatus] = useState(null); // { configured, source }
+  const [status, setStatus] = useState(null); // { configured, source, validation }
   const [saving, setSaving] = useState(false);
   const [deleting, setDeleting] = useState(false);
   const [message, setMessage] = useState(null); // { type: 'success'|'error', text }
+  const closed = useRef(false);
 
   useEffect(() => {
     loadStatus();
+    return () => { closed.current = true; };
   }, []);
 
   const loadStatus = async () => {
     try {
       const data = await api.getApiKeyStatus();
       setStatus(data);
+      return data;
     } catch (err) {
       console.error('Failed to load API key status:', err);
+      return null;
     }
   };
 
+  // The key is checked against Gemini after it is saved; poll until the
+  // server reports the result, then tell the user whether it works
+  const waitForValidation = async () => {
+    for (let attempt = 0; attempt < 20 && !closed.current; attempt++) {
+      const data = await loadStatus();
+      if (data && data.validation !== 'pending') {
+        return data.validation;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1500));
+    }
+    return 'pending';
+  };
+
   const handleSave = async () => {
     if (!apiKey.trim()) {
       setMessage({ type: 'error', text: 'Please enter an API key' });
@@ -34,7 +51,14 @@ export default function SettingsModal({ onClose }) {
       const result = await api.setApiKey(apiKey.trim());
       setMessage({ type: 'success', text: result.message || 'API key saved successfully!' });
       setApiKey('');
-      await loadStatus();
+      const validation = await waitForValidation();
+      if (validation === 'invalid') {
+        setMessage({ type: 'error', text: 'Gemini rejected this API key. Please check your key and save it again.' });
+      } else if (validation === 'valid') {
+        setMessage({ type: 'success', text: 'API key saved and validated successfully!' });
+      } else if (validation === 'unknown') {
+        setMessage({ type: 'success', text: 'API key saved, but it could not be verified right now (quota or network). Generation will show any errors.' });
+      }
     } catch (err) {
       setMessage({ type: 'error', text: err.message || 'Failed to save API key' });
     } finally {
@@ -69,6 +93,11 @@ export default function SettingsModal({ onClose }) {
     none: 'Not configured',
   };
 
+  const validationLabel = {
+    pending: ' - validating...',
+    invalid: ' - rejected by Gemini',
+  };
+
   return (
     <div className="modal-overlay" onClick={onClose}>
       <div className="modal-content settings-modal" onClick={(e) => e.stopPropagation()}>
@@ -82,11 +111,11 @@ export default function SettingsModal({ onClose }) {
           <div className="settings-section">
             <h3>Gemini API Key</h3>
             <div className="settings-status">
-              <span className={`status-dot ${status?.configured ? 'active' : 'inactive'}`} />
+              <span className={`status-dot ${status?.configured && status?.validation !== 'invalid' ? 'active' : 'inactive'}`} />
               <span className="status-text">
                 {status
                   ? status.configured
-                    ? `Configured (${sourceLabel[status.source] || status.source})`
+                    ? `Configured (${sourceLabel[status.source] || status.source})${validationLabel[status.validation] || ''}`
                     : 'Not configured'
                   : 'Loading...'}
               </span>